@@ -1,6 +1,11 @@
-from .align import Align
+import importlib
+import typing
+
 from .constants import Magnification
 
+if typing.TYPE_CHECKING:
+    from .align import Align
+
 __author__ = "AICS"
 
 # Do not edit this string manually, always use bumpversion
@@ -12,4 +17,18 @@ def get_module_version():
     return __version__
 
 
+# Throughout this package, dependencies that take far longer to import than the package itself (aicsimageio, dask,
+# scipy, scikit-image, scikit-learn, pandas, tifffile, zarr and ome-zarr) are imported where they are used, or
+# exports depending on them are imported on first use, so that importing the package stays cheap.
+# tests/test_import_time.py enforces this. Modules list the imports they defer.
+
+
+def __getattr__(name: str) -> typing.Any:
+    # Deferred: `Align` (aicsimageio)
+    if name == "Align":
+        return importlib.import_module(".align", __name__).Align
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 __all__ = ("Align", "get_module_version", "Magnification")
@@ -1,24 +1,90 @@
+import asyncio
+import concurrent.futures
+import functools
+import hashlib
+import json
 import logging
 import pathlib
+import queue
+import tempfile
+import threading
+import time
 import typing
+import weakref
 
-from aicsimageio import AICSImage
-from aicsimageio.writers import OmeTiffWriter
 import numpy
 import numpy.typing
 
 from .alignment_core import (
+    WARP_MAP_CACHE,
+    align_and_crop,
     align_image,
-    crop,
+    align_image_lazy,
+    align_image_tiled,
+    crop_window,
     generate_alignment_matrix,
 )
 from .alignment_utils import AlignmentInfo
 from .channel_info import channel_info_factory
 from .constants import LOGGER_NAME, Magnification
+from .exception import (
+    AlignmentUnsuccessful,
+    IncompatibleImageException,
+    MemoryBudgetExceeded,
+    UnsupportedMagnification,
+)
+from .image_writer import (
+    ImageWriter,
+    image_writer_factory,
+)
+from .memory_plan import MemoryPlan, plan_memory
+from .resume_manifest import (
+    AlignmentUnit,
+    ResumeManifest,
+    input_checksum,
+    transform_checksum,
+)
+from .transform_cache import TransformCache
+from .warp_map import PlaneWindow, WarpMap
+
+# Deferred imports: aicsimageio, dask
+if typing.TYPE_CHECKING:
+    from aicsimageio import AICSImage
+    import dask.array
 
 log = logging.getLogger(LOGGER_NAME)
 
 
+@functools.lru_cache(maxsize=None)
+def image_errors() -> typing.Tuple[typing.Type[BaseException], ...]:
+    """Errors that fail the alignment of one image, rather than the whole of a batch (see `Align.align_images`):
+    those of reading or writing an image, and of an image that cannot be aligned. Any other error is a bug,
+    and is raised.
+
+    A function rather than a constant, so that the exceptions of the readers are only imported along with
+    the readers: the expression of an `except` clause is only evaluated once an exception is raised.
+    """
+    from aicsimageio import (
+        exceptions as reader_exceptions,
+    )
+    from tifffile import TiffFileError
+
+    # Some of this package's exceptions derive from BaseException rather than Exception
+    return (
+        OSError,
+        ValueError,
+        reader_exceptions.ConflictingArgumentsError,
+        reader_exceptions.InvalidDimensionOrderingError,
+        reader_exceptions.UnexpectedShapeError,
+        reader_exceptions.UnsupportedFileFormatError,
+        TiffFileError,
+        AlignmentUnsuccessful,
+        IncompatibleImageException,
+        MemoryBudgetExceeded,
+        UnsupportedMagnification,
+    )
+
+
 class AlignmentTransform(typing.NamedTuple):
     matrix: numpy.typing.NDArray[numpy.float16]
     info: AlignmentInfo
@@ -32,6 +98,45 @@ class AlignedImage(typing.NamedTuple):
     path: pathlib.Path
 
 
+class ImageAlignmentResult(typing.NamedTuple):
+    # Original, unaligned image
+    image: typing.Union[str, pathlib.Path]
+
+    # Scenes of the image that were aligned
+    aligned_scenes: typing.List[AlignedImage]
+
+    # First error raised while aligning the image, if any: any scenes missing from `aligned_scenes` failed
+    error: typing.Optional[BaseException]
+
+
+class SceneAlignmentResult(typing.NamedTuple):
+    # Original, unaligned image
+    image: typing.Union[str, pathlib.Path]
+
+    # Which scene of `image` this corresponds to; None if `image` could not be opened
+    scene: typing.Optional[int]
+
+    # Output path of the aligned scene; None if it was not aligned
+    path: typing.Optional[pathlib.Path]
+
+    # Time spent aligning the scene (or failing to open `image`), in seconds
+    seconds: float
+
+    # Error raised while aligning the scene (or opening `image`), if any
+    error: typing.Optional[BaseException]
+
+    # Whether the scene had already been aligned, and so was not aligned again (see `Align.align_image`'s `resume`)
+    skipped: bool = False
+
+
+class LazyAlignedImage(typing.NamedTuple):
+    # Which scene from the original, unaligned image this corresponds to
+    scene: int
+
+    # Lazily aligned TCZYX image data of the scene
+    data: "dask.array.Array"
+
+
 class Align:
     """High-level API for core camera alignment functionality.
 
@@ -43,6 +148,9 @@ class Align:
     >>>     out_dir="/tmp/whereever",
     >>> )
     >>> aligned_scenes = align.align_image("/some/path/to/an/image.czi", channels_to_shift=[0, 2])
+    >>> lazy_scenes = align.align_image_lazy("/some/path/to/an/image.czi", channels_to_shift=[0, 2])
+    >>> max_projection = lazy_scenes[0].data[0].max(axis=1).compute()
+    >>> aligned_scenes = await align.align_image_async("/some/path/to/an/image.czi", channels_to_shift=[0, 2])
     >>> aligned_optical_control = align.align_optical_control(channels_to_shift=[0, 2])
     >>> alignment_matrix = align.alignment_transform.matrix
     >>> alignment_info = align.alignment_transform.info
@@ -50,20 +158,23 @@ class Align:
 
     def __init__(
         self,
-        optical_control: typing.Union[str, pathlib.Path],
+        optical_control: typing.Optional[typing.Union[str, pathlib.Path]],
         magnification: Magnification,
         out_dir: typing.Union[str, pathlib.Path],
         reference_channel_index: typing.Optional[int] = None,
         shift_channel_index: typing.Optional[int] = None,
         alignment_transform: typing.Optional[AlignmentTransform] = None,
+        transform_cache_dir: typing.Optional[typing.Union[str, pathlib.Path]] = None,
+        max_memory_bytes: typing.Optional[int] = None,
     ) -> None:
         """Constructor.
 
         Parameters
         ----------
-        optical_control : Union[str, Path]
+        optical_control : Optional[Union[str, Path]]
             Optical control image that will be used to generate an alignment matrix.
-            Passed as-is to aicsimageio.AICSImage constructor.
+            Passed as-is to aicsimageio.AICSImage constructor. May be None if `alignment_transform` is provided,
+            in which case `align_optical_control` is unavailable.
         magnification : Magnification
             Magnification at which `optical_control` (and any images to be aligned using `optical_control`)
             was acquired.
@@ -85,15 +196,40 @@ class Align:
             See `reference_channel_index` description for detail on what happens if this argument is not provided.
         alignment_transform : Optional[AlignmentTransform]
             Precomputed alignment transform to use for aligning images.
-            If provided, `optical_control` will be ignored.
+            If provided, `optical_control` is not used to generate one (nor is it read, unless aligned itself).
+        transform_cache_dir : Optional[Union[str, Path]]
+            Directory in which to cache alignment transforms generated from optical controls, so that the transform
+            for a given optical control, channels and magnification is only ever generated once, no matter how many
+            instances (or processes) use it. May be shared by concurrent processes.
+            See `camera_alignment_core.transform_cache.TransformCache`. If not provided, nothing is cached.
+        max_memory_bytes : Optional[int]
+            Memory budget, in bytes, for aligning images with `align_image` and `align_images`, shared between
+            their `max_workers` processes. Before any pixels of a scene are read, its dimensions are used to pick
+            how many timepoints to hold in memory at once and how many `workers` to resample them with, or
+            failing that, to align each timepoint out of core in tiles staged through scratch files in `out_dir`
+            (see `camera_alignment_core.memory_plan.plan_memory`). If no plan fits, the scene fails
+            with `MemoryBudgetExceeded`, stating the estimated memory needed. The budget does not cover
+            the optical control; see `release_optical_control`. If not provided, memory use is not limited.
         """
+        if max_memory_bytes is not None and max_memory_bytes < 1:
+            raise ValueError(
+                f"max_memory_bytes: must be at least 1. Got: {max_memory_bytes}"
+            )
+
+        self._optical_control_image: typing.Optional["AICSImage"] = None
+        self._optical_control_path = (
+            pathlib.Path(optical_control) if optical_control is not None else None
+        )
         if not alignment_transform:
-            self._optical_control_path = pathlib.Path(optical_control)
-            assert (
-                self._optical_control_path.exists()
-            ), f"File not found: {optical_control}. If no alignment transform"
+            if optical_control is None:
+                raise ValueError(
+                    "optical_control: required if no alignment_transform is provided"
+                )
+            assert pathlib.Path(
+                optical_control
+            ).exists(), f"File not found: {optical_control}. If no alignment transform"
             " is provided you must include a path to the optical control image."
-            self._optical_control = AICSImage(optical_control)
+            self._optical_control_image = _open_image(optical_control)
 
         self._magnification = magnification
         self._out_dir = pathlib.Path(out_dir)
@@ -101,7 +237,21 @@ class Align:
 
         self._reference_channel_index = reference_channel_index
         self._shift_channel_index = shift_channel_index
+        self._max_memory_bytes = max_memory_bytes
+
+        # CZYX pixels of the first timepoint of the optical control, decoded on first use.
+        # Shared by `alignment_transform` and `align_optical_control`; see `release_optical_control`.
+        self._optical_control_buffer: typing.Optional[
+            numpy.typing.NDArray[numpy.uint16]
+        ] = None
+        self._transform_cache = (
+            TransformCache(transform_cache_dir) if transform_cache_dir else None
+        )
 
+        # Held by `alignment_transform_async` while generating the alignment transform; one per event loop
+        self._alignment_transform_locks: (
+            "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]"
+        ) = weakref.WeakKeyDictionary()
         self._alignment_matrix: typing.Optional[numpy.typing.NDArray[numpy.float16]]
         self._alignment_info: typing.Optional[AlignmentInfo]
         if alignment_transform:
@@ -116,50 +266,195 @@ class Align:
         """
         Get the similarity matrix and camera_alignment_core.utils.AlignmentInfo used to perform camera alignment.
         """
-        if self._alignment_matrix is None or self._alignment_info is None:
-            assert self._optical_control.physical_pixel_sizes.X is not None
-            assert (
-                self._optical_control.physical_pixel_sizes.X
-                == self._optical_control.physical_pixel_sizes.Y
-            ), "Physical pixel sizes in X and Y dimensions do not match in optical control image"
-
-            # If the reference channel and/or shift channel were not specified,
-            # query the image metadata to find the channels closest in their emission wavelength
-            # between the two cameras. According to Nathalie (2021-11), it doesn't matter
-            # which is set as the ref channel and which is set as the shift channel for the purpose
-            # of generating the alignment matrix. By default, however, because
-            # ChannelInfo::find_channels_closest_in_emission_wavelength_between_cameras returns channels sorted (asc),
-            # this _should_ generally end up using TagRFP as the reference and CMDRP as the shift,
-            # assuming both of those channels exist in the optical control image.
-            # If you want full control over which channels are used,
-            # specify `reference_channel_index` and `shift_channel_index`.
-            if not self._reference_channel_index or not self._shift_channel_index:
-                channel_info = channel_info_factory(self._optical_control_path)
-                (
-                    reference_channel,
-                    shift_channel,
-                ) = (
-                    channel_info.find_channels_closest_in_emission_wavelength_between_cameras()
+        if self._alignment_matrix is not None and self._alignment_info is not None:
+            return AlignmentTransform(self._alignment_matrix, self._alignment_info)
+
+        cache_key, cached_transform = self._cached_alignment_transform()
+        if cached_transform is not None:
+            alignment_matrix, alignment_info = cached_transform
+        else:
+            alignment_matrix, alignment_info = self._alignment_matrix_generator()()
+        return self._store_alignment_transform(
+            cache_key, alignment_matrix, alignment_info, cache=cached_transform is None
+        )
+
+    async def alignment_transform_async(
+        self, executor: typing.Optional[concurrent.futures.Executor] = None
+    ) -> AlignmentTransform:
+        """Asyncio counterpart of `alignment_transform`, which never blocks the event loop: the optical control
+        and the transform cache are read on threads, and the alignment matrix is generated on `executor`.
+        Concurrent calls generate the alignment matrix only once.
+
+        Keyword Arguments
+        -----------------
+        executor : Optional[concurrent.futures.Executor]
+            Executor on which to generate the alignment matrix (a CPU-bound task), e.g. a ProcessPoolExecutor.
+            Defaults to the default executor of the running event loop.
+
+        Returns
+        -------
+        AlignmentTransform
+        """
+        loop = asyncio.get_running_loop()
+        lock = self._alignment_transform_locks.setdefault(loop, asyncio.Lock())
+        async with lock:
+            if self._alignment_matrix is not None and self._alignment_info is not None:
+                return AlignmentTransform(self._alignment_matrix, self._alignment_info)
+
+            cache_key, cached_transform = await loop.run_in_executor(
+                None, self._cached_alignment_transform
+            )
+            if cached_transform is not None:
+                alignment_matrix, alignment_info = cached_transform
+            else:
+                generate = await loop.run_in_executor(
+                    None, self._alignment_matrix_generator
                 )
-                self._reference_channel_index = reference_channel.channel_index
-                self._shift_channel_index = shift_channel.channel_index
-
-            control_image_data = self._optical_control.get_image_data("CZYX", T=0)
-            alignment_matrix, alignment_info = generate_alignment_matrix(
-                control_image_data,
-                reference_channel=self._reference_channel_index,
-                shift_channel=self._shift_channel_index,
-                magnification=self._magnification.value,
-                px_size_xy=self._optical_control.physical_pixel_sizes.X,
+                alignment_matrix, alignment_info = await loop.run_in_executor(
+                    executor, generate
+                )
+            return await loop.run_in_executor(
+                None,
+                functools.partial(
+                    self._store_alignment_transform,
+                    cache_key,
+                    alignment_matrix,
+                    alignment_info,
+                    cache=cached_transform is None,
+                ),
+            )
+
+    def _cached_alignment_transform(
+        self,
+    ) -> typing.Tuple[
+        typing.Optional[str],
+        typing.Optional[
+            typing.Tuple[numpy.typing.NDArray[numpy.float16], AlignmentInfo]
+        ],
+    ]:
+        """Resolve the channels of the optical control to generate the alignment matrix from, then look up
+        the transform cache for it. Returns the cache key and the cached transform; either may be None.
+        """
+        assert self._optical_control.physical_pixel_sizes.X is not None
+        assert (
+            self._optical_control.physical_pixel_sizes.X
+            == self._optical_control.physical_pixel_sizes.Y
+        ), "Physical pixel sizes in X and Y dimensions do not match in optical control image"
+
+        # If the reference channel and/or shift channel were not specified,
+        # query the image metadata to find the channels closest in their emission wavelength
+        # between the two cameras. According to Nathalie (2021-11), it doesn't matter
+        # which is set as the ref channel and which is set as the shift channel for the purpose
+        # of generating the alignment matrix. By default, however, because
+        # ChannelInfo::find_channels_closest_in_emission_wavelength_between_cameras returns channels sorted (asc),
+        # this _should_ generally end up using TagRFP as the reference and CMDRP as the shift,
+        # assuming both of those channels exist in the optical control image.
+        # If you want full control over which channels are used,
+        # specify `reference_channel_index` and `shift_channel_index`.
+        if not self._reference_channel_index or not self._shift_channel_index:
+            channel_info = channel_info_factory(
+                self._optical_control_file, self._optical_control
+            )
+            (
+                reference_channel,
+                shift_channel,
+            ) = (
+                channel_info.find_channels_closest_in_emission_wavelength_between_cameras()
+            )
+            self._reference_channel_index = reference_channel.channel_index
+            self._shift_channel_index = shift_channel.channel_index
+
+        cache_key = None
+        cached_transform = None
+        if self._transform_cache is not None:
+            cache_key = self._transform_cache.key(
+                self._optical_control_file,
+                self._reference_channel_index,
+                self._shift_channel_index,
+                self._magnification,
+            )
+            cached_transform = self._transform_cache.get(cache_key)
+            if cached_transform is not None:
+                log.debug("Using cached alignment transform %s", cache_key)
+
+        return cache_key, cached_transform
+
+    def _alignment_matrix_generator(
+        self,
+    ) -> "functools.partial[typing.Tuple[numpy.typing.NDArray[numpy.float16], AlignmentInfo]]":
+        """Picklable function that generates the alignment matrix from the (decoded) optical control.
+        See `_cached_alignment_transform`, which resolves the channels to generate it from.
+        """
+        px_size_xy = self._optical_control.physical_pixel_sizes.X
+        assert px_size_xy is not None
+        assert self._reference_channel_index is not None
+        assert self._shift_channel_index is not None
+        return functools.partial(
+            generate_alignment_matrix,
+            self._optical_control_data,
+            reference_channel=self._reference_channel_index,
+            shift_channel=self._shift_channel_index,
+            magnification=self._magnification.value,
+            px_size_xy=px_size_xy,
+        )
+
+    def _store_alignment_transform(
+        self,
+        cache_key: typing.Optional[str],
+        alignment_matrix: numpy.typing.NDArray[numpy.float16],
+        alignment_info: AlignmentInfo,
+        cache: bool,
+    ) -> AlignmentTransform:
+        """Keep the alignment transform for this instance and, if `cache`, put it in the transform cache."""
+        if cache and self._transform_cache is not None and cache_key is not None:
+            self._transform_cache.put(cache_key, alignment_matrix, alignment_info)
+
+        self._alignment_matrix = alignment_matrix
+        self._alignment_info = alignment_info
+        return AlignmentTransform(alignment_matrix, alignment_info)
+
+    def release_optical_control(self) -> None:
+        """Release the reader of the optical control and the pixels decoded from it.
+
+        The optical control is only read once per instance: its pixels are kept in memory, to be shared by
+        `alignment_transform` and `align_optical_control`. Call this once done with both, e.g. before aligning
+        a long series of images, to free that memory. The optical control is reopened and decoded again
+        if it is needed afterwards.
+        """
+        self._optical_control_image = None
+        self._optical_control_buffer = None
+
+    @property
+    def _optical_control_file(self) -> pathlib.Path:
+        if self._optical_control_path is None:
+            raise ValueError(
+                "No optical control: this instance was constructed with only an alignment_transform"
             )
 
-            self._alignment_matrix = alignment_matrix
-            self._alignment_info = alignment_info
+        return self._optical_control_path
+
+    @property
+    def _optical_control(self) -> "AICSImage":
+        if self._optical_control_image is None:
+            self._optical_control_image = _open_image(self._optical_control_file)
+
+        return self._optical_control_image
 
-        return AlignmentTransform(self._alignment_matrix, self._alignment_info)
+    @property
+    def _optical_control_data(self) -> numpy.typing.NDArray[numpy.uint16]:
+        if self._optical_control_buffer is None:
+            self._optical_control_buffer = self._optical_control.get_image_data(
+                "CZYX", T=0
+            )
+
+        return self._optical_control_buffer
 
     def align_optical_control(
-        self, channels_to_shift: typing.List[int], crop_output: bool = True
+        self,
+        channels_to_shift: typing.List[int],
+        crop_output: bool = True,
+        output_format: str = "ome.tiff",
+        writer_options: typing.Optional[typing.Dict[str, typing.Any]] = None,
     ) -> pathlib.Path:
         """Align the optical control image using the similarity matrix generated from
         the optical control itself. Useful as a reference for judging the quality of the alignment.
@@ -176,35 +471,51 @@ class Align:
             Optional flag for toggling whether to crop aligned image according to standard dimensions
             for the magnification at which the image was acquired. Defaults to `True`, which means,
             "yes, crop the image."
+        output_format : Optional[str]
+            File format of the output: "ome.tiff" or "ome.zarr". Defaults to "ome.tiff".
+        writer_options : Optional[Dict[str, Any]]
+            Options for the writer of `output_format`, e.g. `chunk_shape`, `compressor` and `workers` for "ome.zarr".
+            See `camera_alignment_core.image_writer.image_writer_factory`.
 
         Returns
         -------
         pathlib.Path
 
+        Raises ValueError if this instance was constructed without an optical control.
+
         Notes
         -----
         This method will output the aligned optical control image to a file as a side-effect,
         returning the pathlib.Path to the file.
+        The warp map built for the optical control is kept in `camera_alignment_core.alignment_core.WARP_MAP_CACHE`,
+        so aligning images of the same shape afterwards (see `align_image`) reuses it.
         """
-        aligned_control = align_image(
-            self._optical_control.get_image_data("CZYX", T=0),
-            self.alignment_transform.matrix,
-            channels_to_shift,
-        )
-
         if crop_output:
-            aligned_control = crop(aligned_control, self._magnification)
+            aligned_control = align_and_crop(
+                self._optical_control_data,
+                self.alignment_transform.matrix,
+                channels_to_shift,
+                self._magnification,
+            )
+        else:
+            aligned_control = align_image(
+                self._optical_control_data,
+                self.alignment_transform.matrix,
+                channels_to_shift,
+            )
 
         aligned_control_outpath = (
-            self._out_dir / f"{self._optical_control_path.stem}_aligned.ome.tiff"
+            self._out_dir / f"{self._optical_control_file.stem}_aligned.{output_format}"
         )
-        OmeTiffWriter.save(
-            # aligned_control is CZYX, wrap in an array to fill it out to TCZYX
-            data=numpy.stack([aligned_control]),
-            uri=aligned_control_outpath,
+        writer = image_writer_factory(
+            aligned_control_outpath,
+            # aligned_control is CZYX, fill it out to TCZYX
+            shape=(1, *aligned_control.shape),
+            dtype=aligned_control.dtype,
             channel_names=self._optical_control.channel_names,
-            dim_order="TCZYX",
+            **(writer_options or {}),
         )
+        writer.write([aligned_control])
         return aligned_control_outpath
 
     def align_image(
@@ -215,6 +526,14 @@ class Align:
         timepoints: typing.List[int] = [],
         crop_output: bool = True,
         interpolation: int = 0,
+        workers: int = 1,
+        translation_tolerance: float = 0.0,
+        output_format: str = "ome.tiff",
+        writer_options: typing.Optional[typing.Dict[str, typing.Any]] = None,
+        max_workers: int = 1,
+        output_channels: typing.List[int] = [],
+        resume: bool = False,
+        verify_input: bool = False,
     ) -> typing.List[AlignedImage]:
         """Align channels within `image` using similarity transform generated from the optical control image passed to
         this instance at construction. Scenes within `image` will be saved to their own image files once aligned.
@@ -242,63 +561,1389 @@ class Align:
             "yes, crop the image."
         interpolation : Optional[int]
             Interpolation order to use when applying the alignment transform. Default is 0.
+        workers : Optional[int]
+            Number of threads to use for warping the planes of each timepoint. Default is 1.
+            See `camera_alignment_core.alignment_core.align_image`.
+        translation_tolerance : Optional[float]
+            Largest error, in pixels, accepted for applying the alignment transform as a pure translation.
+            Default is 0. See `camera_alignment_core.alignment_core.align_image`.
+        output_format : Optional[str]
+            File format of the output: "ome.tiff" or "ome.zarr". Defaults to "ome.tiff".
+            OME-Zarr output is chunked (by default, one chunk per YX plane), so that single planes can be read
+            without decoding the rest of the image.
+        writer_options : Optional[Dict[str, Any]]
+            Options for the writer of `output_format`, e.g. `chunk_shape`, `compressor` and `workers` for "ome.zarr".
+            See `camera_alignment_core.image_writer.image_writer_factory`.
+        max_workers : Optional[int]
+            Number of processes across which to spread the scenes of `image`. Scenes are independent, so with
+            N processes, N scenes are aligned at once. Each process opens its own reader of `image`.
+            Combined with `workers`, up to `max_workers * workers` threads resample at once. Default is 1
+            (scenes are aligned one after another, in this process).
+        output_channels : Optional[List[int]]
+            Which channels of `image`, and in which order, to include in the output. Specify as list of 0-index
+            channel indices within `image`. Only these channels are read from `image`; any of `channels_to_shift`
+            not among them are neither read nor aligned. If not specified, all channels are output.
+        resume : Optional[bool]
+            Skip scenes already aligned into `out_dir` by an earlier run with the same image, alignment transform
+            and options, e.g. one that was interrupted. Scenes aligned are recorded in a manifest within `out_dir`
+            (see `camera_alignment_core.resume_manifest.ResumeManifest`), along with a checksum of their output;
+            a scene is only skipped if its output still matches it, which costs a read of the output. `image` is
+            identified by its path, size and modification time, so only local images can be resumed: the scenes
+            of others (e.g. URLs) are always aligned again. Default is False.
+        verify_input : Optional[bool]
+            With `resume`, identify `image` by a checksum of its content instead, which costs a read of all of it,
+            so that e.g. a copy of it (or one whose modification time changed) is still resumed. Default is False.
 
         Returns
         -------
         List[AlignedImage]
-            A list of namedtuples, each of which describes a scene within `image` that was aligned.
+            A list of namedtuples, each of which describes a scene within `image` that was aligned,
+            in the same order as `scenes` (or as the scenes within `image`, if `scenes` is not specified).
         """
-        aics_image = AICSImage(image)
+        if max_workers < 1:
+            raise ValueError(f"max_workers: must be at least 1. Got: {max_workers}")
+
+        aics_image = _open_image(image)
+        scene_indices = scenes if scenes else range(len(aics_image.scenes))
+        save_paths = self._save_paths(image, aics_image, scene_indices, output_format)
+        align_scene = self._scene_aligner(
+            channels_to_shift,
+            timepoints,
+            crop_output,
+            interpolation,
+            workers,
+            translation_tolerance,
+            writer_options,
+            output_channels,
+            min(max_workers, len(scene_indices)),
+        )
+
+        manifest = ResumeManifest(self._out_dir) if resume else None
+        units: typing.List[typing.Optional[AlignmentUnit]] = (
+            self._alignment_units(
+                image, scene_indices, save_paths, align_scene, verify_input
+            )
+            if manifest is not None
+            else [None] * len(save_paths)
+        )
+        aligned_scenes: typing.Dict[int, AlignedImage] = {}
+        pending = []
+        for position, (scene, save_path) in enumerate(zip(scene_indices, save_paths)):
+            unit = units[position]
+            if manifest is not None and unit is not None and manifest.is_complete(unit):
+                log.info("Skipping scene %s of %s: already aligned", scene, image)
+                aligned_scenes[position] = AlignedImage(scene, save_path)
+            else:
+                pending.append(position)
+
+        processes = min(max_workers, len(pending))
+        if processes > 1:
+            # Scenes are independent: each worker process opens its own reader of `image`
+            # and is sent only the alignment matrix, not this instance.
+            # Results are collected in the order of `pending`, regardless of which scene finishes first.
+            pool = concurrent.futures.ProcessPoolExecutor(max_workers=processes)
+            executor: typing.Optional[concurrent.futures.Executor] = pool
+            futures = [
+                pool.submit(
+                    _align_scene_of_image,
+                    image,
+                    align_scene,
+                    scene_indices[position],
+                    save_paths[position],
+                )
+                for position in pending
+            ]
+            results: typing.Iterator[AlignedImage] = (
+                future.result() for future in futures
+            )
+        else:
+            executor = None
+            futures = []
+            results = (
+                align_scene(aics_image, scene_indices[position], save_paths[position])
+                for position in pending
+            )
+
+        try:
+            # Each scene is recorded as soon as it is aligned, so that an interrupted run can resume from it
+            for position, aligned_scene in zip(pending, results):
+                unit = units[position]
+                if manifest is not None and unit is not None:
+                    manifest.record(unit)
+                aligned_scenes[position] = aligned_scene
+        finally:
+            if executor is not None:
+                # Scenes not yet started are not aligned only to be thrown away
+                for future in futures:
+                    future.cancel()
+                executor.shutdown()
+
+        return [aligned_scenes[position] for position in range(len(scene_indices))]
+
+    async def align_image_async(
+        self,
+        image: typing.Union[str, pathlib.Path],
+        channels_to_shift: typing.List[int],
+        scenes: typing.List[int] = [],
+        timepoints: typing.List[int] = [],
+        crop_output: bool = True,
+        interpolation: int = 0,
+        workers: int = 1,
+        translation_tolerance: float = 0.0,
+        output_format: str = "ome.tiff",
+        writer_options: typing.Optional[typing.Dict[str, typing.Any]] = None,
+        output_channels: typing.List[int] = [],
+        executor: typing.Optional[concurrent.futures.Executor] = None,
+        max_concurrent_scenes: int = 1,
+    ) -> typing.List[AlignedImage]:
+        """Asyncio counterpart of `align_image`, which never blocks the event loop, for use within asyncio
+        applications. Scenes of `image` are aligned concurrently, each with its own reader of `image`.
+
+        Reading and writing images run on threads, and aligning each timepoint (the CPU-bound work) on `executor`.
+        Each scene is written by a thread of its own as it is aligned, a timepoint at a time, so memory use
+        is bounded as with `align_image`. The alignment transform is generated as by `alignment_transform_async`,
+        if it has not been already.
+
+        Cancelling the returned coroutine stops aligning every scene in flight before its next timepoint,
+        and discards their partial output (see `camera_alignment_core.image_writer.ImageWriter`); likewise,
+        if any scene fails, those in flight are cancelled, then the error is raised. Scenes already aligned
+        are kept.
+
+        Parameters
+        ----------
+        image : Union[str, Path]
+            Microscopy image that requires alignment. Passed as-is to aicsimageio.AICSImage constructor.
+        channels_to_shift : List[int]
+            Index positions of channels within `image` that should be shifted. N.b.: indices start at 0.
+            E.g.: Specify [0, 2] to apply the alignment transform to channels at index positions 0 and 2 within `image`.
+
+        Keyword Arguments
+        -----------------
+        scenes : Optional[List[int]]
+            Which scene or scenes within `image` to align. See `align_image`.
+        timepoints : Optional[List[int]]
+            Which timepoint or timepoints within `image` to perform the alignment. See `align_image`.
+        crop_output : Optional[bool]
+            Whether to crop aligned image according to standard dimensions for the magnification at which
+            the image was acquired. Defaults to `True`.
+        interpolation : Optional[int]
+            Interpolation order to use when applying the alignment transform. Default is 0.
+        workers : Optional[int]
+            Number of threads to use for warping the planes of each timepoint, within `executor`. Default is 1.
+        translation_tolerance : Optional[float]
+            Largest error, in pixels, accepted for applying the alignment transform as a pure translation.
+            Default is 0. See `camera_alignment_core.alignment_core.align_image`.
+        output_format : Optional[str]
+            File format of the output: "ome.tiff" or "ome.zarr". Defaults to "ome.tiff".
+        writer_options : Optional[Dict[str, Any]]
+            Options for the writer of `output_format`. See `align_image`.
+        output_channels : Optional[List[int]]
+            Which channels of `image`, and in which order, to include in the output. See `align_image`.
+        executor : Optional[concurrent.futures.Executor]
+            Executor on which to align timepoints (and generate the alignment transform), e.g.
+            a ProcessPoolExecutor shared by every call, to bound the CPU used across them. Each process
+            of a process pool builds and caches warp maps of its own. Defaults to the default executor of
+            the running event loop.
+        max_concurrent_scenes : Optional[int]
+            Most scenes of `image` aligned at once. A memory budget (see `max_memory_bytes`) is split evenly
+            between them. Default is 1.
 
-        aligned_scenes: typing.List[AlignedImage] = []
+        Returns
+        -------
+        List[AlignedImage]
+            A list of namedtuples, each of which describes a scene within `image` that was aligned,
+            in the same order as `scenes` (or as the scenes within `image`, if `scenes` is not specified).
+        """
+        if max_concurrent_scenes < 1:
+            raise ValueError(
+                f"max_concurrent_scenes: must be at least 1. Got: {max_concurrent_scenes}"
+            )
 
-        # Iterate over scenes to align
+        loop = asyncio.get_running_loop()
+        await self.alignment_transform_async(executor)
+        aics_image = await loop.run_in_executor(None, _open_image, image)
+        scene_indices = scenes if scenes else range(len(aics_image.scenes))
+        save_paths = self._save_paths(image, aics_image, scene_indices, output_format)
+        align_scene = self._scene_aligner(
+            channels_to_shift,
+            timepoints,
+            crop_output,
+            interpolation,
+            workers,
+            translation_tolerance,
+            writer_options,
+            output_channels,
+            min(max_concurrent_scenes, len(scene_indices)),
+        )
+        in_flight = asyncio.Semaphore(max_concurrent_scenes)
+
+        async def align_scene_async(
+            scene: int, save_path: pathlib.Path
+        ) -> AlignedImage:
+            async with in_flight:
+                return await _align_scene_async(
+                    image, scene, save_path, executor, **align_scene.keywords
+                )
+
+        tasks = [
+            asyncio.ensure_future(align_scene_async(scene, save_path))
+            for scene, save_path in zip(scene_indices, save_paths)
+        ]
+        try:
+            return list(await asyncio.gather(*tasks))
+        finally:
+            # If a scene failed or this was cancelled, cancel the scenes still in flight,
+            # and wait for them to discard their partial output
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def align_images(
+        self,
+        images: typing.Sequence[typing.Union[str, pathlib.Path]],
+        channels_to_shift: typing.List[int],
+        scenes: typing.List[int] = [],
+        timepoints: typing.List[int] = [],
+        crop_output: bool = True,
+        interpolation: int = 0,
+        workers: int = 1,
+        translation_tolerance: float = 0.0,
+        output_format: str = "ome.tiff",
+        writer_options: typing.Optional[typing.Dict[str, typing.Any]] = None,
+        max_workers: int = 1,
+        output_channels: typing.List[int] = [],
+        resume: bool = False,
+        verify_input: bool = False,
+    ) -> typing.List[ImageAlignmentResult]:
+        """Batch version of `align_image`: align many `images` using the same alignment transform.
+
+        Every (image, scene) pair is an independent unit of work. With `max_workers` above 1, units of all of the
+        `images` are spread across one pool of processes, so that e.g. many single-scene images are aligned in
+        parallel as well as the scenes of one multi-scene image. Each process sees only the alignment matrix and
+        keeps its warp maps (see `camera_alignment_core.alignment_core.WARP_MAP_CACHE`) across units.
+
+        Failure to align one image does not stop the others: errors are reported per image.
+        See `align_scenes` for results per (image, scene) unit instead.
+
+        Parameters
+        ----------
+        images : Sequence[Union[str, Path]]
+            Microscopy images that require alignment. Each is passed as-is to aicsimageio.AICSImage constructor.
+        channels_to_shift : List[int]
+            Index positions of channels within each image that should be shifted. N.b.: indices start at 0.
+
+        Keyword Arguments
+        -----------------
+        See `align_image`. `scenes` and `timepoints` apply to every image.
+
+        Returns
+        -------
+        List[ImageAlignmentResult]
+            A list of namedtuples, one per image of `images` in the same order, each of which describes the scenes
+            of the image that were aligned and the error, if any, that prevented the rest from being aligned.
+        """
+        aligned_scenes: typing.List[typing.List[AlignedImage]] = [[] for _ in images]
+        errors: typing.List[typing.Optional[BaseException]] = [None for _ in images]
+        for image_index, result in self._align_units(
+            images,
+            channels_to_shift,
+            scenes,
+            timepoints,
+            crop_output,
+            interpolation,
+            workers,
+            translation_tolerance,
+            output_format,
+            writer_options,
+            max_workers,
+            output_channels,
+            resume,
+            verify_input,
+        ):
+            if result.error is not None:
+                errors[image_index] = errors[image_index] or result.error
+            elif result.scene is not None and result.path is not None:
+                aligned_scenes[image_index].append(
+                    AlignedImage(result.scene, result.path)
+                )
+
+        return [
+            ImageAlignmentResult(image, image_aligned_scenes, error)
+            for image, image_aligned_scenes, error in zip(
+                images, aligned_scenes, errors
+            )
+        ]
+
+    def align_scenes(
+        self,
+        images: typing.Sequence[typing.Union[str, pathlib.Path]],
+        channels_to_shift: typing.List[int],
+        scenes: typing.List[int] = [],
+        timepoints: typing.List[int] = [],
+        crop_output: bool = True,
+        interpolation: int = 0,
+        workers: int = 1,
+        translation_tolerance: float = 0.0,
+        output_format: str = "ome.tiff",
+        writer_options: typing.Optional[typing.Dict[str, typing.Any]] = None,
+        max_workers: int = 1,
+        output_channels: typing.List[int] = [],
+        resume: bool = False,
+        verify_input: bool = False,
+    ) -> typing.Iterator[SceneAlignmentResult]:
+        """Version of `align_images` that reports on every (image, scene) unit of work, as soon as it is done.
+
+        Units are aligned as by `align_images`, and their results are yielded in the order of `images` and
+        of the scenes within each, each once it and the units before it are done. Every result records how long
+        its unit took and the error, if any, that it failed with; an image that cannot be opened yields
+        a single result, with no scene. Stopping iteration early cancels units that have not yet started.
+
+        Parameters
+        ----------
+        images : Sequence[Union[str, Path]]
+            Microscopy images that require alignment. Each is passed as-is to aicsimageio.AICSImage constructor.
+        channels_to_shift : List[int]
+            Index positions of channels within each image that should be shifted. N.b.: indices start at 0.
+
+        Keyword Arguments
+        -----------------
+        See `align_image`. `scenes` and `timepoints` apply to every image.
+
+        Returns
+        -------
+        Iterator[SceneAlignmentResult]
+        """
+        for _, result in self._align_units(
+            images,
+            channels_to_shift,
+            scenes,
+            timepoints,
+            crop_output,
+            interpolation,
+            workers,
+            translation_tolerance,
+            output_format,
+            writer_options,
+            max_workers,
+            output_channels,
+            resume,
+            verify_input,
+        ):
+            yield result
+
+    def _align_units(
+        self,
+        images: typing.Sequence[typing.Union[str, pathlib.Path]],
+        channels_to_shift: typing.List[int],
+        scenes: typing.List[int],
+        timepoints: typing.List[int],
+        crop_output: bool,
+        interpolation: int,
+        workers: int,
+        translation_tolerance: float,
+        output_format: str,
+        writer_options: typing.Optional[typing.Dict[str, typing.Any]],
+        max_workers: int,
+        output_channels: typing.List[int],
+        resume: bool,
+        verify_input: bool,
+    ) -> typing.Iterator[typing.Tuple[int, SceneAlignmentResult]]:
+        """Align every (image, scene) unit of `images`, yielding the index of its image along with its result.
+        See `align_scenes`.
+        """
+        if max_workers < 1:
+            raise ValueError(f"max_workers: must be at least 1. Got: {max_workers}")
+
+        align_scene = self._scene_aligner(
+            channels_to_shift,
+            timepoints,
+            crop_output,
+            interpolation,
+            workers,
+            translation_tolerance,
+            writer_options,
+            output_channels,
+            max_workers,
+        )
+
+        executor = (
+            concurrent.futures.ProcessPoolExecutor(max_workers=max_workers)
+            if max_workers > 1
+            else None
+        )
+        manifest = ResumeManifest(self._out_dir) if resume else None
+
+        def schedule(
+            image: typing.Union[str, pathlib.Path],
+        ) -> typing.Iterator[
+            typing.Tuple[
+                "concurrent.futures.Future[SceneAlignmentResult]",
+                typing.Optional[AlignmentUnit],
+            ]
+        ]:
+            """Futures of the results of the scenes of `image`, each with its unit if resuming.
+            Without a pool, each scene is instead aligned as it is scheduled.
+            """
+            start = time.perf_counter()
+            try:
+                aics_image = _open_image(image)
+                scene_indices = scenes if scenes else range(len(aics_image.scenes))
+                save_paths = self._save_paths(
+                    image, aics_image, scene_indices, output_format
+                )
+                units: typing.List[typing.Optional[AlignmentUnit]] = (
+                    self._alignment_units(
+                        image, scene_indices, save_paths, align_scene, verify_input
+                    )
+                    if manifest is not None
+                    else [None] * len(save_paths)
+                )
+            except image_errors() as error:
+                log.error("Failed to open %s: %r", image, error)
+                yield _completed_future(
+                    SceneAlignmentResult(
+                        image, None, None, time.perf_counter() - start, error
+                    )
+                ), None
+                return
+
+            for scene, save_path, unit in zip(scene_indices, save_paths, units):
+                if (
+                    manifest is not None
+                    and unit is not None
+                    and manifest.is_complete(unit)
+                ):
+                    log.info("Skipping scene %s of %s: already aligned", scene, image)
+                    yield _completed_future(
+                        SceneAlignmentResult(
+                            image, scene, save_path, 0.0, None, skipped=True
+                        )
+                    ), None
+                elif executor is None:
+                    yield _completed_future(
+                        _align_unit(image, aics_image, align_scene, scene, save_path)
+                    ), unit
+                else:
+                    yield executor.submit(
+                        _align_unit, image, None, align_scene, scene, save_path
+                    ), unit
+
+        def completed(
+            future: "concurrent.futures.Future[SceneAlignmentResult]",
+            unit: typing.Optional[AlignmentUnit],
+        ) -> SceneAlignmentResult:
+            # Each scene is recorded as soon as it is aligned, so that an interrupted run can resume from it
+            result = future.result()
+            if manifest is not None and unit is not None and result.error is None:
+                manifest.record(unit)
+            return result
+
+        scheduled: typing.List[
+            typing.Tuple[
+                int,
+                "concurrent.futures.Future[SceneAlignmentResult]",
+                typing.Optional[AlignmentUnit],
+            ]
+        ] = []
+        try:
+            if executor is None:
+                for image_index, image in enumerate(images):
+                    for future, unit in schedule(image):
+                        yield image_index, completed(future, unit)
+                return
+
+            # Schedule every scene of every image up front, so that the pool is kept busy throughout
+            scheduled = [
+                (image_index, future, unit)
+                for image_index, image in enumerate(images)
+                for future, unit in schedule(image)
+            ]
+            for image_index, future, unit in scheduled:
+                yield image_index, completed(future, unit)
+        finally:
+            if executor is not None:
+                for _, future, _ in scheduled:
+                    future.cancel()
+                executor.shutdown()
+
+    def _save_paths(
+        self,
+        image: typing.Union[str, pathlib.Path],
+        aics_image: "AICSImage",
+        scene_indices: typing.Sequence[int],
+        output_format: str,
+    ) -> typing.List[pathlib.Path]:
+        """Paths to save the aligned `scene_indices` of `image` to."""
+        # Save output of aligning each scene into its own file.
+        # In general, expect multi-scene images as input. Input may, however, be single scene image.
+        # In the case of a single scene image file, **assume** the filename already contains the scene name,
+        # e.g. "3500004473_100X_20210430_1c-Scene-24-P96-G06.czi."
+        # Unfortunately, cannot check `if scene in input_image_path.stem`:
+        # that assumes too much conformance between how the scene is named in the filename
+        # and how AICSImageIO deals with scene naming.
+        stem, *_ = pathlib.Path(image).name.split(".")
+        return [
+            pathlib.Path(self._out_dir)
+            / (
+                f"{stem}_aligned.{output_format}"
+                if len(aics_image.scenes) == 1
+                else f"{stem}_Scene-{scene}_aligned.{output_format}"
+            )
+            for scene in scene_indices
+        ]
+
+    def _alignment_units(
+        self,
+        image: typing.Union[str, pathlib.Path],
+        scene_indices: typing.Sequence[int],
+        save_paths: typing.Sequence[pathlib.Path],
+        align_scene: "functools.partial[AlignedImage]",
+        verify_input: bool,
+    ) -> typing.List[typing.Optional[AlignmentUnit]]:
+        """Identities of aligning `scene_indices` of `image` to `save_paths` with `align_scene`, for resuming.
+        None for every scene if `image` cannot be identified across runs (see `input_checksum`).
+        """
+        # Options that make no difference to the aligned image are left out, so that e.g. a run resumed
+        # with more workers skips what an earlier run already aligned
+        options = {
+            name: value
+            for name, value in align_scene.keywords.items()
+            if name
+            not in ("alignment_matrix", "timepoints", "workers", "max_memory_bytes")
+        }
+        options_checksum = hashlib.sha256(
+            json.dumps(options, sort_keys=True, default=repr).encode()
+        ).hexdigest()
+        image_checksum = input_checksum(image, verify_content=verify_input)
+        if image_checksum is None:
+            log.warning(
+                "Aligning every scene of %s: only local images can be resumed", image
+            )
+            return [None] * len(save_paths)
+
+        matrix_checksum = transform_checksum(align_scene.keywords["alignment_matrix"])
+        return [
+            AlignmentUnit(
+                image_checksum,
+                scene,
+                tuple(align_scene.keywords["timepoints"]),
+                matrix_checksum,
+                options_checksum,
+                str(save_path.relative_to(self._out_dir)),
+            )
+            for scene, save_path in zip(scene_indices, save_paths)
+        ]
+
+    def _scene_aligner(
+        self,
+        channels_to_shift: typing.List[int],
+        timepoints: typing.List[int],
+        crop_output: bool,
+        interpolation: int,
+        workers: int,
+        translation_tolerance: float,
+        writer_options: typing.Optional[typing.Dict[str, typing.Any]],
+        output_channels: typing.List[int],
+        processes: int,
+    ) -> "functools.partial[AlignedImage]":
+        """Picklable function that aligns one scene of an image with this instance's alignment transform.
+        The memory budget, if any, is split evenly between `processes` scenes aligned at once.
+        """
+        return functools.partial(
+            _align_scene,
+            alignment_matrix=self.alignment_transform.matrix,
+            magnification=self._magnification,
+            channels_to_shift=channels_to_shift,
+            timepoints=timepoints,
+            crop_output=crop_output,
+            interpolation=interpolation,
+            workers=workers,
+            translation_tolerance=translation_tolerance,
+            writer_options=writer_options,
+            output_channels=output_channels,
+            max_memory_bytes=(
+                self._max_memory_bytes // processes
+                if self._max_memory_bytes is not None
+                else None
+            ),
+        )
+
+    def align_image_lazy(
+        self,
+        image: typing.Union[str, pathlib.Path],
+        channels_to_shift: typing.List[int],
+        scenes: typing.List[int] = [],
+        crop_output: bool = True,
+        interpolation: int = 0,
+        translation_tolerance: float = 0.0,
+        output_channels: typing.List[int] = [],
+    ) -> typing.List[LazyAlignedImage]:
+        """Lazy counterpart of `align_image`: rather than aligning and saving scenes to file, return a dask array
+        per scene that is aligned chunk by chunk, only as and when it is computed.
+
+        Useful when only part of the aligned image is needed (e.g., a few timepoints or a max projection),
+        or to store the aligned image somewhere other than an OME-TIFF file. Nothing is read from `image`
+        or resampled until (part of) a returned array is computed; only what is needed for it is.
+
+        Parameters
+        ----------
+        image : Union[str, Path]
+            Microscopy image that requires alignment. Passed as-is to aicsimageio.AICSImage constructor.
+        channels_to_shift : List[int]
+            Index positions of channels within `image` that should be shifted. N.b.: indices start at 0.
+            E.g.: Specify [0, 2] to apply the alignment transform to channels at index positions 0 and 2 within `image`.
+
+        Keyword Arguments
+        -----------------
+        scenes : Optional[List[int]]
+            Which scene or scenes within `image` to align. If not specified, will align all scenes within `image`.
+            Specify as list of 0-index scene indices within `image`.
+        crop_output : Optional[bool]
+            Optional flag for toggling whether to crop aligned image according to standard dimensions
+            for the magnification at which the image was acquired. Defaults to `True`, which means,
+            "yes, crop the image." Unlike `align_image`, no warning is logged for black pixels left within
+            the cropped image, as that would require computing it.
+        interpolation : Optional[int]
+            Interpolation order to use when applying the alignment transform. Default is 0.
+        translation_tolerance : Optional[float]
+            Largest error, in pixels, accepted for applying the alignment transform as a pure translation.
+            Default is 0. See `camera_alignment_core.alignment_core.align_image`.
+        output_channels : Optional[List[int]]
+            Which channels of `image`, and in which order, to include in the output. See `align_image`.
+
+        Returns
+        -------
+        List[LazyAlignedImage]
+            A list of namedtuples, each of which holds the lazily aligned TCZYX data of a scene within `image`.
+        """
+        aics_image = _open_image(image)
+
+        lazy_scenes: typing.List[LazyAlignedImage] = []
         scene_indices = scenes if scenes else range(len(aics_image.scenes))
         for scene in scene_indices:
-            # Operate on current scene
             aics_image.set_scene(scene)
 
-            # Align timepoints within scene
-            processed_timepoints: typing.List[
-                numpy.typing.NDArray[numpy.uint16]
-            ] = list()
-            timepoint_indices = (
-                timepoints if timepoints else range(0, aics_image.dims.T)
+            plane_shape = (aics_image.dims.Y, aics_image.dims.X)
+            window = (
+                crop_window(plane_shape, self._magnification) if crop_output else None
             )
-            for timepoint in timepoint_indices:
-                image_slice = aics_image.get_image_data("CZYX", T=timepoint)
-                processed = align_image(
-                    image_slice,
+            channel_indices = (
+                output_channels if output_channels else list(range(aics_image.dims.C))
+            )
+            channel_positions_to_shift = [
+                position
+                for position, channel_index in enumerate(channel_indices)
+                if channel_index in channels_to_shift
+            ]
+            image_data = aics_image.get_image_dask_data("TCZYX", C=channel_indices)
+            if channel_positions_to_shift:
+                data = align_image_lazy(
+                    image_data,
                     self.alignment_transform.matrix,
-                    channels_to_shift,
+                    channel_positions_to_shift,
                     interpolation,
+                    output_window=window,
+                    translation_tolerance=translation_tolerance,
+                )
+            else:
+                # None of the channels to output need shifting
+                y_slice, x_slice = (window or PlaneWindow(0, 0, *plane_shape)).slices()
+                data = image_data[..., y_slice, x_slice]
+            lazy_scenes.append(LazyAlignedImage(scene, data))
+
+        return lazy_scenes
+
+
+def _completed_future(
+    result: SceneAlignmentResult,
+) -> "concurrent.futures.Future[SceneAlignmentResult]":
+    """Wrap `result` in a Future as if it had been computed by a pool."""
+    future: "concurrent.futures.Future[SceneAlignmentResult]" = (
+        concurrent.futures.Future()
+    )
+    future.set_result(result)
+    return future
+
+
+def _align_unit(
+    image: typing.Union[str, pathlib.Path],
+    aics_image: typing.Optional["AICSImage"],
+    align_scene: typing.Callable[["AICSImage", int, pathlib.Path], AlignedImage],
+    scene: int,
+    save_path: pathlib.Path,
+) -> SceneAlignmentResult:
+    """Align one scene of `image`, timing it and returning any error rather than raising it.
+    Opens `image` if it is not already open as `aics_image`, as in worker processes of `Align.align_scenes`.
+    """
+    start = time.perf_counter()
+    try:
+        aligned_scene = align_scene(
+            aics_image if aics_image is not None else _open_image(image),
+            scene,
+            save_path,
+        )
+        return SceneAlignmentResult(
+            image, scene, aligned_scene.path, time.perf_counter() - start, None
+        )
+    except image_errors() as error:
+        log.error("Failed to align scene %s of %s: %r", scene, image, error)
+        return SceneAlignmentResult(
+            image, scene, None, time.perf_counter() - start, error
+        )
+
+
+def _align_scene_of_image(
+    image: typing.Union[str, pathlib.Path],
+    align_scene: typing.Callable[["AICSImage", int, pathlib.Path], AlignedImage],
+    scene: int,
+    save_path: pathlib.Path,
+) -> AlignedImage:
+    """Entry point of worker processes of `Align.align_image`: open `image` and align one of its scenes."""
+    return align_scene(_open_image(image), scene, save_path)
+
+
+def _open_image(image: typing.Union[str, pathlib.Path]) -> "AICSImage":
+    from aicsimageio import AICSImage
+
+    return AICSImage(image)
+
+
+class _SceneLayout(typing.NamedTuple):
+    # Channels of the image to read and output
+    channel_indices: typing.List[int]
+
+    # Positions among `channel_indices` of the channels to shift
+    channel_positions_to_shift: typing.List[int]
+
+    # YX shape of the scene
+    plane_shape: typing.Tuple[int, int]
+
+    # Region of the plane to crop the aligned scene to; None if not cropping
+    window: typing.Optional[PlaneWindow]
+
+    # Timepoints of the scene to align
+    timepoint_indices: typing.Sequence[int]
+
+    @property
+    def output_window(self) -> PlaneWindow:
+        """Region of the plane that is output."""
+        return self.window or PlaneWindow(0, 0, *self.plane_shape)
+
+
+def _prepare_scene(
+    aics_image: "AICSImage",
+    scene: int,
+    save_path: pathlib.Path,
+    magnification: Magnification,
+    channels_to_shift: typing.List[int],
+    timepoints: typing.List[int],
+    crop_output: bool,
+    writer_options: typing.Optional[typing.Dict[str, typing.Any]],
+    output_channels: typing.List[int],
+) -> typing.Tuple[_SceneLayout, ImageWriter]:
+    """Make `scene` the current scene of `aics_image`, and work out from its dimensions what of it to read and align,
+    and the writer of its output to `save_path`. Nothing is read but metadata. See `Align.align_image`.
+    """
+    # Operate on current scene
+    aics_image.set_scene(scene)
+
+    # Only the channels to output are read; channels to shift are given by their position among those
+    channel_indices = (
+        output_channels if output_channels else list(range(aics_image.dims.C))
+    )
+    channel_positions_to_shift = [
+        position
+        for position, channel_index in enumerate(channel_indices)
+        if channel_index in channels_to_shift
+    ]
+
+    # When cropping, only the pixels within the cropping dimensions are ever resampled
+    plane_shape = (aics_image.dims.Y, aics_image.dims.X)
+    layout = _SceneLayout(
+        channel_indices,
+        channel_positions_to_shift,
+        plane_shape,
+        crop_window(plane_shape, magnification) if crop_output else None,
+        timepoints if timepoints else range(0, aics_image.dims.T),
+    )
+    writer = image_writer_factory(
+        save_path,
+        shape=(
+            len(layout.timepoint_indices),
+            len(channel_indices),
+            aics_image.dims.Z,
+            *layout.output_window.shape,
+        ),
+        dtype=numpy.uint16,
+        channel_names=[
+            aics_image.channel_names[channel_index] for channel_index in channel_indices
+        ],
+        **(writer_options or {}),
+    )
+    return layout, writer
+
+
+def _plan_scene_memory(
+    aics_image: "AICSImage",
+    scene: int,
+    layout: _SceneLayout,
+    writer: ImageWriter,
+    max_memory_bytes: int,
+    interpolation: int,
+    workers: int,
+) -> MemoryPlan:
+    """Decide from the dimensions of the current scene of `aics_image` how much of it to hold in memory at once,
+    before reading any of it. See `camera_alignment_core.memory_plan.plan_memory`.
+    """
+    plan = plan_memory(
+        max_memory_bytes,
+        (len(layout.channel_indices), aics_image.dims.Z, *layout.plane_shape),
+        (len(layout.channel_indices), aics_image.dims.Z, *layout.output_window.shape),
+        aics_image.dtype,
+        interpolation,
+        shift=bool(layout.channel_positions_to_shift),
+        workers=workers,
+        writer_buffer_nbytes=writer.buffer_nbytes,
+    )
+    log.info(
+        "Aligning scene %s into %s within %s bytes: %s",
+        scene,
+        writer.uri,
+        max_memory_bytes,
+        plan,
+    )
+    return plan
+
+
+def _align_scene(
+    aics_image: "AICSImage",
+    scene: int,
+    save_path: pathlib.Path,
+    alignment_matrix: numpy.typing.NDArray[numpy.float16],
+    magnification: Magnification,
+    channels_to_shift: typing.List[int],
+    timepoints: typing.List[int],
+    crop_output: bool,
+    interpolation: int,
+    workers: int,
+    translation_tolerance: float,
+    writer_options: typing.Optional[typing.Dict[str, typing.Any]],
+    output_channels: typing.List[int],
+    max_memory_bytes: typing.Optional[int] = None,
+) -> AlignedImage:
+    """Align `scene` of `aics_image` and save it to `save_path`. See `Align.align_image`."""
+    layout, writer = _prepare_scene(
+        aics_image,
+        scene,
+        save_path,
+        magnification,
+        channels_to_shift,
+        timepoints,
+        crop_output,
+        writer_options,
+        output_channels,
+    )
+
+    # Align timepoints within scene. Each is written out as soon as it is aligned, while the next is aligned and
+    # the one after that is read, so only a few timepoints of the scene are held in memory at a time.
+    # With a memory budget, decide from the dimensions of the scene how much of it to hold in memory at once,
+    # before reading any of it
+    pipelined = True
+    if max_memory_bytes is not None:
+        plan = _plan_scene_memory(
+            aics_image, scene, layout, writer, max_memory_bytes, interpolation, workers
+        )
+        if plan.tile_shape is not None:
+            writer.write(
+                _align_timepoints_tiled(
+                    aics_image,
+                    layout.timepoint_indices,
+                    layout.channel_indices,
+                    alignment_matrix,
+                    layout.channel_positions_to_shift,
+                    layout.output_window,
+                    interpolation,
+                    plan.tile_shape,
+                    scratch_dir=save_path.parent,
                 )
-                if crop_output:
-                    processed_timepoints.append(crop(processed, self._magnification))
-                else:
-                    processed_timepoints.append(processed)
-
-            # Collect all newly aligned timepoints for this scene into one file and save output
-            # In general, expect multi-scene images as input. Input may, however, be single scene image.
-            # In the case of a single scene image file, **assume** the filename already contains the scene name,
-            # e.g. "3500004473_100X_20210430_1c-Scene-24-P96-G06.czi."
-            # Unfortunately, cannot check `if scene in input_image_path.stem`:
-            # that assumes too much conformance between how the scene is named in the filename
-            # and how AICSImageIO deals with scene naming.
-            stem, *_ = pathlib.Path(image).name.split(".")
-            out_name = (
-                f"{stem}_aligned.ome.tiff"
-                if len(aics_image.scenes) == 1
-                else f"{stem}_Scene-{scene}_aligned.ome.tiff"
             )
-            save_path = pathlib.Path(self._out_dir) / out_name
-            processed_image_data = numpy.stack(processed_timepoints)  # TCZYX
-            OmeTiffWriter.save(
-                data=processed_image_data,
-                uri=save_path,
-                channel_names=aics_image.channel_names,
-                dim_order="TCZYX",
+            return AlignedImage(scene, save_path)
+
+        pipelined = plan.pipelined
+        workers = plan.workers
+
+    # Every timepoint within a scene shares the same YX shape, and scenes usually share the shape of the
+    # optical control, so the warp map is only built the first time a shape is seen (see WARP_MAP_CACHE)
+    warp_map = WARP_MAP_CACHE.get(
+        alignment_matrix,
+        layout.plane_shape,
+        interpolation,
+        output_window=layout.window,
+        translation_tolerance=translation_tolerance,
+    )
+    writer.write(
+        _align_timepoints(
+            aics_image,
+            layout.timepoint_indices,
+            output_channels,
+            alignment_matrix,
+            magnification,
+            layout.channel_positions_to_shift,
+            warp_map,
+            crop_output,
+            interpolation,
+            workers,
+            pipelined,
+        )
+    )
+    return AlignedImage(scene, save_path)
+
+
+async def _align_scene_async(
+    image: typing.Union[str, pathlib.Path],
+    scene: int,
+    save_path: pathlib.Path,
+    executor: typing.Optional[concurrent.futures.Executor],
+    alignment_matrix: numpy.typing.NDArray[numpy.float16],
+    magnification: Magnification,
+    channels_to_shift: typing.List[int],
+    timepoints: typing.List[int],
+    crop_output: bool,
+    interpolation: int,
+    workers: int,
+    translation_tolerance: float,
+    writer_options: typing.Optional[typing.Dict[str, typing.Any]],
+    output_channels: typing.List[int],
+    max_memory_bytes: typing.Optional[int] = None,
+) -> AlignedImage:
+    """Asyncio counterpart of `_align_scene`: align `scene` of `image`, opening its own reader of `image`,
+    and save it to `save_path`. See `Align.align_image_async`.
+    """
+    loop = asyncio.get_running_loop()
+    aics_image = await loop.run_in_executor(None, _open_image, image)
+    layout, writer = await loop.run_in_executor(
+        None,
+        functools.partial(
+            _prepare_scene,
+            aics_image,
+            scene,
+            save_path,
+            magnification,
+            channels_to_shift,
+            timepoints,
+            crop_output,
+            writer_options,
+            output_channels,
+        ),
+    )
+
+    pipelined = True
+    if max_memory_bytes is not None:
+        plan = _plan_scene_memory(
+            aics_image, scene, layout, writer, max_memory_bytes, interpolation, workers
+        )
+        if plan.tile_shape is not None:
+            # Tiles are staged through scratch files by a generator, so each timepoint is aligned on a thread
+            tiled_timepoints = _align_timepoints_tiled(
+                aics_image,
+                layout.timepoint_indices,
+                layout.channel_indices,
+                alignment_matrix,
+                layout.channel_positions_to_shift,
+                layout.output_window,
+                interpolation,
+                plan.tile_shape,
+                scratch_dir=save_path.parent,
             )
-            aligned_scenes.append(AlignedImage(scene, save_path))
+            await _write_async(writer, _iterate_async(tiled_timepoints))
+            return AlignedImage(scene, save_path)
+
+        pipelined = plan.pipelined
+        workers = plan.workers
+
+    # Picklable, so that `executor` may be a process pool: each process builds (and caches) the warp map itself
+    align_timepoint = functools.partial(
+        _align_timepoint_with_cached_warp_map,
+        alignment_matrix=alignment_matrix,
+        magnification=magnification,
+        channels_to_shift=layout.channel_positions_to_shift,
+        window=layout.window,
+        crop_output=crop_output,
+        interpolation=interpolation,
+        workers=workers,
+        translation_tolerance=translation_tolerance,
+    )
+    await _write_async(
+        writer,
+        _align_timepoints_async(
+            aics_image,
+            layout.timepoint_indices,
+            output_channels,
+            align_timepoint,
+            executor,
+        ),
+        pipelined,
+    )
+    return AlignedImage(scene, save_path)
+
+
+def _align_timepoint(
+    image_slice: numpy.typing.NDArray[numpy.uint16],
+    alignment_matrix: numpy.typing.NDArray[numpy.float16],
+    magnification: Magnification,
+    channels_to_shift: typing.List[int],
+    warp_map: WarpMap,
+    crop_output: bool,
+    interpolation: int,
+    workers: int,
+) -> numpy.typing.NDArray[numpy.uint16]:
+    """Align `channels_to_shift` of the CZYX `image_slice` (of one timepoint) with `warp_map`, then crop it
+    if `crop_output`.
+    """
+    if not channels_to_shift:
+        # None of the channels read need shifting
+        y_slice, x_slice = warp_map.output_window.slices()
+        return numpy.ascontiguousarray(image_slice[..., y_slice, x_slice])
+
+    if crop_output:
+        return align_and_crop(
+            image_slice,
+            alignment_matrix,
+            channels_to_shift,
+            magnification,
+            interpolation,
+            warp_map=warp_map,
+            workers=workers,
+        )
+
+    return align_image(
+        image_slice,
+        alignment_matrix,
+        channels_to_shift,
+        interpolation,
+        warp_map=warp_map,
+        workers=workers,
+    )
+
+
+def _align_timepoint_with_cached_warp_map(
+    image_slice: numpy.typing.NDArray[numpy.uint16],
+    alignment_matrix: numpy.typing.NDArray[numpy.float16],
+    magnification: Magnification,
+    channels_to_shift: typing.List[int],
+    window: typing.Optional[PlaneWindow],
+    crop_output: bool,
+    interpolation: int,
+    workers: int,
+    translation_tolerance: float,
+) -> numpy.typing.NDArray[numpy.uint16]:
+    """`_align_timepoint`, with the warp map for the shape of `image_slice` from WARP_MAP_CACHE (of the process
+    this runs in), rather than one passed in.
+    """
+    warp_map = WARP_MAP_CACHE.get(
+        alignment_matrix,
+        (image_slice.shape[-2], image_slice.shape[-1]),
+        interpolation,
+        output_window=window,
+        translation_tolerance=translation_tolerance,
+    )
+    return _align_timepoint(
+        image_slice,
+        alignment_matrix,
+        magnification,
+        channels_to_shift,
+        warp_map,
+        crop_output,
+        interpolation,
+        workers,
+    )
+
+
+def _read_timepoint(
+    aics_image: "AICSImage",
+    timepoint: int,
+    channel_indices: typing.List[int],
+) -> numpy.typing.NDArray[numpy.uint16]:
+    """Read `timepoint` of the current scene of `aics_image` as a CZYX array. See `_align_timepoints`.
+
+    Only the chunks of `timepoint` and of `channel_indices` (all channels, if empty) are read and decoded:
+    unlike `AICSImage.get_image_data`, which loads (and keeps) the whole scene on the first read, whatever is
+    selected, so that memory use and I/O would grow with the number of timepoints and channels of the scene.
+    """
+    channel_selection = {"C": channel_indices} if channel_indices else {}
+    return aics_image.get_image_dask_data(
+        "CZYX", T=timepoint, **channel_selection
+    ).compute()
+
+
+def _align_timepoints(
+    aics_image: "AICSImage",
+    timepoint_indices: typing.Sequence[int],
+    channel_indices: typing.List[int],
+    alignment_matrix: numpy.typing.NDArray[numpy.float16],
+    magnification: Magnification,
+    channels_to_shift: typing.List[int],
+    warp_map: WarpMap,
+    crop_output: bool,
+    interpolation: int,
+    workers: int,
+    pipelined: bool = True,
+) -> typing.Iterator[numpy.typing.NDArray[numpy.uint16]]:
+    """Lazily read and align `timepoint_indices` of the current scene of `aics_image`, yielding CZYX arrays.
+    Only `channel_indices` (all channels, if empty) are read, and `channels_to_shift` are positions among those.
+
+    If `pipelined`, reading and aligning run on background threads, each one timepoint ahead of the next stage:
+    while the consumer (e.g., an `ImageWriter`) writes timepoint T-1, timepoint T is aligned and timepoint T+1
+    is read. Otherwise, each timepoint is read and aligned only once the consumer is done with the previous one.
+    Either way, each timepoint is read from `aics_image` only as it is needed (see `_read_timepoint`).
+    """
+    align_timepoint = functools.partial(
+        _align_timepoint,
+        alignment_matrix=alignment_matrix,
+        magnification=magnification,
+        channels_to_shift=channels_to_shift,
+        warp_map=warp_map,
+        crop_output=crop_output,
+        interpolation=interpolation,
+        workers=workers,
+    )
+    image_slices: typing.Iterable[numpy.typing.NDArray[numpy.uint16]] = (
+        _read_timepoint(aics_image, timepoint, channel_indices)
+        for timepoint in timepoint_indices
+    )
+    if not pipelined:
+        return (align_timepoint(image_slice) for image_slice in image_slices)
+
+    image_slices = _prefetch(image_slices)
+    return _prefetch(align_timepoint(image_slice) for image_slice in image_slices)
+
+
+async def _align_timepoints_async(
+    aics_image: "AICSImage",
+    timepoint_indices: typing.Sequence[int],
+    channel_indices: typing.List[int],
+    align_timepoint: typing.Callable[
+        [numpy.typing.NDArray[numpy.uint16]], numpy.typing.NDArray[numpy.uint16]
+    ],
+    executor: typing.Optional[concurrent.futures.Executor],
+) -> typing.AsyncIterator[numpy.typing.NDArray[numpy.uint16]]:
+    """Asyncio counterpart of `_align_timepoints`: read each of `timepoint_indices` of the current scene of
+    `aics_image` on a thread, then align it with `align_timepoint` on `executor` (the event loop's default executor
+    if None). Cancellation takes effect between (or while awaiting) these steps.
+    """
+    loop = asyncio.get_running_loop()
+    for timepoint in timepoint_indices:
+        image_slice = await loop.run_in_executor(
+            None, _read_timepoint, aics_image, timepoint, channel_indices
+        )
+        yield await loop.run_in_executor(executor, align_timepoint, image_slice)
+
+
+def _align_timepoints_tiled(
+    aics_image: "AICSImage",
+    timepoint_indices: typing.Sequence[int],
+    channel_indices: typing.List[int],
+    alignment_matrix: numpy.typing.NDArray[numpy.float16],
+    channels_to_shift: typing.List[int],
+    output_window: PlaneWindow,
+    interpolation: int,
+    tile_shape: typing.Tuple[int, int],
+    scratch_dir: pathlib.Path,
+) -> typing.Iterator[numpy.typing.NDArray[numpy.uint16]]:
+    """Out-of-core counterpart of `_align_timepoints`, for when a whole timepoint does not fit in memory.
+
+    Each timepoint is read into a scratch file in `scratch_dir` a channel at a time (rather than loading the whole
+    scene, as `AICSImage.get_image_data` does), then aligned into another in tiles of `tile_shape`
+    (see `camera_alignment_core.alignment_core.align_image_tiled`) of `output_window` only: no pixel outside of it
+    is resampled or staged. Each scratch file is deleted once nothing refers to it anymore.
+    """
+    shape = (
+        len(channel_indices),
+        aics_image.dims.Z,
+        aics_image.dims.Y,
+        aics_image.dims.X,
+    )
+    for timepoint in timepoint_indices:
+        image_slice = _scratch_array(shape, numpy.uint16, scratch_dir)
+        for position, channel_index in enumerate(channel_indices):
+            image_slice[position] = aics_image.get_image_dask_data(
+                "ZYX", T=timepoint, C=channel_index
+            ).compute()
+
+        aligned_slice: numpy.typing.NDArray[numpy.uint16]
+        if channels_to_shift:
+            aligned_slice = _scratch_array(
+                (*shape[:2], *output_window.shape), numpy.uint16, scratch_dir
+            )
+            align_image_tiled(
+                image_slice,
+                aligned_slice,
+                alignment_matrix,
+                channels_to_shift,
+                interpolation,
+                tile_shape=tile_shape,
+                output_window=output_window,
+            )
+        else:
+            # None of the channels read need shifting
+            y_slice, x_slice = output_window.slices()
+            aligned_slice = image_slice[..., y_slice, x_slice]
+        del image_slice
+
+        yield aligned_slice
+
+
+def _scratch_array(
+    shape: typing.Tuple[int, ...],
+    dtype: numpy.typing.DTypeLike,
+    directory: pathlib.Path,
+) -> numpy.memmap:
+    """Array of `shape` backed by an anonymous file in `directory` rather than by memory.
+    The file is freed once the array (and every view of it) is garbage collected.
+    """
+    with tempfile.TemporaryFile(dir=directory) as file:
+        return numpy.memmap(file, dtype=dtype, mode="w+", shape=shape)
+
+
+# Marks the end of the items produced by `_prefetch`
+_END_OF_ITEMS = object()
+
+
+def _prefetch(
+    iterable: typing.Iterable[typing.Any], max_items: int = 1
+) -> typing.Generator[typing.Any, None, None]:
+    """Iterate over `iterable` on a background thread, staying up to `max_items` items ahead of the consumer.
+
+    The background thread blocks once `max_items` items are waiting to be consumed, so that a slow consumer holds
+    up the producer rather than items piling up in memory. Exceptions raised by `iterable` are re-raised
+    to the consumer. If the consumer stops early, the background thread stops and `iterable` is closed.
+    """
+    iterator = iter(iterable)
+    items: "queue.Queue[typing.Tuple[typing.Any, typing.Optional[BaseException]]]" = (
+        queue.Queue(maxsize=max_items)
+    )
+    stopped = threading.Event()
+
+    def put(item: typing.Any, error: typing.Optional[BaseException] = None) -> bool:
+        # Wait for room in `items`, giving up if the consumer has stopped
+        while not stopped.is_set():
+            try:
+                items.put((item, error), timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce() -> None:
+        try:
+            for item in iterator:
+                if not put(item):
+                    return
+            put(_END_OF_ITEMS)
+        except BaseException as error:
+            put(None, error)
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    try:
+        while True:
+            item, error = items.get()
+            if error is not None:
+                raise error
+            if item is _END_OF_ITEMS:
+                return
+            yield item
+    finally:
+        stopped.set()
+        producer.join()
+
+
+async def _iterate_async(
+    iterable: typing.Iterable[typing.Any],
+) -> typing.AsyncIterator[typing.Any]:
+    """Iterate over `iterable` from the event loop, producing each item on a thread."""
+    loop = asyncio.get_running_loop()
+    iterator = iter(iterable)
+    while True:
+        item = await loop.run_in_executor(None, next, iterator, _END_OF_ITEMS)
+        if item is _END_OF_ITEMS:
+            return
+        yield item
+
+
+async def _write_async(
+    writer: ImageWriter,
+    timepoints: typing.AsyncIterator[numpy.typing.NDArray],
+    pipelined: bool = True,
+) -> None:
+    """Asyncio counterpart of `writer.write(timepoints)`, consuming `timepoints` from the event loop.
+
+    The writer runs on a thread of its own, handed one timepoint at a time. If `pipelined`, the next timepoint is
+    produced while the last is written; otherwise, only once it has been written. If producing a timepoint fails
+    or is cancelled, or writing fails, the writer is stopped and what it wrote is discarded (see
+    `ImageWriter.write`) before the error is re-raised.
+    """
+    loop = asyncio.get_running_loop()
+    handoff: "asyncio.Queue[typing.Any]" = asyncio.Queue(maxsize=1)
+    written: "asyncio.Future[None]" = loop.create_future()
+
+    def handed_off() -> typing.Iterator[numpy.typing.NDArray]:
+        while True:
+            item = asyncio.run_coroutine_threadsafe(handoff.get(), loop).result()
+            if item is _END_OF_ITEMS:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+            # The writer only asks for the next timepoint once done with this one
+            loop.call_soon_threadsafe(handoff.task_done)
+
+    def settle(error: typing.Optional[BaseException]) -> None:
+        if written.done():
+            return
+        if error is None:
+            written.set_result(None)
+        else:
+            written.set_exception(error)
+
+    def write() -> None:
+        try:
+            writer.write(handed_off())
+        except BaseException as error:
+            loop.call_soon_threadsafe(settle, error)
+        else:
+            loop.call_soon_threadsafe(settle, None)
+
+    async def produce() -> None:
+        try:
+            async for timepoint in timepoints:
+                await handoff.put(timepoint)
+                if not pipelined:
+                    await handoff.join()
+            await handoff.put(_END_OF_ITEMS)
+        except BaseException as error:
+            # Hand the writer the error instead of any timepoint it has yet to take, which stops it
+            while not handoff.empty():
+                handoff.get_nowait()
+            handoff.put_nowait(error)
+            raise
 
-        return aligned_scenes
+    threading.Thread(target=write, daemon=True).start()
+    producer = asyncio.ensure_future(produce())
+    try:
+        await asyncio.shield(written)
+    finally:
+        # If writing failed or this was cancelled, stop producing, and wait for the writer to be done discarding
+        # what it wrote, so that no partial output is left behind; even if cancelled again meanwhile.
+        # Any error producing timepoints was handed to the writer, and so is raised as the writer's.
+        producer.cancel()
+        stopped = asyncio.gather(producer, written, return_exceptions=True)
+        while not stopped.done():
+            try:
+                await asyncio.shield(stopped)
+            except asyncio.CancelledError:
+                pass
@@ -1,16 +1,20 @@
+import concurrent.futures
 import logging
-from typing import List, Tuple
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
 
 import numpy
 import numpy.typing
-import skimage
-import skimage.transform
 
 from .alignment_utils import (
     AlignmentInfo,
-    CropRings,
-    RingAlignment,
-    SegmentRings,
     get_center_z,
 )
 from .constants import LOGGER_NAME, Magnification
@@ -18,9 +22,25 @@ from .exception import (
     IncompatibleImageException,
     UnsupportedMagnification,
 )
+from .warp_map import (
+    PlaneWindow,
+    WarpMap,
+    WarpMapCache,
+    warp_map_factory,
+)
+
+# Deferred imports: dask, scikit-image, and the ring segmentation of `alignment_utils` (scipy, scikit-learn, pandas)
+if TYPE_CHECKING:
+    import dask.array
 
 log = logging.getLogger(LOGGER_NAME)
 
+# Process-wide cache of the sampling maps built by `align_image`, shared by every caller that does not
+# supply its own WarpMap. One alignment matrix is typically applied to many images of a handful of shapes,
+# so only the first image of each shape pays for building the map.
+# Adjust the memory budget with `WARP_MAP_CACHE.max_bytes = ...`; inspect it with `WARP_MAP_CACHE.info()`.
+WARP_MAP_CACHE = WarpMapCache(max_bytes=256 * 1024**2)
+
 
 def generate_alignment_matrix(
     optical_control_image: numpy.typing.NDArray[numpy.uint16],
@@ -37,6 +57,12 @@ def generate_alignment_matrix(
         px_size_xy,
     )
 
+    from .alignment_utils import (
+        CropRings,
+        RingAlignment,
+        SegmentRings,
+    )
+
     if magnification not in [
         supported_magnification.value for supported_magnification in list(Magnification)
     ]:
@@ -106,11 +132,23 @@ def align_image(
     alignment_matrix: numpy.typing.NDArray[numpy.float16],
     channels_to_shift: List[int],
     interpolation: int = 0,
+    warp_map: Optional[WarpMap] = None,
+    workers: int = 1,
+    out: Optional[numpy.typing.NDArray[numpy.uint16]] = None,
+    copy_unshifted: bool = True,
+    output_window: Optional[PlaneWindow] = None,
+    z_range: Optional[Tuple[int, int]] = None,
+    translation_tolerance: float = 0.0,
 ) -> numpy.typing.NDArray[numpy.uint16]:
     """Align a CZYX `image` using `alignment_matrix`.
     Will only apply the `alignment_matrix` to image slices within the channels specified in
     `channels_to_shift`.
 
+    Optionally, only a region of the aligned image (`output_window` and/or `z_range`) is computed.
+    The result is the same as aligning the whole image and slicing out that region afterwards
+    (see `camera_alignment_core.warp_map.MatrixWarpMap` for a caveat regarding interpolation orders 1 and 3),
+    but pixels outside of the region are never resampled.
+
     Parameters
     ----------
     image : numpy.typing.NDArray[numpy.uint16]
@@ -122,6 +160,40 @@ def align_image(
         E.g.: Specify [0, 2] to apply the alignment transform to channels at index positions 0 and 2 within `image`.
     interpolation : int
         Interpolation order to use when applying the alignment transform. Default is 0.
+        For orders above 0, interpolated values are rounded to the nearest integer and clipped to the uint16 range.
+    warp_map : Optional[WarpMap]
+        Precomputed `WarpMap` (see `camera_alignment_core.warp_map.warp_map_factory`) for `alignment_matrix`,
+        the YX shape of `image`, `interpolation` and `output_window`. Pass one in when aligning many images of the
+        same shape (e.g., every timepoint of a scene) to skip the cache lookup. If not provided, one is taken from
+        `WARP_MAP_CACHE`, where it is built on first use.
+    workers : int
+        Number of threads across which to spread the warping. Each shifted channel is resampled as a ZYX volume
+        (see `camera_alignment_core.warp_map.WarpMap.warp_volume`); with more than one worker, each volume is split
+        into blocks of z-slices. The underlying resampling releases the GIL, and every block is written to its own
+        region of the output, so the result is identical to the serial path regardless of `workers`.
+        Default is 1 (serial).
+    out : Optional[numpy.typing.NDArray[numpy.uint16]]
+        Preallocated uint16 CZYX array to write the aligned image into, e.g. to reuse one buffer across many
+        timepoints or scenes. Must have the shape of the output: that of `image`, unless restricted by
+        `output_window` or `z_range`. May be `image` itself to align in place. If not provided,
+        a new array is allocated.
+    copy_unshifted : bool
+        Whether to copy channels that are not in `channels_to_shift` from `image` into the output.
+        Set to False when `out` already holds those channels (e.g., when aligning in place with `out=image`)
+        to leave them untouched. Default is True.
+    output_window : Optional[PlaneWindow]
+        YX region of the aligned image to compute. If not provided, the whole plane is computed.
+    z_range : Optional[Tuple[int, int]]
+        Half-open range, [start, stop), of z-slices to compute. If not provided, all z-slices are computed.
+    translation_tolerance : float
+        Apply `alignment_matrix` as a pure translation, which is much cheaper to resample, if doing so moves no
+        sample by more than this many pixels (see `camera_alignment_core.warp_map.TranslationWarpMap`).
+        Default is 0, i.e., only when `alignment_matrix` is an exact translation. Ignored if `warp_map` is provided.
+
+    Returns
+    -------
+    numpy.typing.NDArray[numpy.uint16]
+        The aligned CZYX image; this is `out` if it was provided.
     """
     if not image.ndim == 4:
         raise IncompatibleImageException(
@@ -133,45 +205,542 @@ def align_image(
             "channels_to_shift: passed an empty list to `align_image`. Cannot determine which channels to shift."
         )
 
-    aligned_image = numpy.empty(image.shape, dtype=numpy.uint16)
-    number_of_channels, *_ = image.shape
+    if workers < 1:
+        raise ValueError(f"workers: must be at least 1. Got: {workers}")
+
+    number_of_channels, number_of_z_slices, *_ = image.shape
+    z_start, z_stop = z_range if z_range is not None else (0, number_of_z_slices)
+    if not 0 <= z_start < z_stop <= number_of_z_slices:
+        raise ValueError(
+            f"z_range: expected a non-empty range within [0, {number_of_z_slices}). Got: {z_range}"
+        )
+
+    plane_shape = image.shape[-2:]
+    if warp_map is None:
+        warp_map = WARP_MAP_CACHE.get(
+            alignment_matrix,
+            plane_shape,
+            interpolation,
+            output_window,
+            translation_tolerance=translation_tolerance,
+        )
+    elif not warp_map.matches(
+        alignment_matrix, plane_shape, interpolation, output_window
+    ):
+        raise ValueError(
+            "warp_map was not built for this alignment_matrix, image shape, interpolation order and output window."
+        )
+
+    output_shape = (number_of_channels, z_stop - z_start, *warp_map.output_shape)
+    if out is None:
+        aligned_image = numpy.empty(output_shape, dtype=numpy.uint16)
+    elif out.shape != output_shape or out.dtype != numpy.uint16:
+        raise ValueError(
+            f"out: expected a uint16 array of shape {output_shape}. Got: {out.dtype} array of shape {out.shape}"
+        )
+    else:
+        aligned_image = out
+
+    # When aligning in place, a plane cannot be resampled into the memory it is being read from
+    in_place = numpy.may_share_memory(image, aligned_image)
+
+    y_slice, x_slice = warp_map.output_window.slices()
+    channels: List[int] = []
     for channel_index in range(0, number_of_channels):
-        unaligned_channel = image[channel_index]
         if channel_index in channels_to_shift:
             log.debug("Applying alignment to %s channel", channel_index)
-            aligned_channel = numpy.empty(unaligned_channel.shape, dtype=numpy.double)
-            for z_index in range(0, aligned_channel.shape[0]):
-                aligned_channel[z_index, :, :] = skimage.transform.warp(
-                    unaligned_channel[z_index, :, :],
-                    inverse_map=alignment_matrix,
-                    order=interpolation,  # 3
-                    preserve_range=True,
-                )
+            channels.append(channel_index)
+        elif copy_unshifted:
+            log.debug("Skipping alignment for %s channel", channel_index)
+            aligned_image[channel_index] = image[
+                channel_index, z_start:z_stop, y_slice, x_slice
+            ]
+        else:
+            log.debug("Skipping alignment and copy for %s channel", channel_index)
+
+    # Each channel's z-slices are resampled as one volume, or split into up to `workers` blocks of z-slices
+    blocks_per_channel = min(workers, z_stop - z_start)
+    blocks_to_shift: List[Tuple[int, int, int]] = [
+        (channel_index, int(z_indices[0]), int(z_indices[-1]) + 1)
+        for channel_index in channels
+        for z_indices in numpy.array_split(
+            numpy.arange(z_start, z_stop), blocks_per_channel
+        )
+    ]
 
-            aligned_image[channel_index] = aligned_channel
+    def warp_block(block: Tuple[int, int, int]) -> None:
+        channel_index, block_start, block_stop = block
+        out_slices = (
+            channel_index,
+            slice(block_start - z_start, block_stop - z_start),
+        )
+        if in_place:
+            aligned_image[out_slices] = warp_map.warp_volume(
+                image[channel_index, block_start:block_stop]
+            )
         else:
-            log.debug("Skipping alignment for %s channel", channel_index)
-            aligned_image[channel_index] = unaligned_channel
+            warp_map.warp_volume(
+                image[channel_index, block_start:block_stop],
+                out=aligned_image[out_slices],
+            )
+
+    if workers > 1 and len(blocks_to_shift) > 1:
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=min(workers, len(blocks_to_shift))
+        ) as executor:
+            # Exhaust the iterator so that any exception raised in a worker thread is re-raised here
+            for _ in executor.map(warp_block, blocks_to_shift):
+                pass
+    else:
+        for block in blocks_to_shift:
+            warp_block(block)
 
     return aligned_image
 
 
-def crop(
+def align_and_crop(
     image: numpy.typing.NDArray[numpy.uint16],
+    alignment_matrix: numpy.typing.NDArray[numpy.float16],
+    channels_to_shift: List[int],
     magnification: Magnification,
+    interpolation: int = 0,
+    warp_map: Optional[WarpMap] = None,
+    workers: int = 1,
+    out: Optional[numpy.typing.NDArray[numpy.uint16]] = None,
     black_pixel_cutoff: int = 50,
+    translation_tolerance: float = 0.0,
 ) -> numpy.typing.NDArray[numpy.uint16]:
-    """Crops a CZYX image based on the magnification used to generate the image"""
+    """Fused equivalent of `crop(align_image(image, ...), magnification)`.
 
+    Only the pixels within the standard cropping dimensions for `magnification` are resampled,
+    and only the cropped image is allocated. See `align_image` for a description of the parameters;
+    `warp_map`, if provided, must have been built with `output_window=crop_window(image.shape[-2:], magnification)`.
+    """
     if not image.ndim == 4:
         raise IncompatibleImageException(
             f"Expected image to be 4 dimensional ('CZYX'). Got: {image.shape}"
         )
 
-    cropping_dimension = magnification.cropping_dimension
-    log.debug("Cropping to <X: %s, Y: %s>", cropping_dimension.x, cropping_dimension.y)
+    window = crop_window(image.shape[-2:], magnification)
+    cropped_image = align_image(
+        image,
+        alignment_matrix,
+        channels_to_shift,
+        interpolation,
+        warp_map=warp_map,
+        workers=workers,
+        out=out,
+        output_window=window,
+        translation_tolerance=translation_tolerance,
+    )
+    _warn_on_black_pixels(cropped_image, black_pixel_cutoff)
 
-    (_, _, Y, X) = image.shape
+    return cropped_image
+
+
+def align_image_lazy(
+    image: "dask.array.Array",
+    alignment_matrix: numpy.typing.NDArray[numpy.float16],
+    channels_to_shift: List[int],
+    interpolation: int = 0,
+    output_window: Optional[PlaneWindow] = None,
+    translation_tolerance: float = 0.0,
+) -> "dask.array.Array":
+    """Lazy equivalent of `align_image` for a TCZYX dask array.
+
+    Nothing is read or resampled until (part of) the returned array is computed: each chunk of the output
+    is aligned from the matching chunk of `image`, so e.g. computing a single timepoint or z-slice only reads
+    and resamples that timepoint or z-slice. `image` is rechunked to hold whole YX planes, which every chunk
+    needs in order to be resampled; its chunking along T, C and Z is kept.
+
+    Parameters
+    ----------
+    image : dask.array.Array
+        Must be a 5 dimensional image in following dimensional order: 'TCZYX'
+    alignment_matrix : numpy.typing.NDArray[numpy.float16]
+        3x3 matrix that can be used by skimage.transform.warp to transform a single z-slice of an image.
+    channels_to_shift : List[int]
+        Index positions of channels within `image` that should be shifted. N.b.: indices start at 0.
+
+    Keyword Arguments
+    -----------------
+    interpolation : int
+        Interpolation order to use when applying the alignment transform. Default is 0.
+    output_window : Optional[PlaneWindow]
+        YX region of the aligned image to compute. If not provided, the whole plane is computed.
+    translation_tolerance : float
+        See `align_image`. Default is 0.
+
+    Returns
+    -------
+    dask.array.Array
+        The lazily aligned uint16 TCZYX image.
+
+    Notes
+    -----
+    The warp map is taken from `WARP_MAP_CACHE` by whichever process computes a chunk, rather than built up front,
+    so it is only built once per process and is not serialized into the task graph.
+    """
+    if not image.ndim == 5:
+        raise IncompatibleImageException(
+            f"Expected image to be 5 dimensional ('TCZYX'). Got: {image.shape}"
+        )
+
+    if not channels_to_shift:
+        raise ValueError(
+            "channels_to_shift: passed an empty list to `align_image_lazy`. Cannot determine which channels to shift."
+        )
+
+    *_, Y, X = image.shape
+    window = output_window if output_window is not None else PlaneWindow(0, 0, Y, X)
+    plane_image = image.rechunk({3: -1, 4: -1})
+
+    import dask.array
+
+    return dask.array.map_blocks(
+        _align_block,
+        plane_image,
+        dtype=numpy.uint16,
+        chunks=(*plane_image.chunks[:3], (window.height,), (window.width,)),
+        meta=numpy.empty((0, 0, 0, 0, 0), dtype=numpy.uint16),
+        alignment_matrix=numpy.asarray(alignment_matrix),
+        channels_to_shift=list(channels_to_shift),
+        interpolation=interpolation,
+        output_window=output_window,
+        translation_tolerance=translation_tolerance,
+    )
+
+
+def _align_block(
+    block: numpy.typing.NDArray,
+    alignment_matrix: numpy.typing.NDArray[numpy.float16],
+    channels_to_shift: List[int],
+    interpolation: int,
+    output_window: Optional[PlaneWindow],
+    translation_tolerance: float,
+    block_info: Optional[Dict[Any, Any]] = None,
+) -> numpy.typing.NDArray[numpy.uint16]:
+    """Align one TCZYX chunk of whole YX planes for `align_image_lazy`."""
+    if block_info is None:
+        raise ValueError(
+            "block_info: required. Map this function over blocks with dask.array.map_blocks, which supplies it"
+        )
+    channel_start, _ = block_info[0]["array-location"][1]
+
+    warp_map = WARP_MAP_CACHE.get(
+        alignment_matrix,
+        block.shape[-2:],
+        interpolation,
+        output_window,
+        translation_tolerance=translation_tolerance,
+    )
+    aligned_block = numpy.empty(
+        (*block.shape[:3], *warp_map.output_shape), dtype=numpy.uint16
+    )
+    y_slice, x_slice = warp_map.output_window.slices()
+    for block_channel_index in range(block.shape[1]):
+        if channel_start + block_channel_index in channels_to_shift:
+            warp_map.warp_volume(
+                block[:, block_channel_index],
+                out=aligned_block[:, block_channel_index],
+            )
+        else:
+            aligned_block[:, block_channel_index] = block[
+                :, block_channel_index, :, y_slice, x_slice
+            ]
+
+    return aligned_block
+
+
+# Interpolation orders whose kernels only reach a few pixels, so that a tile can be resampled from its neighbourhood.
+# (The spline prefilter of the other orders depends on the whole plane.)
+TILED_INTERPOLATION_ORDERS = (0, 1, 3)
+
+
+def align_image_tiled(
+    source: Any,
+    sink: Any,
+    alignment_matrix: numpy.typing.NDArray[numpy.float16],
+    channels_to_shift: List[int],
+    interpolation: int = 0,
+    tile_shape: Tuple[int, int] = (1024, 1024),
+    copy_unshifted: bool = True,
+    output_window: Optional[PlaneWindow] = None,
+) -> Any:
+    """Out-of-core equivalent of `align_image`: align CZYX `source` into `sink` one YX tile of one plane at a time.
+
+    For each output tile, only the region of the source plane that the tile samples from (the tile's footprint under
+    `alignment_matrix`, grown by a halo as wide as the interpolation kernel) is read from `source`. Peak memory is
+    therefore proportional to `tile_shape`, not to the size of the image. Output is the same as `align_image`,
+    except that for interpolation orders 1 and 3, the tile offsets folded into the transform can round differently
+    by at most 1 (see `camera_alignment_core.warp_map.MatrixWarpMap`).
+
+    To clip interpolated values to the range of each whole plane, as `align_image` does, `source` is read twice
+    for interpolation orders above 0: once to find that range, once to resample.
+
+    Parameters
+    ----------
+    source : array-like
+        CZYX image to align. Anything with a `shape` that supports numpy-style slicing into blocks
+        that `numpy.asarray` accepts, e.g. a numpy.memmap, a zarr or h5py array, or a dask array
+        (such as `AICSImage.get_image_dask_data("CZYX", T=0)`).
+    sink : array-like
+        CZYX array to write the aligned image into, e.g. a numpy.memmap or a zarr array: of the shape of `source`,
+        or of `output_window` in YX if provided. Only needs to support assignment to numpy-style slices.
+    alignment_matrix : numpy.typing.NDArray[numpy.float16]
+        The affine matrix that will be used to align the image.
+    channels_to_shift : List[int]
+        Index positions of channels within `source` that should be shifted.
+
+    Keyword Arguments
+    -----------------
+    interpolation : int
+        Interpolation order to use when applying the alignment transform. One of 0, 1 or 3. Default is 0.
+    tile_shape : Tuple[int, int]
+        (Y, X) shape of the output tiles. Default is (1024, 1024).
+    copy_unshifted : bool
+        Whether to copy channels that are not in `channels_to_shift` from `source` into `sink`. Default is True.
+    output_window : Optional[PlaneWindow]
+        YX region of the aligned image to compute, as by `align_image`: only the tiles covering it are resampled
+        (and only the source they sample from read). If not provided, the whole plane is computed.
+
+    Returns
+    -------
+    array-like
+        `sink`
+    """
+    if not len(source.shape) == 4:
+        raise IncompatibleImageException(
+            f"Expected image to be 4 dimensional ('CZYX'). Got: {source.shape}"
+        )
+
+    number_of_channels, number_of_z_slices, *plane_shape = source.shape
+    window = output_window or PlaneWindow(0, 0, plane_shape[0], plane_shape[1])
+    if (
+        min(window.y, window.x, window.height, window.width) < 0
+        or window.y + window.height > plane_shape[0]
+        or window.x + window.width > plane_shape[1]
+    ):
+        raise ValueError(
+            f"output_window: must lie within the plane of shape {tuple(plane_shape)}. Got: {window}"
+        )
+
+    sink_shape = (number_of_channels, number_of_z_slices, *window.shape)
+    if tuple(sink.shape) != sink_shape:
+        raise ValueError(
+            f"sink: expected an array of shape {sink_shape}. Got: {tuple(sink.shape)}"
+        )
+
+    if not channels_to_shift:
+        raise ValueError(
+            "channels_to_shift: passed an empty list to `align_image_tiled`. Cannot determine which channels to shift."
+        )
+
+    if interpolation not in TILED_INTERPOLATION_ORDERS:
+        raise ValueError(
+            f"Interpolation order has to be one of {TILED_INTERPOLATION_ORDERS} for tiled alignment. "
+            f"Got: {interpolation}"
+        )
+
+    if min(tile_shape) < 1:
+        raise ValueError(f"tile_shape: must be at least 1x1. Got: {tile_shape}")
+
+    # Tiles of the window, in the coordinates of the plane
+    tiles = [
+        PlaneWindow(window.y + tile.y, window.x + tile.x, tile.height, tile.width)
+        for tile in _tiles(window.shape, tile_shape)
+    ]
+    log.debug("Aligning in %s tiles of up to %s", len(tiles), tile_shape)
+
+    def sink_slices(tile: PlaneWindow) -> Tuple[slice, slice]:
+        return PlaneWindow(
+            tile.y - window.y, tile.x - window.x, tile.height, tile.width
+        ).slices()
+
+    planes_to_shift: List[Tuple[int, int]] = []
+    for channel_index in range(0, number_of_channels):
+        if channel_index in channels_to_shift:
+            log.debug("Applying alignment to %s channel", channel_index)
+            planes_to_shift.extend(
+                (channel_index, z_index) for z_index in range(0, number_of_z_slices)
+            )
+        elif copy_unshifted:
+            log.debug("Skipping alignment for %s channel", channel_index)
+            for z_index in range(0, number_of_z_slices):
+                for tile in tiles:
+                    y_slice, x_slice = tile.slices()
+                    sink_y_slice, sink_x_slice = sink_slices(tile)
+                    sink[channel_index, z_index, sink_y_slice, sink_x_slice] = (
+                        numpy.asarray(source[channel_index, z_index, y_slice, x_slice])
+                    )
+        else:
+            log.debug("Skipping alignment and copy for %s channel", channel_index)
+
+    # Interpolated values are clipped as by skimage.transform.warp: to the range of the input plane, expanded to 0
+    # if any sample is <= 0 (i.e., the fill was used). Whether it is only becomes known once every tile of a plane has
+    # been resampled, so tiles are first clipped as if it were, and those tiles of planes for which it turns out not
+    # to be that had samples below the plane's minimum are redone at the end.
+    input_ranges: Dict[Tuple[int, int], Tuple[float, float]] = {}
+    sample_ranges: Dict[Tuple[int, int], Tuple[float, float]] = {}
+    if interpolation > 0:
+        # The range of the whole input plane, whatever of it the window samples
+        plane_tiles = list(_tiles((plane_shape[0], plane_shape[1]), tile_shape))
+        for plane_index in planes_to_shift:
+            input_ranges[plane_index] = _plane_range(source, plane_index, plane_tiles)
+            sample_ranges[plane_index] = (numpy.inf, -numpy.inf)
+    tiles_below_range: List[Tuple[PlaneWindow, Tuple[int, int]]] = []
+
+    def write_tile(
+        tile: PlaneWindow,
+        plane_index: Tuple[int, int],
+        warp_map: Optional[WarpMap],
+        lower_bound: Optional[float] = None,
+    ) -> None:
+        channel_index, z_index = plane_index
+        y_slice, x_slice = sink_slices(tile)
+        if warp_map is None:
+            # Every sample of this tile falls outside the plane
+            sink[channel_index, z_index, y_slice, x_slice] = 0
+            if interpolation > 0:
+                sample_min, sample_max = sample_ranges[plane_index]
+                sample_ranges[plane_index] = (
+                    min(sample_min, 0.0),
+                    max(sample_max, 0.0),
+                )
+            return
+
+        source_y_slice, source_x_slice = warp_map.source_window.slices()
+        block = numpy.asarray(
+            source[channel_index, z_index, source_y_slice, source_x_slice]
+        )
+        if interpolation == 0:
+            # Nearest neighbour sampling only copies input values (or 0), so there is nothing to clip
+            sink[channel_index, z_index, y_slice, x_slice] = warp_map.warp(block)
+            return
+
+        samples = warp_map.sample(block)
+        min_val, max_val = input_ranges[plane_index]
+        if lower_bound is None:
+            sample_min, sample_max = sample_ranges[plane_index]
+            sample_ranges[plane_index] = (
+                min(sample_min, float(samples.min())),
+                max(sample_max, float(samples.max())),
+            )
+            if samples.min() < min_val:
+                tiles_below_range.append((tile, plane_index))
+            lower_bound = min(min_val, 0.0)
+        numpy.clip(samples, lower_bound, max_val, out=samples)
+        samples += 0.5
+        numpy.floor(samples, out=samples)
+        sink[channel_index, z_index, y_slice, x_slice] = samples.astype(numpy.uint16)
+
+    for tile in tiles:
+        tile_warp_map = _tile_warp_map(
+            alignment_matrix, (plane_shape[0], plane_shape[1]), interpolation, tile
+        )
+        for plane_index in planes_to_shift:
+            write_tile(tile, plane_index, tile_warp_map)
+
+    for tile, plane_index in tiles_below_range:
+        min_val, _ = input_ranges[plane_index]
+        sample_min, sample_max = sample_ranges[plane_index]
+        fill_used = sample_min <= 0 <= sample_max
+        if min_val > 0 and not fill_used:
+            write_tile(
+                tile,
+                plane_index,
+                _tile_warp_map(
+                    alignment_matrix,
+                    (plane_shape[0], plane_shape[1]),
+                    interpolation,
+                    tile,
+                ),
+                lower_bound=min_val,
+            )
+
+    return sink
+
+
+def _tiles(
+    plane_shape: Tuple[int, int], tile_shape: Tuple[int, int]
+) -> Iterator[PlaneWindow]:
+    """Tiles of at most `tile_shape` that cover a plane of shape `plane_shape`, in row-major order."""
+    (Y, X) = plane_shape
+    tile_height, tile_width = tile_shape
+    for y in range(0, Y, tile_height):
+        for x in range(0, X, tile_width):
+            yield PlaneWindow(
+                y=y, x=x, height=min(tile_height, Y - y), width=min(tile_width, X - x)
+            )
+
+
+def _plane_range(
+    source: Any, plane_index: Tuple[int, int], tiles: List[PlaneWindow]
+) -> Tuple[float, float]:
+    """(min, max) of a plane of `source`, read one tile at a time."""
+    channel_index, z_index = plane_index
+    min_val, max_val = numpy.inf, -numpy.inf
+    for tile in tiles:
+        y_slice, x_slice = tile.slices()
+        block = numpy.asarray(source[channel_index, z_index, y_slice, x_slice])
+        min_val = min(min_val, float(block.min()))
+        max_val = max(max_val, float(block.max()))
+    return min_val, max_val
+
+
+def _tile_warp_map(
+    alignment_matrix: numpy.typing.NDArray[numpy.float16],
+    plane_shape: Tuple[int, int],
+    interpolation: int,
+    tile: PlaneWindow,
+) -> Optional[WarpMap]:
+    """WarpMap producing `tile` of the aligned plane from only the region of the input plane it depends on.
+    None if every sample of `tile` falls outside the input plane.
+    """
+    # Positions in the input plane sampled by the corners of the tile; for an affine (or projective) transform,
+    # every other pixel of the tile samples within the quadrilateral they span
+    corners = numpy.array(
+        [
+            [x, y]
+            for x in (tile.x, tile.x + tile.width - 1)
+            for y in (tile.y, tile.y + tile.height - 1)
+        ],
+        dtype=numpy.double,
+    )
+    import skimage.transform
+
+    source_corners = skimage.transform.ProjectiveTransform(matrix=alignment_matrix)(
+        corners
+    )
+
+    # Halo for the reach of the interpolation kernel around each sample, plus one pixel for floating point error
+    halo = interpolation // 2 + 1
+    bounds = []
+    for axis, extent in ((1, plane_shape[0]), (0, plane_shape[1])):
+        start = max(int(numpy.floor(source_corners[:, axis].min())) - halo, 0)
+        stop = min(int(numpy.ceil(source_corners[:, axis].max())) + halo + 1, extent)
+        if start >= stop:
+            return None
+        bounds.append((start, stop))
+
+    (y_start, y_stop), (x_start, x_stop) = bounds
+    return warp_map_factory(
+        alignment_matrix,
+        plane_shape,
+        interpolation,
+        output_window=tile,
+        source_window=PlaneWindow(
+            y=y_start, x=x_start, height=y_stop - y_start, width=x_stop - x_start
+        ),
+    )
+
+
+def crop_window(
+    plane_shape: Tuple[int, int], magnification: Magnification
+) -> PlaneWindow:
+    """YX region, centered within a plane of shape `plane_shape`, that `crop` retains for `magnification`."""
+    cropping_dimension = magnification.cropping_dimension
+    (Y, X) = plane_shape
 
     assert (
         Y >= cropping_dimension.y
@@ -182,17 +751,46 @@ def crop(
 
     half_diff_x = (X - cropping_dimension.x) // 2
     half_diff_y = (Y - cropping_dimension.y) // 2
+    return PlaneWindow(
+        y=half_diff_y,
+        x=half_diff_x,
+        height=cropping_dimension.y,
+        width=cropping_dimension.x,
+    )
+
+
+def crop(
+    image: numpy.typing.NDArray[numpy.uint16],
+    magnification: Magnification,
+    black_pixel_cutoff: int = 50,
+) -> numpy.typing.NDArray[numpy.uint16]:
+    """Crops a CZYX image based on the magnification used to generate the image"""
+
+    if not image.ndim == 4:
+        raise IncompatibleImageException(
+            f"Expected image to be 4 dimensional ('CZYX'). Got: {image.shape}"
+        )
+
+    cropping_dimension = magnification.cropping_dimension
+    log.debug("Cropping to <X: %s, Y: %s>", cropping_dimension.x, cropping_dimension.y)
+
+    y_slice, x_slice = crop_window(image.shape[-2:], magnification).slices()
     cropped_image: numpy.typing.NDArray[numpy.uint16] = image[
         :,  # C
         :,  # Z
-        half_diff_y : half_diff_y + cropping_dimension.y,  # Y
-        half_diff_x : half_diff_x + cropping_dimension.x,  # X
+        y_slice,  # Y
+        x_slice,  # X
     ]
+    _warn_on_black_pixels(cropped_image, black_pixel_cutoff)
 
+    return cropped_image
+
+
+def _warn_on_black_pixels(
+    image: numpy.typing.NDArray[numpy.uint16], black_pixel_cutoff: int
+) -> None:
     # Check if there are black pixels, if so, log a warning
-    if numpy.any(cropped_image < black_pixel_cutoff):
+    if numpy.any(image < black_pixel_cutoff):
         log.warning(
             "Black pixels are detected, either from original image or due to alignment."
         )
-
-    return cropped_image
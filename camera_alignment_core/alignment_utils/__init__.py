@@ -1,8 +1,28 @@
+import importlib
+import typing
+
 from .alignment_info import AlignmentInfo
-from .crop_rings import CropRings
 from .get_center_z import get_center_z
-from .ring_alignment import RingAlignment
-from .segment_rings import SegmentRings
+
+if typing.TYPE_CHECKING:
+    from .crop_rings import CropRings
+    from .ring_alignment import RingAlignment
+    from .segment_rings import SegmentRings
+
+# Exports imported on first use, from the modules named. Deferred: scipy, scikit-image, scikit-learn, pandas
+_LAZY_EXPORTS = {
+    "CropRings": ".crop_rings",
+    "RingAlignment": ".ring_alignment",
+    "SegmentRings": ".segment_rings",
+}
+
+
+def __getattr__(name: str) -> typing.Any:
+    if name in _LAZY_EXPORTS:
+        return getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = (
     "AlignmentInfo",
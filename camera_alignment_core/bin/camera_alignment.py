@@ -0,0 +1,306 @@
+"""`camera-alignment` command line entry point: align a batch of images with one alignment transform.
+
+Every (image, scene) unit of the batch is aligned by one process (and its pool of workers), which generates or loads
+the alignment transform and imports this package only once, rather than once per image.
+
+Example
+-------
+$ camera-alignment --optical-control /some/path/to/an/argolight-field-of-rings.czi --magnification 100 \\
+    --channels-to-shift 1 3 --out-dir /tmp/aligned --max-workers 8 "/some/path/to/a/plate/*.czi"
+"""
+
+import argparse
+import csv
+import glob
+import json
+import logging
+import pathlib
+import sys
+import time
+import typing
+
+from ..align import (
+    Align,
+    AlignmentTransform,
+    SceneAlignmentResult,
+)
+from ..constants import LOGGER_NAME, Magnification
+from ..transform_cache import (
+    load_alignment_transform,
+    save_alignment_transform,
+)
+
+log = logging.getLogger(LOGGER_NAME)
+
+# Columns of the manifest, one row per (image, scene) unit
+MANIFEST_FIELDS = ("image", "scene", "output", "status", "seconds", "error")
+
+
+def main(argv: typing.Optional[typing.Sequence[str]] = None) -> int:
+    """Run the command line with `argv` (by default, the arguments of this process), returning the exit status:
+    0 if every unit was aligned, 1 if any failed.
+    """
+    parser = _parser()
+    args = parser.parse_args(argv)
+    if args.verify_input and not args.resume:
+        parser.error("--verify-input requires --resume")
+    logging.basicConfig(
+        level=args.log_level, format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+    )
+
+    out_dir = pathlib.Path(args.out_dir)
+    images = _find_images(args.inputs, exclude=out_dir)
+    if not images:
+        parser.error(f"No images found in {args.inputs}")
+
+    alignment_transform = None
+    if args.transform:
+        alignment_matrix, alignment_info = load_alignment_transform(args.transform)
+        alignment_transform = AlignmentTransform(alignment_matrix, alignment_info)
+
+    align = Align(
+        # None with --transform, which is all that is needed
+        optical_control=args.optical_control,
+        magnification=Magnification(args.magnification),
+        out_dir=out_dir,
+        reference_channel_index=args.reference_channel,
+        shift_channel_index=args.shift_channel,
+        alignment_transform=alignment_transform,
+        transform_cache_dir=args.transform_cache_dir,
+        max_memory_bytes=args.max_memory_bytes,
+    )
+    if args.save_transform:
+        save_alignment_transform(args.save_transform, *align.alignment_transform)
+    # The transform is all that is needed from the optical control from here on
+    align.release_optical_control()
+
+    log.info("Aligning %s images into %s", len(images), out_dir)
+    start = time.perf_counter()
+    rows = []
+    for result in align.align_scenes(
+        images,
+        channels_to_shift=args.channels_to_shift,
+        scenes=args.scenes,
+        timepoints=args.timepoints,
+        crop_output=not args.no_crop,
+        interpolation=args.interpolation,
+        workers=args.workers,
+        translation_tolerance=args.translation_tolerance,
+        output_format=args.output_format,
+        max_workers=args.max_workers,
+        output_channels=args.output_channels,
+        resume=args.resume,
+        verify_input=args.verify_input,
+    ):
+        log.info(
+            "%s scene %s of %s in %.1fs",
+            _status(result).capitalize() if result.error is None else "Failed to align",
+            result.scene,
+            result.image,
+            result.seconds,
+        )
+        rows.append(_manifest_row(result))
+
+    failures = sum(row["status"] == "failed" for row in rows)
+    manifest_path = (
+        pathlib.Path(args.manifest) if args.manifest else out_dir / "manifest.json"
+    )
+    _write_manifest(manifest_path, rows)
+    log.info(
+        "Aligned %s of %s units in %.1fs, %s failed. Manifest: %s",
+        len(rows) - failures,
+        len(rows),
+        time.perf_counter() - start,
+        failures,
+        manifest_path,
+    )
+    return 1 if failures else 0
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="camera-alignment",
+        description="Align every scene of a batch of two-camera microscopy images using one alignment transform, "
+        "and write a manifest of the outputs, timings and failures.",
+    )
+    parser.add_argument(
+        "inputs",
+        nargs="+",
+        help="Images to align: files, directories (every image directly within) or glob patterns "
+        "(quote them to keep the shell from expanding them)",
+    )
+
+    transform = parser.add_mutually_exclusive_group(required=True)
+    transform.add_argument(
+        "--optical-control",
+        help="Optical control image to generate the alignment transform from",
+    )
+    transform.add_argument(
+        "--transform",
+        help="JSON file of a previously generated alignment transform (see --save-transform)",
+    )
+
+    parser.add_argument(
+        "--magnification",
+        type=int,
+        required=True,
+        choices=[magnification.value for magnification in Magnification],
+    )
+    parser.add_argument(
+        "--channels-to-shift",
+        type=int,
+        nargs="+",
+        required=True,
+        help="Indices of the channels of each image to shift",
+    )
+    parser.add_argument(
+        "--out-dir", required=True, help="Directory to save aligned images to"
+    )
+    parser.add_argument(
+        "--manifest",
+        help="Path of the manifest to write: JSON, or CSV if it ends in .csv. Default: OUT_DIR/manifest.json",
+    )
+    parser.add_argument(
+        "--save-transform",
+        help="Also save the alignment transform as JSON to this path, for use with --transform",
+    )
+    parser.add_argument(
+        "--reference-channel",
+        type=int,
+        help="Reference channel of the optical control. Default: chosen from its metadata",
+    )
+    parser.add_argument(
+        "--shift-channel",
+        type=int,
+        help="Shift channel of the optical control. Default: chosen from its metadata",
+    )
+    parser.add_argument(
+        "--transform-cache-dir",
+        help="Directory in which to cache alignment transforms generated from optical controls",
+    )
+    parser.add_argument(
+        "--scenes", type=int, nargs="+", default=[], help="Default: every scene"
+    )
+    parser.add_argument(
+        "--timepoints", type=int, nargs="+", default=[], help="Default: every timepoint"
+    )
+    parser.add_argument(
+        "--output-channels",
+        type=int,
+        nargs="+",
+        default=[],
+        help="Channels to output, in order. Default: every channel",
+    )
+    parser.add_argument(
+        "--no-crop", action="store_true", help="Do not crop the aligned images"
+    )
+    parser.add_argument("--interpolation", type=int, default=0)
+    parser.add_argument("--translation-tolerance", type=float, default=0.0)
+    parser.add_argument(
+        "--output-format", choices=["ome.tiff", "ome.zarr"], default="ome.tiff"
+    )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=1,
+        help="Number of processes across which to spread (image, scene) units. Default: 1",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of threads resampling each timepoint, per process. Default: 1",
+    )
+    parser.add_argument(
+        "--max-memory-bytes",
+        type=int,
+        help="Memory budget shared by all processes. Default: unlimited",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip scenes already aligned into OUT_DIR by an earlier run with the same inputs and options, "
+        "e.g. one that was interrupted (see camera_alignment_core.resume_manifest)",
+    )
+    parser.add_argument(
+        "--verify-input",
+        action="store_true",
+        help="With --resume, identify images by a checksum of their content, rather than by their path, "
+        "size and modification time",
+    )
+    parser.add_argument(
+        "--log-level",
+        default="INFO",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+    )
+    return parser
+
+
+def _find_images(
+    inputs: typing.Sequence[str], exclude: pathlib.Path
+) -> typing.List[pathlib.Path]:
+    """Images named by `inputs`, in order and without duplicates, leaving out any within `exclude`.
+
+    Each input is a file, a directory (every file and OME-Zarr directory directly within it, other than hidden ones)
+    or a glob pattern.
+    """
+
+    def is_image(path: pathlib.Path) -> bool:
+        return not path.name.startswith(".") and (
+            path.is_file() or path.name.lower().endswith(".zarr")
+        )
+
+    excluded = exclude.resolve()
+    images: typing.Dict[pathlib.Path, None] = {}
+    for pattern in inputs:
+        path = pathlib.Path(pattern)
+        if path.is_dir() and not path.name.lower().endswith(".zarr"):
+            candidates = sorted(child for child in path.iterdir() if is_image(child))
+        elif path.exists():
+            candidates = [path]
+        else:
+            candidates = sorted(
+                pathlib.Path(match) for match in glob.glob(pattern, recursive=True)
+            )
+            candidates = [candidate for candidate in candidates if is_image(candidate)]
+
+        for candidate in candidates:
+            if excluded not in candidate.resolve().parents:
+                images.setdefault(candidate, None)
+
+    return list(images)
+
+
+def _manifest_row(result: SceneAlignmentResult) -> typing.Dict[str, typing.Any]:
+    return {
+        "image": str(result.image),
+        "scene": result.scene,
+        "output": str(result.path) if result.path is not None else None,
+        "status": _status(result),
+        "seconds": round(result.seconds, 3),
+        "error": repr(result.error) if result.error is not None else None,
+    }
+
+
+def _status(result: SceneAlignmentResult) -> str:
+    if result.error is not None:
+        return "failed"
+
+    return "skipped" if result.skipped else "aligned"
+
+
+def _write_manifest(
+    path: pathlib.Path, rows: typing.List[typing.Dict[str, typing.Any]]
+) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", newline="") as file:
+        if path.suffix.lower() == ".csv":
+            writer = csv.DictWriter(file, fieldnames=MANIFEST_FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+        else:
+            json.dump(rows, file, indent=2)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
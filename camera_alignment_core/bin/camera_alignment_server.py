@@ -0,0 +1,431 @@
+"""`camera-alignment-server` entry point: a long-lived local process that aligns images on request.
+
+Starting a process to align an image means importing aicsimageio, scikit-image and friends, then generating the
+alignment transform from the optical control, which together can take much longer than aligning a single scene.
+This server pays for both once: it keeps the alignment transform of every optical control it has been asked about
+(and an `Align` per output directory) in memory, and serves requests to align images over HTTP, either on
+a loopback port or on a Unix socket.
+
+Requests are JSON objects POSTed to /align; the response lists the aligned scenes:
+
+$ curl --unix-socket /tmp/camera-alignment.sock http://localhost/align -d '{
+    "image": "/some/path/to/an/image.czi",
+    "optical_control": "/some/path/to/an/argolight-field-of-rings.czi",
+    "magnification": 100,
+    "channels_to_shift": [1, 3],
+    "out_dir": "/tmp/aligned",
+    "scenes": [2]
+  }'
+{"aligned_scenes": [{"scene": 2, "path": "/tmp/aligned/image_Scene-2_aligned.ome.tiff"}], "seconds": 1.8}
+
+Besides the keys above, requests may set "reference_channel" and "shift_channel" (see `Align`) and any of
+the keyword arguments of `Align.align_image` listed in `ALIGN_IMAGE_OPTIONS`.
+GET /health reports the optical controls whose transforms are in memory.
+"""
+
+import argparse
+import http.server
+import json
+import logging
+import os
+import pathlib
+import socketserver
+import sys
+import threading
+import time
+import typing
+
+from ..align import (
+    Align,
+    AlignmentTransform,
+    image_errors,
+)
+from ..constants import LOGGER_NAME, Magnification
+
+log = logging.getLogger(LOGGER_NAME)
+
+# Optional keys of an align request that are passed on to `Align.align_image`, with their types
+ALIGN_IMAGE_OPTIONS: typing.Dict[str, typing.Tuple[type, ...]] = {
+    "scenes": (list,),
+    "timepoints": (list,),
+    "crop_output": (bool,),
+    "interpolation": (int,),
+    "workers": (int,),
+    "translation_tolerance": (int, float),
+    "output_format": (str,),
+    "output_channels": (list,),
+    "resume": (bool,),
+    "verify_input": (bool,),
+}
+
+
+# Optical control, magnification, reference channel and shift channel that an alignment transform is generated from
+TransformKey = typing.Tuple[
+    pathlib.Path, Magnification, typing.Optional[int], typing.Optional[int]
+]
+
+
+class AlignmentService:
+    """Aligns images on request, keeping alignment transforms and `Align` instances in memory between requests.
+
+    Transforms are keyed by optical control (and magnification and channels), and generated on the first request
+    that needs them; `Align` instances are additionally keyed by output directory. Safe to call from many threads:
+    up to `max_concurrent` requests are aligned at once, and each transform is only ever generated once. While
+    a transform is generated, only the requests that need it wait; others (and /health) are served meanwhile.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 1,
+        transform_cache_dir: typing.Optional[typing.Union[str, pathlib.Path]] = None,
+        max_memory_bytes: typing.Optional[int] = None,
+    ) -> None:
+        """Constructor.
+
+        Keyword Arguments
+        -----------------
+        max_concurrent : int
+            Most requests to align at once; others wait their turn. Default is 1.
+        transform_cache_dir : Optional[Union[str, Path]]
+            Directory in which to also cache transforms on disk, so that they survive restarts. See `Align`.
+        max_memory_bytes : Optional[int]
+            Memory budget of each request being aligned. See `Align`.
+        """
+        if max_concurrent < 1:
+            raise ValueError(
+                f"max_concurrent: must be at least 1. Got: {max_concurrent}"
+            )
+
+        self._transform_cache_dir = transform_cache_dir
+        self._max_memory_bytes = max_memory_bytes
+        self._transforms: typing.Dict[TransformKey, AlignmentTransform] = {}
+        self._aligners: typing.Dict[typing.Tuple[TransformKey, pathlib.Path], Align] = (
+            {}
+        )
+        # Guards the dicts above and below; never held while generating a transform
+        self._lock = threading.Lock()
+        # Held while generating the transform of their key, so that concurrent requests for the same transform
+        # wait for it rather than generating it again
+        self._transform_locks: typing.Dict[TransformKey, threading.Lock] = {}
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+
+    @property
+    def optical_controls(self) -> typing.List[str]:
+        """Optical controls whose alignment transforms are in memory."""
+        with self._lock:
+            return sorted(
+                {str(optical_control) for optical_control, *_ in self._transforms}
+            )
+
+    def alignment_transform(
+        self,
+        optical_control: typing.Union[str, pathlib.Path],
+        magnification: Magnification,
+        reference_channel: typing.Optional[int] = None,
+        shift_channel: typing.Optional[int] = None,
+    ) -> AlignmentTransform:
+        """Alignment transform generated from `optical_control`, generating it if it is not already in memory."""
+        key = self._transform_key(
+            optical_control, magnification, reference_channel, shift_channel
+        )
+        return self._transform(key)
+
+    def align(
+        self, request: typing.Dict[str, typing.Any]
+    ) -> typing.Dict[str, typing.Any]:
+        """Align an image as described by `request` (see this module's documentation), returning the response.
+
+        Raises ValueError if `request` is invalid (including if its optical control does not exist and its transform
+        is not in memory); errors raised while aligning the image are passed on.
+        """
+        if not isinstance(request, dict):
+            raise ValueError(f"Expected a JSON object. Got: {request!r}")
+
+        for name, types in (
+            ("image", (str,)),
+            ("optical_control", (str,)),
+            ("magnification", (int,)),
+            ("channels_to_shift", (list,)),
+            ("out_dir", (str,)),
+        ):
+            if not isinstance(request.get(name), types):
+                raise ValueError(f"{name}: required, as {types[0].__name__}")
+
+        options = {
+            name: request[name] for name in ALIGN_IMAGE_OPTIONS if name in request
+        }
+        for name, value in options.items():
+            if not isinstance(value, ALIGN_IMAGE_OPTIONS[name]):
+                raise ValueError(
+                    f"{name}: expected {ALIGN_IMAGE_OPTIONS[name][0].__name__}. Got: {value!r}"
+                )
+        unknown = set(request) - {
+            "image",
+            "optical_control",
+            "magnification",
+            "channels_to_shift",
+            "out_dir",
+            "reference_channel",
+            "shift_channel",
+            *ALIGN_IMAGE_OPTIONS,
+        }
+        if unknown:
+            raise ValueError(f"Unknown keys: {sorted(unknown)}")
+
+        key = self._transform_key(
+            request["optical_control"],
+            Magnification(request["magnification"]),
+            request.get("reference_channel"),
+            request.get("shift_channel"),
+        )
+        out_dir = pathlib.Path(request["out_dir"])
+        alignment_transform = self._transform(key)
+        with self._lock:
+            align = self._aligners.get((key, out_dir))
+            if align is None:
+                optical_control, magnification, *_ = key
+                align = Align(
+                    optical_control,
+                    magnification,
+                    out_dir,
+                    alignment_transform=alignment_transform,
+                    max_memory_bytes=self._max_memory_bytes,
+                )
+                self._aligners[(key, out_dir)] = align
+
+        with self._slots:
+            start = time.perf_counter()
+            aligned_scenes = align.align_image(
+                request["image"], request["channels_to_shift"], **options
+            )
+            seconds = time.perf_counter() - start
+
+        log.info(
+            "Aligned %s scenes of %s in %.1fs",
+            len(aligned_scenes),
+            request["image"],
+            seconds,
+        )
+        return {
+            "aligned_scenes": [
+                {"scene": aligned_scene.scene, "path": str(aligned_scene.path)}
+                for aligned_scene in aligned_scenes
+            ],
+            "seconds": round(seconds, 3),
+        }
+
+    def _transform_key(
+        self,
+        optical_control: typing.Union[str, pathlib.Path],
+        magnification: Magnification,
+        reference_channel: typing.Optional[int],
+        shift_channel: typing.Optional[int],
+    ) -> TransformKey:
+        return (
+            pathlib.Path(optical_control).resolve(),
+            magnification,
+            reference_channel,
+            shift_channel,
+        )
+
+    def _transform(self, key: TransformKey) -> AlignmentTransform:
+        """Transform for `key`, generating it if needed. Must be called without the lock held.
+
+        Raises ValueError if it needs generating, but its optical control does not exist.
+        """
+        with self._lock:
+            if key in self._transforms:
+                return self._transforms[key]
+            transform_lock = self._transform_locks.setdefault(key, threading.Lock())
+
+        with transform_lock:
+            # Generated by another request while this one waited
+            with self._lock:
+                if key in self._transforms:
+                    return self._transforms[key]
+
+            optical_control, magnification, reference_channel, shift_channel = key
+            if not optical_control.exists():
+                raise ValueError(f"optical_control: not found: {optical_control}")
+
+            log.info("Generating alignment transform from %s", optical_control)
+            align = Align(
+                optical_control,
+                magnification,
+                # Nothing is written: this instance only generates the transform
+                out_dir=optical_control.parent,
+                reference_channel_index=reference_channel,
+                shift_channel_index=shift_channel,
+                transform_cache_dir=self._transform_cache_dir,
+            )
+            alignment_transform = align.alignment_transform
+            align.release_optical_control()
+            with self._lock:
+                self._transforms[key] = alignment_transform
+
+        return alignment_transform
+
+
+class AlignmentRequestHandler(http.server.BaseHTTPRequestHandler):
+    """Serves the requests of this module's documentation, using the `AlignmentService` of its server."""
+
+    server: typing.Any
+
+    def do_GET(self) -> None:
+        if self.path != "/health":
+            self._respond(404, {"error": f"Not found: {self.path}"})
+            return
+
+        self._respond(
+            200,
+            {"status": "ok", "optical_controls": self.server.service.optical_controls},
+        )
+
+    def do_POST(self) -> None:
+        if self.path != "/align":
+            self._respond(404, {"error": f"Not found: {self.path}"})
+            return
+
+        # Logged on failure, however early
+        request: typing.Any = None
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length))
+            response = self.server.service.align(request)
+        except ValueError as error:
+            # Includes invalid JSON
+            self._respond(400, {"error": str(error)})
+        except image_errors() as error:
+            log.error("Failed to align %r: %r", request, error)
+            self._respond(500, {"error": repr(error)})
+        except Exception as error:
+            # Not expected of any image, so logged with its traceback; the client still gets a response
+            log.exception("Error aligning %r", request)
+            self._respond(500, {"error": repr(error)})
+        else:
+            self._respond(200, response)
+
+    def address_string(self) -> str:
+        # Clients of a Unix socket have no address
+        return str(self.client_address[0]) if self.client_address else "local"
+
+    def log_message(self, format: str, *args: typing.Any) -> None:
+        log.debug("%s - %s", self.address_string(), format % args)
+
+    def _respond(self, status: int, body: typing.Dict[str, typing.Any]) -> None:
+        content = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+class LoopbackAlignmentServer(http.server.ThreadingHTTPServer):
+    """HTTP server on a loopback port, serving each request on its own thread."""
+
+    daemon_threads = True
+
+    def __init__(self, port: int, service: AlignmentService) -> None:
+        super().__init__(("127.0.0.1", port), AlignmentRequestHandler)
+        self.service = service
+
+
+class UnixAlignmentServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """HTTP server on a Unix socket, serving each request on its own thread."""
+
+    daemon_threads = True
+
+    def __init__(
+        self, socket_path: typing.Union[str, pathlib.Path], service: AlignmentService
+    ) -> None:
+        self.socket_path = pathlib.Path(socket_path)
+        # A socket left behind by a server that did not shut down cleanly would prevent binding
+        if self.socket_path.is_socket():
+            self.socket_path.unlink()
+        super().__init__(str(self.socket_path), AlignmentRequestHandler)
+        self.service = service
+
+    def server_close(self) -> None:
+        super().server_close()
+        if self.socket_path.is_socket():
+            os.unlink(self.socket_path)
+
+
+def main(argv: typing.Optional[typing.Sequence[str]] = None) -> int:
+    """Run the server until interrupted."""
+    parser = argparse.ArgumentParser(
+        prog="camera-alignment-server",
+        description="Serve requests to align images, keeping alignment transforms in memory between them.",
+    )
+    address = parser.add_mutually_exclusive_group(required=True)
+    address.add_argument("--socket", help="Path of a Unix socket to listen on")
+    address.add_argument(
+        "--port", type=int, help="Port to listen on, on the loopback interface"
+    )
+    parser.add_argument(
+        "--optical-control",
+        nargs="*",
+        default=[],
+        help="Optical controls whose alignment transforms to generate at startup (requires --magnification)",
+    )
+    parser.add_argument(
+        "--magnification",
+        type=int,
+        choices=[magnification.value for magnification in Magnification],
+        help="Magnification of the optical controls to generate transforms from at startup",
+    )
+    parser.add_argument(
+        "--max-concurrent",
+        type=int,
+        default=1,
+        help="Most requests to align at once. Default: 1",
+    )
+    parser.add_argument(
+        "--transform-cache-dir",
+        help="Directory in which to cache alignment transforms on disk as well",
+    )
+    parser.add_argument(
+        "--max-memory-bytes",
+        type=int,
+        help="Memory budget of each request being aligned. Default: unlimited",
+    )
+    parser.add_argument(
+        "--log-level",
+        default="INFO",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+    )
+    args = parser.parse_args(argv)
+    if args.optical_control and args.magnification is None:
+        parser.error("--optical-control requires --magnification")
+
+    logging.basicConfig(
+        level=args.log_level, format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+    )
+
+    service = AlignmentService(
+        max_concurrent=args.max_concurrent,
+        transform_cache_dir=args.transform_cache_dir,
+        max_memory_bytes=args.max_memory_bytes,
+    )
+    for optical_control in args.optical_control:
+        service.alignment_transform(optical_control, Magnification(args.magnification))
+
+    server: socketserver.BaseServer = (
+        UnixAlignmentServer(args.socket, service)
+        if args.socket
+        else LoopbackAlignmentServer(args.port, service)
+    )
+    log.info("Serving on %s", args.socket or f"http://127.0.0.1:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,6 @@
 import pathlib
 import typing
 
-from aicsimageio import AICSImage
-
 from ..exception import IncompatibleImageException
 from .channel_info_abc import (
     CameraPosition,
@@ -11,15 +9,24 @@ from .channel_info_abc import (
 )
 from .czi_channel_info import CziChannelInfo
 
+if typing.TYPE_CHECKING:
+    from aicsimageio import AICSImage
+
 
-def channel_info_factory(image_path: typing.Union[str, pathlib.Path]) -> ChannelInfo:
+def channel_info_factory(
+    image_path: typing.Union[str, pathlib.Path],
+    image: typing.Optional["AICSImage"] = None,
+) -> ChannelInfo:
     """Construct a concrete `ChannelInfo` instance that is type-appropriate for a given image.
+    Pass the image as `image` if it is already open, to reuse it rather than open it again.
 
     Current concrete `ChannelInfo` implementations:
         1. CziChannelInfo, supporting CZI images.
     """
     if CziChannelInfo.is_czi_file(image_path):
-        return CziChannelInfo(AICSImage(image_path))
+        from aicsimageio import AICSImage
+
+        return CziChannelInfo(image if image is not None else AICSImage(image_path))
 
     error_msg = (
         f"Unable to instantiate a ChannelInfo for {pathlib.Path(image_path).name}. "
@@ -5,7 +5,8 @@ import itertools
 import math
 import typing
 
-from aicsimageio import AICSImage
+if typing.TYPE_CHECKING:
+    from aicsimageio import AICSImage
 
 
 class CameraPosition(enum.Enum):
@@ -64,7 +65,7 @@ class ChannelInfo(abc.ABC):
 
     def __init__(
         self,
-        image: AICSImage,
+        image: "AICSImage",
     ) -> None:
         self._image = image
         self._channels: typing.List[Channel] = []
@@ -8,3 +8,7 @@ class UnsupportedMagnification(BaseException):
 
 class AlignmentUnsuccessful(BaseException):
     pass
+
+
+class MemoryBudgetExceeded(BaseException):
+    pass
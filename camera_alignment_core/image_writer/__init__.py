@@ -0,0 +1,71 @@
+import importlib
+import pathlib
+import typing
+
+import numpy.typing
+
+from .image_writer_abc import ImageWriter
+
+if typing.TYPE_CHECKING:
+    from .ome_tiff_image_writer import (
+        OmeTiffImageWriter,
+    )
+    from .ome_zarr_image_writer import (
+        OmeZarrImageWriter,
+    )
+
+# Concrete writers, imported on first use from the modules named. Deferred: aicsimageio, tifffile, zarr, ome-zarr
+_LAZY_EXPORTS = {
+    "OmeTiffImageWriter": ".ome_tiff_image_writer",
+    "OmeZarrImageWriter": ".ome_zarr_image_writer",
+}
+
+
+def __getattr__(name: str) -> typing.Any:
+    if name in _LAZY_EXPORTS:
+        return getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def image_writer_factory(
+    uri: typing.Union[str, pathlib.Path],
+    shape: typing.Tuple[int, int, int, int, int],
+    dtype: numpy.typing.DTypeLike,
+    channel_names: typing.Optional[typing.List[str]] = None,
+    **writer_options: typing.Any,
+) -> ImageWriter:
+    """Construct a concrete `ImageWriter` instance that is appropriate for the file extension of `uri`.
+    Any `writer_options` are passed on to the constructor of that class.
+
+    Current concrete `ImageWriter` implementations:
+        1. OmeTiffImageWriter, for ".ome.tiff" and ".ome.tif" files.
+        2. OmeZarrImageWriter, for ".ome.zarr" and ".zarr" directories.
+           Accepts `chunk_shape`, `compressor` and `workers` options.
+    """
+    from .ome_tiff_image_writer import (
+        OmeTiffImageWriter,
+    )
+    from .ome_zarr_image_writer import (
+        OmeZarrImageWriter,
+    )
+
+    name = pathlib.Path(uri).name.lower()
+    if name.endswith(OmeTiffImageWriter.FILE_SUFFIXES):
+        return OmeTiffImageWriter(uri, shape, dtype, channel_names, **writer_options)
+
+    if name.endswith(OmeZarrImageWriter.FILE_SUFFIXES):
+        return OmeZarrImageWriter(uri, shape, dtype, channel_names, **writer_options)
+
+    raise ValueError(
+        f"Unable to instantiate an ImageWriter for {pathlib.Path(uri).name}. "
+        f"Supported file extensions: {OmeTiffImageWriter.FILE_SUFFIXES + OmeZarrImageWriter.FILE_SUFFIXES}"
+    )
+
+
+__all__ = (
+    "image_writer_factory",
+    "ImageWriter",
+    "OmeTiffImageWriter",
+    "OmeZarrImageWriter",
+)
@@ -0,0 +1,157 @@
+import abc
+import os
+import pathlib
+import shutil
+import typing
+import uuid
+
+import numpy
+import numpy.typing
+
+
+class ImageWriter(abc.ABC):
+    """This utility encapsulates writing a TCZYX image to disk one timepoint at a time.
+
+    Timepoints are consumed from an iterable (typically a generator that aligns each timepoint on demand), and
+    each is written out before the next is requested, so that memory use is bounded by one CZYX timepoint
+    no matter how many timepoints the image has.
+
+    The image is written to a hidden, partial file (or directory) beside `uri`, which is only renamed to `uri`
+    once complete: a file at `uri` is always a whole image, never one that is still being written or whose
+    writing failed.
+
+    Create an ImageWriter using the `image_writer_factory` factory function exported from
+    `camera_alignment_core.image_writer`, which will provide a concrete class appropriate for the output path.
+
+    Example
+    -------
+    >>> writer = image_writer_factory("/tmp/aligned.ome.tiff", shape=(200, 4, 75, 600, 900), dtype=numpy.uint16)
+    >>> writer.write(align(timepoint) for timepoint in range(200))
+    """
+
+    def __init__(
+        self,
+        uri: typing.Union[str, pathlib.Path],
+        shape: typing.Tuple[int, int, int, int, int],
+        dtype: numpy.typing.DTypeLike,
+        channel_names: typing.Optional[typing.List[str]] = None,
+    ) -> None:
+        """Constructor.
+
+        Parameters
+        ----------
+        uri : Union[str, Path]
+            Path of the file to write.
+        shape : Tuple[int, int, int, int, int]
+            TCZYX shape of the image.
+        dtype : numpy.typing.DTypeLike
+            Data type of the image.
+        channel_names : Optional[List[str]]
+            Names of the C channels of the image.
+        """
+        if len(shape) != 5:
+            raise ValueError(f"Expected a TCZYX shape. Got: {shape}")
+
+        if channel_names is not None and len(channel_names) != shape[1]:
+            raise ValueError(
+                f"Expected {shape[1]} channel names. Got: {len(channel_names)}"
+            )
+
+        self._uri = pathlib.Path(uri)
+        self._shape = tuple(int(dim) for dim in shape)
+        self._dtype = numpy.dtype(dtype)
+        self._channel_names = (
+            [str(channel_name) for channel_name in channel_names]
+            if channel_names is not None
+            else None
+        )
+
+    @property
+    def uri(self) -> pathlib.Path:
+        return self._uri
+
+    @property
+    def shape(self) -> typing.Tuple[int, ...]:
+        """TCZYX shape of the image."""
+        return self._shape
+
+    @property
+    def dtype(self) -> numpy.dtype:
+        return self._dtype
+
+    @property
+    def buffer_nbytes(self) -> int:
+        """Estimate of the memory, in bytes, that `write` holds on top of the timepoint it was last given:
+        e.g. earlier timepoints kept back to be written together, and buffers for compressing them.
+        """
+        return 0
+
+    def write(self, timepoints: typing.Iterable[numpy.typing.NDArray]) -> None:
+        """Write the image, consuming its CZYX `timepoints` in order, replacing any image already at `uri`.
+
+        Raises ValueError if `timepoints` does not yield exactly T timepoints of the expected shape and dtype.
+        """
+        partial_uri = self._uri.with_name(
+            f".partial-{uuid.uuid4().hex[:12]}-{self._uri.name}"
+        )
+        try:
+            self._write(timepoints, partial_uri)
+            _replace(partial_uri, self._uri)
+        except BaseException:
+            _remove(partial_uri)
+            raise
+
+    @abc.abstractmethod
+    def _write(
+        self, timepoints: typing.Iterable[numpy.typing.NDArray], uri: pathlib.Path
+    ) -> None:
+        """Write the image to `uri` (rather than to `self.uri`; see `write`), consuming its CZYX `timepoints`."""
+        pass
+
+    def _checked_timepoints(
+        self, timepoints: typing.Iterable[numpy.typing.NDArray]
+    ) -> typing.Iterator[typing.Tuple[int, numpy.typing.NDArray]]:
+        """Enumerate `timepoints`, validating the shape and dtype of each and that there are exactly T of them."""
+        number_of_timepoints, *timepoint_shape = self._shape
+        timepoint_index = -1
+        for timepoint_index, timepoint in enumerate(timepoints):
+            if timepoint_index >= number_of_timepoints:
+                raise ValueError(
+                    f"Expected {number_of_timepoints} timepoints, got more for {self._uri}"
+                )
+            if (
+                timepoint.shape != tuple(timepoint_shape)
+                or timepoint.dtype != self._dtype
+            ):
+                raise ValueError(
+                    f"Expected {self._dtype} timepoints of shape {tuple(timepoint_shape)}. "
+                    f"Got: {timepoint.dtype} timepoint of shape {timepoint.shape}"
+                )
+            yield timepoint_index, timepoint
+
+        if timepoint_index + 1 != number_of_timepoints:
+            raise ValueError(
+                f"Expected {number_of_timepoints} timepoints, got {timepoint_index + 1} for {self._uri}"
+            )
+
+
+def _replace(source: pathlib.Path, destination: pathlib.Path) -> None:
+    """Move `source` to `destination`, replacing any file or directory there."""
+    if not destination.is_dir() or destination.is_symlink():
+        os.replace(source, destination)
+        return
+
+    # A directory cannot be renamed over one that is not empty: move the old one aside first,
+    # so that `destination` goes without an image for only as long as a rename takes
+    stale = destination.with_name(f".stale-{uuid.uuid4().hex[:12]}-{destination.name}")
+    os.replace(destination, stale)
+    os.replace(source, destination)
+    shutil.rmtree(stale)
+
+
+def _remove(path: pathlib.Path) -> None:
+    """Remove the file or directory at `path`, if there is one."""
+    if path.is_dir() and not path.is_symlink():
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        path.unlink(missing_ok=True)
@@ -0,0 +1,74 @@
+import pathlib
+import typing
+
+from aicsimageio.types import PhysicalPixelSizes
+from aicsimageio.writers import OmeTiffWriter
+from aicsimageio.writers.ome_tiff_writer import (
+    BIGTIFF_BYTE_LIMIT,
+)
+import numpy
+import numpy.typing
+from ome_types import to_xml
+import tifffile
+
+from .image_writer_abc import ImageWriter
+
+
+class OmeTiffImageWriter(ImageWriter):
+    """Writes OME-TIFF files with the same metadata, layout and compression as `aicsimageio.writers.OmeTiffWriter`.
+
+    OmeTiffWriter needs the whole image in memory; this instead passes the image to tifffile as a stream of YX pages.
+    """
+
+    FILE_SUFFIXES = (".ome.tiff", ".ome.tif")
+
+    @property
+    def buffer_nbytes(self) -> int:
+        # A contiguous copy of the page being compressed, and the compressed page
+        *_, Y, X = self._shape
+        return 2 * Y * X * self._dtype.itemsize
+
+    def _write(
+        self, timepoints: typing.Iterable[numpy.typing.NDArray], uri: pathlib.Path
+    ) -> None:
+        ome_xml = OmeTiffWriter.build_ome(
+            [self._shape],
+            [self._dtype],
+            dimension_order=["TCZYX"],
+            channel_names=[self._channel_names],
+            image_name=[None],
+            physical_pixel_sizes=[PhysicalPixelSizes(None, None, None)],
+            channel_colors=[None],
+        )
+        size = int(numpy.prod(self._shape)) * self._dtype.itemsize
+        timepoint_iterator = iter(timepoints)
+
+        with tifffile.TiffWriter(uri, bigtiff=size > BIGTIFF_BYTE_LIMIT) as tif:
+            tif.write(
+                self._pages(timepoint_iterator),
+                shape=self._shape,
+                dtype=self._dtype,
+                description=to_xml(ome_xml).encode(),
+                photometric=tifffile.TIFF.PHOTOMETRIC.MINISBLACK,
+                metadata=None,
+                compression=tifffile.TIFF.COMPRESSION.ADOBE_DEFLATE,
+            )
+
+        # tifffile stops pulling pages once it has the whole image, so extra timepoints are never reached above
+        if next(timepoint_iterator, None) is not None:
+            raise ValueError(
+                f"Expected {self._shape[0]} timepoints, got more for {self._uri}"
+            )
+
+    def _pages(
+        self, timepoints: typing.Iterable[numpy.typing.NDArray]
+    ) -> typing.Iterator[numpy.typing.NDArray]:
+        """YX pages of the image, in TCZ order.
+
+        Pages are made contiguous one at a time, so that a timepoint that is a view (e.g., a cropped region of
+        a larger array, or of a numpy.memmap) is never copied whole.
+        """
+        for _, timepoint in self._checked_timepoints(timepoints):
+            for channel in timepoint:
+                for plane in channel:
+                    yield numpy.ascontiguousarray(plane)
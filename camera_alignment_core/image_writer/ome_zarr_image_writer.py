@@ -0,0 +1,198 @@
+import concurrent.futures
+import itertools
+import pathlib
+import typing
+
+from aicsimageio.metadata.utils import (
+    generate_ome_channel_id,
+)
+from aicsimageio.writers import OmeZarrWriter
+import numcodecs.abc
+import numpy
+import numpy.typing
+from ome_zarr.io import parse_url
+from ome_zarr.writer import (
+    write_multiscales_metadata,
+)
+import zarr
+from zarr.storage import default_compressor
+
+from .image_writer_abc import ImageWriter
+
+# Axes metadata, in TCZYX order, as written by `aicsimageio.writers.OmeZarrWriter`
+AXES = [
+    {"name": "t", "type": "time", "unit": "millisecond"},
+    {"name": "c", "type": "channel"},
+    {"name": "z", "type": "space", "unit": "micrometer"},
+    {"name": "y", "type": "space", "unit": "micrometer"},
+    {"name": "x", "type": "space", "unit": "micrometer"},
+]
+
+
+class OmeZarrImageWriter(ImageWriter):
+    """Writes chunked, compressed OME-Zarr images with the same metadata as `aicsimageio.writers.OmeZarrWriter`.
+
+    Every chunk is an independently compressed object within the store, so readers can pull e.g. a single plane
+    without decoding the rest of the image. Chunks are compressed and written on a thread pool, overlapping with
+    the computation of the next timepoint.
+    """
+
+    FILE_SUFFIXES = (".ome.zarr", ".zarr")
+
+    def __init__(
+        self,
+        uri: typing.Union[str, pathlib.Path],
+        shape: typing.Tuple[int, int, int, int, int],
+        dtype: numpy.typing.DTypeLike,
+        channel_names: typing.Optional[typing.List[str]] = None,
+        chunk_shape: typing.Optional[typing.Tuple[int, int, int, int, int]] = None,
+        compressor: typing.Optional[numcodecs.abc.Codec] = default_compressor,
+        workers: int = 1,
+    ) -> None:
+        """Constructor.
+
+        See `ImageWriter` for a description of `uri`, `shape`, `dtype` and `channel_names`.
+
+        Keyword Arguments
+        -----------------
+        chunk_shape : Optional[Tuple[int, int, int, int, int]]
+            TCZYX shape of the chunks of the image. As in zarr, -1 spans the whole of a dimension;
+            e.g., (1, 1, -1, -1, -1) stores a chunk per ZYX volume, and (1, -1, -1, -1, -1) a chunk per timepoint.
+            Default is one chunk per YX plane: (1, 1, 1, -1, -1).
+        compressor : Optional[numcodecs.abc.Codec]
+            Compressor for the chunks of the image, e.g. `numcodecs.Blosc(cname="zstd", clevel=5)`;
+            None to store chunks uncompressed. Default is zarr's default compressor (Blosc with LZ4).
+        workers : int
+            Number of threads across which to spread compressing and writing chunks. Default is 1.
+        """
+        super().__init__(uri, shape, dtype, channel_names)
+
+        if chunk_shape is None:
+            chunk_shape = (1, 1, 1, -1, -1)
+        if len(chunk_shape) != 5:
+            raise ValueError(f"Expected a TCZYX chunk shape. Got: {chunk_shape}")
+
+        if workers < 1:
+            raise ValueError(f"workers: must be at least 1. Got: {workers}")
+
+        self._chunk_shape = chunk_shape
+        self._compressor = compressor
+        self._workers = workers
+
+    @property
+    def buffer_nbytes(self) -> int:
+        chunk_shape = [
+            dim if chunk_dim == -1 else min(chunk_dim, dim)
+            for chunk_dim, dim in zip(self._chunk_shape, self._shape)
+        ]
+        timepoint_nbytes = int(numpy.prod(self._shape[1:])) * self._dtype.itemsize
+        chunk_nbytes = int(numpy.prod(chunk_shape)) * self._dtype.itemsize
+
+        # The previous row stays in memory until written, while the current one is gathered (and then stacked,
+        # if it spans more than one timepoint); each thread holds a copy of a chunk and its compressed bytes.
+        timepoints_per_chunk = chunk_shape[0]
+        held_timepoints = (
+            1 if timepoints_per_chunk == 1 else 3 * timepoints_per_chunk - 1
+        )
+        return held_timepoints * timepoint_nbytes + 2 * self._workers * chunk_nbytes
+
+    def _write(
+        self, timepoints: typing.Iterable[numpy.typing.NDArray], uri: pathlib.Path
+    ) -> None:
+        number_of_timepoints, number_of_channels, number_of_z_slices, *_ = self._shape
+        image_name, *_ = self._uri.name.split(".")
+
+        group = zarr.group(store=parse_url(uri, mode="w").store, overwrite=True)
+        group.attrs["omero"] = OmeZarrWriter.build_ome(
+            number_of_z_slices,
+            image_name,
+            channel_names=self._channel_names
+            or [
+                generate_ome_channel_id(image_id=image_name, channel_id=channel)
+                for channel in range(number_of_channels)
+            ],
+            channel_colors=list(range(number_of_channels)),
+            channel_minmax=[(0.0, 1.0)] * number_of_channels,
+        )
+        array = group.create_dataset(
+            "0",
+            shape=self._shape,
+            chunks=self._chunk_shape,
+            dtype=self._dtype,
+            compressor=self._compressor,
+        )
+        write_multiscales_metadata(
+            group,
+            datasets=[
+                {
+                    "path": "0",
+                    "coordinateTransformations": [
+                        {"type": "scale", "scale": [1.0] * len(self._shape)}
+                    ],
+                }
+            ],
+            axes=AXES,
+        )
+
+        # Timepoints are written a row of chunks (along T) at a time. While a row is being written,
+        # the timepoints of the next one are gathered; at most two rows are held in memory.
+        timepoints_per_chunk = array.chunks[0]
+        row: typing.List[numpy.typing.NDArray] = []
+        pending: typing.List[concurrent.futures.Future] = []
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self._workers
+        ) as executor:
+            for timepoint_index, timepoint in self._checked_timepoints(timepoints):
+                row.append(timepoint)
+                if (
+                    len(row) == timepoints_per_chunk
+                    or timepoint_index + 1 == number_of_timepoints
+                ):
+                    self._wait(pending)
+                    pending = self._write_row(
+                        executor, array, timepoint_index + 1 - len(row), row
+                    )
+                    row = []
+            self._wait(pending)
+
+    def _write_row(
+        self,
+        executor: concurrent.futures.Executor,
+        array: zarr.Array,
+        t_start: int,
+        row: typing.List[numpy.typing.NDArray],
+    ) -> typing.List[concurrent.futures.Future]:
+        """Submit writes of the chunks of `row`, a list of consecutive timepoints starting at `t_start`."""
+        data = numpy.stack(row) if len(row) > 1 else row[0][numpy.newaxis]
+        _, chunk_c, chunk_z, chunk_y, chunk_x = array.chunks
+        _, C, Z, Y, X = self._shape
+
+        # Each write covers whole chunks, so that no two writes touch the same chunk
+        futures = []
+        for c, z, y, x in itertools.product(
+            range(0, C, chunk_c),
+            range(0, Z, chunk_z),
+            range(0, Y, chunk_y),
+            range(0, X, chunk_x),
+        ):
+            region = (
+                slice(c, c + chunk_c),
+                slice(z, z + chunk_z),
+                slice(y, y + chunk_y),
+                slice(x, x + chunk_x),
+            )
+            futures.append(
+                executor.submit(
+                    array.__setitem__,
+                    (slice(t_start, t_start + len(row)), *region),
+                    data[(slice(None), *region)],
+                )
+            )
+
+        return futures
+
+    @staticmethod
+    def _wait(futures: typing.List[concurrent.futures.Future]) -> None:
+        """Wait for `futures`, re-raising the first exception raised by any of them."""
+        for future in futures:
+            future.result()
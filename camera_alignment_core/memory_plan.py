@@ -0,0 +1,165 @@
+import logging
+import typing
+
+import numpy
+import numpy.typing
+
+from .alignment_core import (
+    TILED_INTERPOLATION_ORDERS,
+)
+from .constants import LOGGER_NAME
+from .exception import MemoryBudgetExceeded
+
+log = logging.getLogger(LOGGER_NAME)
+
+# Timepoints held at once by each of the input and output stages when reading, aligning and writing overlap:
+# one being produced, one queued for the next stage and one being consumed by it
+PIPELINED_TIMEPOINTS = 3
+
+# Most memory any WarpMap engine holds (or allocates while being built) per output pixel:
+# two float64 source coordinates
+WARP_MAP_BYTES_PER_PIXEL = 16
+
+# Most memory resampling one tile takes per output pixel: the source region and its float64 copy,
+# the tile's WarpMap and its floating point samples
+TILE_BYTES_PER_PIXEL = 64
+
+# Tile sizes tried for out-of-core alignment, largest (fastest) first
+TILE_SIZES = (2048, 1024, 512, 256, 128, 64)
+
+
+class MemoryPlan(typing.NamedTuple):
+    # Whether reading, aligning and writing timepoints overlap, at the cost of holding more of them in memory
+    pipelined: bool
+
+    # Number of threads resampling each timepoint
+    workers: int
+
+    # None to align whole timepoints in memory; otherwise the (Y, X) shape of the tiles in which each timepoint
+    # is aligned out of core, staged through scratch files (see `alignment_core.align_image_tiled`)
+    tile_shape: typing.Optional[typing.Tuple[int, int]]
+
+    # Estimated peak memory of the plan, in bytes
+    estimated_bytes: int
+
+
+def plan_memory(
+    max_memory_bytes: int,
+    input_shape: typing.Tuple[int, int, int, int],
+    output_shape: typing.Tuple[int, int, int, int],
+    dtype: numpy.typing.DTypeLike,
+    interpolation: int = 0,
+    shift: bool = True,
+    workers: int = 1,
+    writer_buffer_nbytes: int = 0,
+) -> MemoryPlan:
+    """Pick how much of an image to align at once to stay within `max_memory_bytes`, from its dimensions alone.
+
+    Plans are tried from fastest to leanest, and the first whose estimated peak memory fits is returned:
+        1. Whole timepoints in memory, with reading, aligning and writing overlapped (as `Align.align_image` does
+           without a budget).
+        2. Whole timepoints in memory, one at a time, with `workers` threads and then with fewer.
+        3. One timepoint at a time, aligned out of core in YX tiles (only for interpolation orders supported by
+           `camera_alignment_core.alignment_core.align_image_tiled`), with the largest tiles that fit.
+
+    Estimates are of the arrays allocated while aligning; they err on the high side, but do not include
+    the interpreter, the reader of the image or WarpMaps cached for other images.
+
+    Parameters
+    ----------
+    max_memory_bytes : int
+        Memory budget, in bytes.
+    input_shape : Tuple[int, int, int, int]
+        CZYX shape of each timepoint read from the image.
+    output_shape : Tuple[int, int, int, int]
+        CZYX shape of each aligned (and possibly cropped) timepoint.
+    dtype : numpy.typing.DTypeLike
+        Data type of the image.
+
+    Keyword Arguments
+    -----------------
+    interpolation : int
+        Interpolation order used to apply the alignment transform. Default is 0.
+    shift : bool
+        Whether any channel is resampled, rather than only cropped. Default is True.
+    workers : int
+        Most threads to resample each timepoint with. Default is 1.
+    writer_buffer_nbytes : int
+        Memory held by the writer of the aligned image (see `camera_alignment_core.image_writer.ImageWriter`).
+        Default is 0.
+
+    Returns
+    -------
+    MemoryPlan
+
+    Raises
+    ------
+    MemoryBudgetExceeded
+        If no plan fits within `max_memory_bytes`. The message states the estimate of the leanest plan.
+    """
+    if max_memory_bytes < 1:
+        raise ValueError(
+            f"max_memory_bytes: must be at least 1. Got: {max_memory_bytes}"
+        )
+
+    if workers < 1:
+        raise ValueError(f"workers: must be at least 1. Got: {workers}")
+
+    itemsize = numpy.dtype(dtype).itemsize
+    number_of_channels, number_of_z_slices, Y, X = input_shape
+    *_, output_y, output_x = output_shape
+    input_nbytes = int(numpy.prod(input_shape)) * itemsize
+    output_nbytes = int(numpy.prod(output_shape)) * numpy.dtype(numpy.uint16).itemsize
+
+    def in_memory_bytes(pipelined: bool, plan_workers: int) -> int:
+        timepoints = PIPELINED_TIMEPOINTS if pipelined else 1
+        # A timepoint being read is briefly held twice, as decoded and as selected
+        nbytes = timepoints * (input_nbytes + output_nbytes) + input_nbytes
+        if shift:
+            nbytes += WARP_MAP_BYTES_PER_PIXEL * output_y * output_x
+            # Each thread converts an input plane to float64 and samples an output plane in float64
+            nbytes += plan_workers * 8 * (Y * X + 2 * output_y * output_x)
+            # Mask of black pixels, checked after cropping
+            nbytes += int(numpy.prod(output_shape))
+        return nbytes + writer_buffer_nbytes
+
+    def tiled_bytes(tile_shape: typing.Tuple[int, int]) -> int:
+        # Each channel is read as a ZYX volume into scratch, then resampled one tile at a time
+        nbytes = 2 * number_of_z_slices * Y * X * itemsize
+        if shift:
+            nbytes += TILE_BYTES_PER_PIXEL * tile_shape[0] * tile_shape[1]
+        return nbytes + writer_buffer_nbytes
+
+    candidates = [
+        MemoryPlan(True, workers, None, in_memory_bytes(True, workers)),
+        *(
+            MemoryPlan(False, plan_workers, None, in_memory_bytes(False, plan_workers))
+            for plan_workers in range(workers, 0, -1)
+        ),
+    ]
+    if not shift or interpolation in TILED_INTERPOLATION_ORDERS:
+        for tile_size in TILE_SIZES:
+            tile_shape = (min(tile_size, Y), min(tile_size, X))
+            candidates.append(MemoryPlan(False, 1, tile_shape, tiled_bytes(tile_shape)))
+
+    for plan in candidates:
+        if plan.estimated_bytes <= max_memory_bytes:
+            log.debug("Planned to align within %s bytes: %s", max_memory_bytes, plan)
+            return plan
+
+    leanest = min(candidates, key=lambda plan: plan.estimated_bytes)
+    raise MemoryBudgetExceeded(
+        f"Aligning timepoints of shape {tuple(input_shape)} ({numpy.dtype(dtype)}) needs an estimated "
+        f"{_format_bytes(leanest.estimated_bytes)} ({leanest.estimated_bytes} bytes) at the least, "
+        f"more than max_memory_bytes={max_memory_bytes} ({_format_bytes(max_memory_bytes)}). "
+        + (
+            "Select fewer output channels or raise the budget."
+            if leanest.tile_shape is not None
+            else f"Select fewer output channels, raise the budget, or use one of interpolation orders "
+            f"{TILED_INTERPOLATION_ORDERS} to align out of core."
+        )
+    )
+
+
+def _format_bytes(nbytes: int) -> str:
+    return f"{nbytes / 1024**2:.1f} MiB"
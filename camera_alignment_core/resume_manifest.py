@@ -0,0 +1,174 @@
+import hashlib
+import json
+import logging
+import os
+import pathlib
+import typing
+
+import numpy
+import numpy.typing
+
+from .constants import LOGGER_NAME
+from .transform_cache import update_digest
+
+log = logging.getLogger(LOGGER_NAME)
+
+
+class AlignmentUnit(typing.NamedTuple):
+    """Identity of one aligned scene: everything that determines the content of its output."""
+
+    # Checksum identifying the unaligned image (see `input_checksum`)
+    input_checksum: str
+
+    # Scene of the image
+    scene: int
+
+    # Timepoints of the scene that were aligned; empty for every timepoint
+    timepoints: typing.Tuple[int, ...]
+
+    # Checksum of the alignment matrix (see `transform_checksum`)
+    transform_checksum: str
+
+    # Checksum of every other option that affects the output, e.g. channels, interpolation and cropping
+    options_checksum: str
+
+    # Path of the output, relative to the directory of the manifest
+    output: str
+
+
+class ResumeManifest:
+    """Record of the scenes aligned into a directory, so that a run that is interrupted (or repeated) can skip
+    those already done.
+
+    The manifest is a JSON Lines file within the output directory, appended to as each scene is aligned,
+    so that it survives the process dying at any point: each line records an `AlignmentUnit` along with
+    a checksum of its output. A unit is complete if it is recorded and its output still has that checksum;
+    outputs are only ever moved into place once whole (see `camera_alignment_core.image_writer.ImageWriter`),
+    so an output that is missing or changed is simply aligned again.
+
+    Example
+    -------
+    >>> manifest = ResumeManifest("/tmp/aligned")
+    >>> if not manifest.is_complete(unit):
+    >>>     align(...)
+    >>>     manifest.record(unit)
+    """
+
+    FILE_NAME = "alignment-manifest.jsonl"
+
+    def __init__(self, out_dir: typing.Union[str, pathlib.Path]) -> None:
+        """Constructor.
+
+        Parameters
+        ----------
+        out_dir : Union[str, Path]
+            Directory of the aligned images, and of the manifest. Neither need exist.
+        """
+        self._out_dir = pathlib.Path(out_dir)
+        self._output_checksums: typing.Dict[AlignmentUnit, str] = {}
+
+        # Whether the last line was cut short by the process appending it dying, and so lacks its newline
+        self._truncated = False
+        if self.path.exists():
+            text = self.path.read_text()
+            self._truncated = bool(text) and not text.endswith("\n")
+            for line_number, line in enumerate(text.splitlines(), start=1):
+                if not line.strip():
+                    continue
+
+                try:
+                    entry = json.loads(line)
+                    output_checksum = entry.pop("output_checksum")
+                    unit = AlignmentUnit(
+                        **{**entry, "timepoints": tuple(entry["timepoints"])}
+                    )
+                except (ValueError, KeyError, TypeError):
+                    log.warning(
+                        "Ignoring unreadable line %s of %s", line_number, self.path
+                    )
+                    continue
+                self._output_checksums[unit] = output_checksum
+
+    @property
+    def path(self) -> pathlib.Path:
+        return self._out_dir / self.FILE_NAME
+
+    def is_complete(self, unit: AlignmentUnit) -> bool:
+        """Whether `unit` has been recorded, and its output is still there, unchanged."""
+        output_checksum = self._output_checksums.get(unit)
+        if output_checksum is None:
+            return False
+
+        output = self._out_dir / unit.output
+        if not output.exists():
+            log.info("Realigning %s: the output is missing", output)
+            return False
+
+        if path_checksum(output) != output_checksum:
+            log.warning(
+                "Realigning %s: the output has changed since it was aligned", output
+            )
+            return False
+
+        return True
+
+    def record(self, unit: AlignmentUnit) -> None:
+        """Record `unit` as complete, with the checksum of its output as it is now."""
+        output_checksum = path_checksum(self._out_dir / unit.output)
+        line = json.dumps({**unit._asdict(), "output_checksum": output_checksum})
+
+        # One write of a whole line, flushed to disk before returning, so that at worst a line is cut short
+        # by the process dying; such a line is ignored when read back, and ended before appending another
+        self._out_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a") as file:
+            file.write(("\n" if self._truncated else "") + line + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+        self._truncated = False
+        self._output_checksums[unit] = output_checksum
+
+
+def input_checksum(
+    image: typing.Union[str, pathlib.Path], verify_content: bool = False
+) -> typing.Optional[str]:
+    """SHA-256 checksum identifying the image at `image` across runs: of its resolved path and of the size and
+    modification time of the file (or of every file within the directory) there, which only costs a stat of each.
+    If `verify_content`, of its content instead (see `path_checksum`), which costs a read of all of it.
+
+    None if `image` is not a local file or directory (e.g. a URL), which cannot be identified so.
+    """
+    if "://" in str(image) or not pathlib.Path(image).exists():
+        return None
+
+    if verify_content:
+        return path_checksum(image)
+
+    root = pathlib.Path(image).resolve()
+    files = (
+        sorted(child for child in root.rglob("*") if child.is_file())
+        if root.is_dir()
+        else [root]
+    )
+    digest = hashlib.sha256(str(root).encode())
+    for file_path in files:
+        stat = file_path.stat()
+        digest.update(
+            json.dumps(
+                [str(file_path.relative_to(root)), stat.st_size, stat.st_mtime_ns]
+            ).encode()
+        )
+    return digest.hexdigest()
+
+
+def path_checksum(path: typing.Union[str, pathlib.Path]) -> str:
+    """SHA-256 checksum of the content of the file, or of every file within the directory, at `path`."""
+    digest = hashlib.sha256()
+    update_digest(digest, path)
+    return digest.hexdigest()
+
+
+def transform_checksum(alignment_matrix: numpy.typing.NDArray) -> str:
+    """SHA-256 checksum of `alignment_matrix`, independent of its dtype."""
+    return hashlib.sha256(
+        numpy.ascontiguousarray(alignment_matrix, dtype=numpy.float64).tobytes()
+    ).hexdigest()
@@ -0,0 +1,236 @@
+import csv
+import json
+import pathlib
+import typing
+
+from aicsimageio.writers import OmeTiffWriter
+import numpy
+import pytest
+
+from camera_alignment_core.alignment_utils import (
+    AlignmentInfo,
+)
+from camera_alignment_core.bin.camera_alignment import (
+    _find_images,
+    main,
+)
+from camera_alignment_core.transform_cache import (
+    load_alignment_transform,
+    save_alignment_transform,
+)
+
+ALIGNMENT_MATRIX = numpy.array(
+    [
+        [1.0013714116607422, -0.0052382809204566, 0.2719881272043381],
+        [0.0052382809204566, 1.0013714116607422, -2.940886545198339],
+        [0.0, 0.0, 1.0],
+    ]
+)
+
+
+@pytest.fixture
+def plate(tmp_path: pathlib.Path) -> pathlib.Path:
+    """Directory of two readable images and one unreadable one."""
+    plate_dir = tmp_path / "plate"
+    plate_dir.mkdir()
+    for name in ("well-A1.ome.tiff", "well-A2.ome.tiff"):
+        OmeTiffWriter.save(
+            data=numpy.random.default_rng(0).integers(
+                0, 4000, size=(1, 2, 2, 620, 920), dtype=numpy.uint16
+            ),
+            uri=plate_dir / name,
+            dim_order="TCZYX",
+        )
+    (plate_dir / "well-A3.ome.tiff").write_bytes(b"not an image")
+    return plate_dir
+
+
+@pytest.fixture
+def transform_path(tmp_path: pathlib.Path) -> pathlib.Path:
+    path = tmp_path / "transform.json"
+    save_alignment_transform(
+        path,
+        ALIGNMENT_MATRIX,
+        AlignmentInfo(rotation=0, shift_x=1, shift_y=-3, z_offset=0, scaling=1),
+    )
+    return path
+
+
+class TestCameraAlignment:
+    @pytest.mark.parametrize("max_workers", [1, 2])
+    def test_aligns_plate_and_writes_json_manifest(
+        self,
+        tmp_path: pathlib.Path,
+        plate: pathlib.Path,
+        transform_path: pathlib.Path,
+        max_workers: int,
+    ):
+        # Arrange
+        out_dir = tmp_path / "aligned"
+
+        # Act
+        exit_status = main(
+            [
+                str(plate),
+                "--transform",
+                str(transform_path),
+                "--magnification",
+                "100",
+                "--channels-to-shift",
+                "1",
+                "--out-dir",
+                str(out_dir),
+                "--max-workers",
+                str(max_workers),
+            ]
+        )
+
+        # Assert
+        assert exit_status == 1
+        manifest = json.loads((out_dir / "manifest.json").read_text())
+        assert [
+            (pathlib.Path(row["image"]).name, row["status"]) for row in manifest
+        ] == [
+            ("well-A1.ome.tiff", "aligned"),
+            ("well-A2.ome.tiff", "aligned"),
+            ("well-A3.ome.tiff", "failed"),
+        ]
+        for row in manifest[:2]:
+            assert row["scene"] == 0
+            assert pathlib.Path(row["output"]).exists()
+            assert row["seconds"] >= 0
+            assert row["error"] is None
+        assert manifest[2]["output"] is None
+        assert manifest[2]["error"]
+
+    def test_writes_csv_manifest(
+        self, tmp_path: pathlib.Path, plate: pathlib.Path, transform_path: pathlib.Path
+    ):
+        # Arrange
+        manifest_path = tmp_path / "manifest.csv"
+
+        # Act
+        exit_status = main(
+            [
+                str(plate / "well-A*.ome.tiff"),
+                "--transform",
+                str(transform_path),
+                "--magnification",
+                "100",
+                "--channels-to-shift",
+                "1",
+                "--out-dir",
+                str(tmp_path / "aligned"),
+                "--manifest",
+                str(manifest_path),
+                "--no-crop",
+            ]
+        )
+
+        # Assert
+        assert exit_status == 1
+        with open(manifest_path, newline="") as file:
+            rows = list(csv.DictReader(file))
+        assert [row["status"] for row in rows] == ["aligned", "aligned", "failed"]
+        assert rows[0]["scene"] == "0"
+
+    def test_saves_transform_for_reuse(
+        self, tmp_path: pathlib.Path, plate: pathlib.Path, transform_path: pathlib.Path
+    ):
+        # Arrange
+        saved_transform_path = tmp_path / "saved.json"
+
+        # Act
+        exit_status = main(
+            [
+                str(plate / "well-A1.ome.tiff"),
+                "--transform",
+                str(transform_path),
+                "--save-transform",
+                str(saved_transform_path),
+                "--magnification",
+                "100",
+                "--channels-to-shift",
+                "1",
+                "--out-dir",
+                str(tmp_path / "aligned"),
+            ]
+        )
+
+        # Assert
+        assert exit_status == 0
+        alignment_matrix, _ = load_alignment_transform(saved_transform_path)
+        numpy.testing.assert_array_equal(alignment_matrix, ALIGNMENT_MATRIX)
+
+    @pytest.mark.parametrize(
+        "resume_args", [["--resume"], ["--resume", "--verify-input"]]
+    )
+    def test_resume_skips_aligned_scenes(
+        self,
+        tmp_path: pathlib.Path,
+        plate: pathlib.Path,
+        transform_path: pathlib.Path,
+        resume_args: typing.List[str],
+    ):
+        # Arrange
+        out_dir = tmp_path / "aligned"
+        argv = [
+            str(plate / "well-A1.ome.tiff"),
+            "--transform",
+            str(transform_path),
+            "--magnification",
+            "100",
+            "--channels-to-shift",
+            "1",
+            "--out-dir",
+            str(out_dir),
+            *resume_args,
+        ]
+        main(argv)
+
+        # Act
+        exit_status = main(argv)
+
+        # Assert
+        assert exit_status == 0
+        [row] = json.loads((out_dir / "manifest.json").read_text())
+        assert row["status"] == "skipped"
+        assert pathlib.Path(row["output"]).exists()
+
+    def test_requires_a_transform_or_optical_control(self, tmp_path: pathlib.Path):
+        # Act / Assert
+        with pytest.raises(SystemExit):
+            main(
+                [
+                    str(tmp_path),
+                    "--magnification",
+                    "100",
+                    "--channels-to-shift",
+                    "1",
+                    "--out-dir",
+                    str(tmp_path),
+                ]
+            )
+
+
+class TestFindImages:
+    def test_expands_directories_and_globs(self, tmp_path: pathlib.Path):
+        # Arrange
+        for name in ("b.czi", "a.czi", ".hidden.czi", "c.ome.zarr/0/.zarray"):
+            (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+            (tmp_path / name).touch()
+        (tmp_path / "aligned").mkdir()
+        (tmp_path / "aligned" / "a_aligned.ome.tiff").touch()
+
+        # Act
+        images = _find_images(
+            [str(tmp_path), str(tmp_path / "*.czi"), str(tmp_path / "aligned" / "*")],
+            exclude=tmp_path / "aligned",
+        )
+
+        # Assert
+        assert images == [
+            tmp_path / "a.czi",
+            tmp_path / "b.czi",
+            tmp_path / "c.ome.zarr",
+        ]
@@ -0,0 +1,335 @@
+import http.client
+import json
+import pathlib
+import shutil
+import socket
+import threading
+import typing
+
+from aicsimageio.types import PhysicalPixelSizes
+from aicsimageio.writers import OmeTiffWriter
+import numpy
+import pytest
+
+from camera_alignment_core.align import (
+    Align,
+)
+from camera_alignment_core.alignment_utils import (
+    AlignmentInfo,
+)
+from camera_alignment_core.bin import (
+    camera_alignment_server,
+)
+from camera_alignment_core.bin.camera_alignment_server import (
+    AlignmentRequestHandler,
+    AlignmentService,
+    LoopbackAlignmentServer,
+    UnixAlignmentServer,
+)
+from camera_alignment_core.constants import (
+    Magnification,
+)
+from camera_alignment_core.transform_cache import (
+    TransformCache,
+)
+
+ALIGNMENT_MATRIX = numpy.array(
+    [
+        [1.0013714116607422, -0.0052382809204566, 0.2719881272043381],
+        [0.0052382809204566, 1.0013714116607422, -2.940886545198339],
+        [0.0, 0.0, 1.0],
+    ]
+)
+
+
+@pytest.fixture
+def optical_control(tmp_path: pathlib.Path) -> pathlib.Path:
+    """Stand-in optical control, whose transform is already in the transform cache at tmp_path / "transforms"."""
+    path = tmp_path / "argolight.ome.tiff"
+    OmeTiffWriter.save(
+        data=numpy.zeros((1, 3, 1, 64, 64), dtype=numpy.uint16),
+        uri=path,
+        dim_order="TCZYX",
+        physical_pixel_sizes=PhysicalPixelSizes(1.0, 0.1, 0.1),
+    )
+    cache = TransformCache(tmp_path / "transforms")
+    cache.put(
+        cache.key(path, 1, 2, Magnification(100)),
+        ALIGNMENT_MATRIX,
+        AlignmentInfo(rotation=0, shift_x=1, shift_y=-3, z_offset=0, scaling=1),
+    )
+    return path
+
+
+@pytest.fixture
+def image(tmp_path: pathlib.Path) -> pathlib.Path:
+    path = tmp_path / "image.ome.tiff"
+    OmeTiffWriter.save(
+        data=numpy.random.default_rng(0).integers(
+            0, 4000, size=(1, 3, 2, 620, 920), dtype=numpy.uint16
+        ),
+        uri=path,
+        dim_order="TCZYX",
+    )
+    return path
+
+
+def align_request(
+    image: pathlib.Path, optical_control: pathlib.Path, out_dir: pathlib.Path
+) -> typing.Dict[str, typing.Any]:
+    return {
+        "image": str(image),
+        "optical_control": str(optical_control),
+        "magnification": 100,
+        "channels_to_shift": [1],
+        "out_dir": str(out_dir),
+        "reference_channel": 1,
+        "shift_channel": 2,
+    }
+
+
+class TestAlignmentService:
+    def test_keeps_transforms_warm_between_requests(
+        self,
+        tmp_path: pathlib.Path,
+        optical_control: pathlib.Path,
+        image: pathlib.Path,
+    ):
+        # Arrange
+        service = AlignmentService(transform_cache_dir=tmp_path / "transforms")
+        first = service.align(align_request(image, optical_control, tmp_path / "first"))
+        # Only the transform held in memory can serve the next requests
+        for cached in (tmp_path / "transforms").iterdir():
+            cached.unlink()
+        optical_control.unlink()
+
+        # Act
+        second = service.align(
+            {
+                **align_request(image, optical_control, tmp_path / "second"),
+                "output_channels": [0, 1],
+            }
+        )
+
+        # Assert
+        assert service.optical_controls == [str(optical_control.resolve())]
+        for response in (first, second):
+            assert [scene["scene"] for scene in response["aligned_scenes"]] == [0]
+            assert pathlib.Path(response["aligned_scenes"][0]["path"]).exists()
+            assert response["seconds"] >= 0
+        assert pathlib.Path(second["aligned_scenes"][0]["path"]).parent == (
+            tmp_path / "second"
+        )
+
+    def test_generates_transform_without_blocking_other_requests(
+        self,
+        tmp_path: pathlib.Path,
+        optical_control: pathlib.Path,
+        image: pathlib.Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        # Arrange
+        # Same content, so its transform is in the transform cache too
+        slow_optical_control = tmp_path / "slow" / optical_control.name
+        slow_optical_control.parent.mkdir()
+        shutil.copy(optical_control, slow_optical_control)
+        generating = threading.Event()
+        release = threading.Event()
+        generations: typing.List[pathlib.Path] = []
+
+        def blocking_align(
+            optical_control: pathlib.Path, *args: typing.Any, **kwargs: typing.Any
+        ) -> Align:
+            if "alignment_transform" not in kwargs:
+                generations.append(optical_control)
+                if optical_control == slow_optical_control.resolve():
+                    generating.set()
+                    release.wait(timeout=10)
+            return Align(optical_control, *args, **kwargs)
+
+        monkeypatch.setattr(camera_alignment_server, "Align", blocking_align)
+        service = AlignmentService(transform_cache_dir=tmp_path / "transforms")
+        slow_requests = [
+            threading.Thread(
+                target=service.alignment_transform,
+                args=(slow_optical_control, Magnification(100), 1, 2),
+            )
+            for _ in range(2)
+        ]
+        for slow_request in slow_requests:
+            slow_request.start()
+        assert generating.wait(timeout=10)
+
+        # Act
+        response = service.align(align_request(image, optical_control, tmp_path))
+        optical_controls = service.optical_controls
+        still_generating = any(thread.is_alive() for thread in slow_requests)
+        release.set()
+        for slow_request in slow_requests:
+            slow_request.join()
+
+        # Assert
+        assert still_generating
+        assert pathlib.Path(response["aligned_scenes"][0]["path"]).exists()
+        assert optical_controls == [str(optical_control.resolve())]
+        assert service.optical_controls == sorted(
+            [str(optical_control.resolve()), str(slow_optical_control.resolve())]
+        )
+        # The second request for the slow transform waited for the first to generate it
+        assert generations.count(slow_optical_control.resolve()) == 1
+
+    @pytest.mark.parametrize(
+        "change, message",
+        [
+            ({"image": None}, "image"),
+            ({"magnification": "100"}, "magnification"),
+            ({"scenes": 0}, "scenes"),
+            ({"crop": False}, "Unknown"),
+        ],
+    )
+    def test_rejects_invalid_request(
+        self,
+        tmp_path: pathlib.Path,
+        change: typing.Dict[str, typing.Any],
+        message: str,
+    ):
+        # Arrange
+        service = AlignmentService()
+        request = {
+            **align_request(
+                tmp_path / "image.czi", tmp_path / "argolight.czi", tmp_path
+            ),
+            **change,
+        }
+
+        # Act / Assert
+        with pytest.raises(ValueError, match=message):
+            service.align(request)
+
+
+class TestAlignmentServer:
+    @pytest.mark.parametrize("address", ["unix", "loopback"])
+    def test_serves_align_requests(
+        self,
+        tmp_path: pathlib.Path,
+        optical_control: pathlib.Path,
+        image: pathlib.Path,
+        address: str,
+    ):
+        # Arrange
+        service = AlignmentService(transform_cache_dir=tmp_path / "transforms")
+        server: typing.Union[UnixAlignmentServer, LoopbackAlignmentServer]
+        if address == "unix":
+            socket_path = tmp_path / "server.sock"
+            server = UnixAlignmentServer(socket_path, service)
+
+            def connect() -> http.client.HTTPConnection:
+                connection = http.client.HTTPConnection("localhost")
+                connection.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                connection.sock.connect(str(socket_path))
+                return connection
+
+        else:
+            server = LoopbackAlignmentServer(0, service)
+
+            def connect() -> http.client.HTTPConnection:
+                return http.client.HTTPConnection(*server.server_address)
+
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+
+        def post(body: typing.Dict[str, typing.Any]) -> typing.Tuple[int, typing.Any]:
+            connection = connect()
+            connection.request("POST", "/align", json.dumps(body))
+            response = connection.getresponse()
+            return response.status, json.loads(response.read())
+
+        try:
+            # Act
+            aligned = post(align_request(image, optical_control, tmp_path / "out"))
+            invalid = post({"image": str(image)})
+            missing_optical_control = post(
+                align_request(image, tmp_path / "missing.czi", tmp_path / "out")
+            )
+            failed = post(
+                align_request(tmp_path / "missing.czi", optical_control, tmp_path)
+            )
+            connection = connect()
+            connection.request("GET", "/health")
+            health = json.loads(connection.getresponse().read())
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        # Assert
+        status, body = aligned
+        assert status == 200
+        assert pathlib.Path(body["aligned_scenes"][0]["path"]).exists()
+        assert invalid[0] == 400
+        assert missing_optical_control[0] == 400
+        assert "missing.czi" in missing_optical_control[1]["error"]
+        assert failed[0] == 500
+        assert failed[1]["error"]
+        assert health == {
+            "status": "ok",
+            "optical_controls": [str(optical_control.resolve())],
+        }
+        if address == "unix":
+            assert not socket_path.exists()
+
+    def test_reports_failure_to_read_request(
+        self,
+        tmp_path: pathlib.Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        # Arrange
+        # Reading a body that never arrives times out
+        monkeypatch.setattr(AlignmentRequestHandler, "timeout", 0.5)
+        server = LoopbackAlignmentServer(0, AlignmentService())
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+
+        try:
+            # Act
+            with socket.create_connection(
+                ("127.0.0.1", server.server_port)
+            ) as connection:
+                connection.sendall(
+                    b"POST /align HTTP/1.1\r\nHost: localhost\r\nContent-Length: 100\r\n\r\n"
+                )
+                response = http.client.HTTPResponse(connection)
+                response.begin()
+                status, body = response.status, json.loads(response.read())
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        # Assert
+        assert status == 500
+        assert "timed out" in body["error"]
+
+    def test_responds_to_unexpected_error(self, monkeypatch: pytest.MonkeyPatch):
+        # Arrange
+        def failing_align(
+            self: AlignmentService, request: typing.Dict[str, typing.Any]
+        ) -> typing.Dict[str, typing.Any]:
+            raise RuntimeError("Bug")
+
+        monkeypatch.setattr(AlignmentService, "align", failing_align)
+        server = LoopbackAlignmentServer(0, AlignmentService())
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+
+        try:
+            # Act
+            connection = http.client.HTTPConnection(*server.server_address)
+            connection.request("POST", "/align", json.dumps({}))
+            response = connection.getresponse()
+            status, body = response.status, json.loads(response.read())
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        # Assert
+        assert status == 500
+        assert "Bug" in body["error"]
@@ -1,14 +1,30 @@
+import asyncio
+import concurrent.futures
+import os
 import pathlib
 import shutil
 import tempfile
+import threading
+import time
 import typing
 
 from aicsimageio import AICSImage
+from aicsimageio.types import PhysicalPixelSizes
 from aicsimageio.writers import OmeTiffWriter
+import dask.array
 import numpy
 import pytest
 
 from camera_alignment_core import Align
+import camera_alignment_core.align
+from camera_alignment_core.align import (
+    AlignedImage,
+    AlignmentTransform,
+    _prefetch,
+)
+from camera_alignment_core.alignment_utils import (
+    AlignmentInfo,
+)
 from camera_alignment_core.channel_info import (
     CameraPosition,
     channel_info_factory,
@@ -16,6 +32,21 @@ from camera_alignment_core.channel_info import (
 from camera_alignment_core.constants import (
     Magnification,
 )
+from camera_alignment_core.exception import (
+    MemoryBudgetExceeded,
+)
+from camera_alignment_core.image_writer import (
+    image_writer_factory,
+)
+from camera_alignment_core.memory_plan import (
+    MemoryPlan,
+)
+from camera_alignment_core.resume_manifest import (
+    ResumeManifest,
+)
+from camera_alignment_core.transform_cache import (
+    TransformCache,
+)
 
 from . import (
     ARGOLIGHT_OPTICAL_CONTROL_IMAGE_URL,
@@ -240,3 +271,933 @@ class TestAlign:
         assert AICSImage(aligned_image_info.path).dims.T == len(
             timepoint_selection_spec
         )
+
+    def test_aligns_selected_output_channels(
+        self,
+        auto_clean_tmp_dir: pathlib.Path,
+        multi_timepoint_image: pathlib.Path,
+    ) -> None:
+        # Arrange
+        _, optical_control_image_path = get_test_image(
+            ARGOLIGHT_OPTICAL_CONTROL_IMAGE_URL
+        )
+        align = Align(
+            optical_control_image_path,
+            Magnification.ONE_HUNDRED,
+            out_dir=auto_clean_tmp_dir / "all",
+        )
+        [expected_scene] = align.align_image(
+            multi_timepoint_image, channels_to_shift=[0, 2]
+        )
+        expected = AICSImage(expected_scene.path)
+        selective_align = Align(
+            optical_control_image_path,
+            Magnification.ONE_HUNDRED,
+            out_dir=auto_clean_tmp_dir / "selected",
+            alignment_transform=align.alignment_transform,
+        )
+
+        # Act
+        [aligned_scene] = selective_align.align_image(
+            multi_timepoint_image, channels_to_shift=[0, 2], output_channels=[2, 1]
+        )
+
+        # Assert
+        actual = AICSImage(aligned_scene.path)
+        assert actual.channel_names == [
+            expected.channel_names[2],
+            expected.channel_names[1],
+        ]
+        numpy.testing.assert_array_equal(
+            actual.get_image_data("TCZYX"),
+            expected.get_image_data("TCZYX", C=[2, 1]),
+        )
+
+    def test_aligns_scenes_in_parallel(
+        self,
+        auto_clean_tmp_dir: pathlib.Path,
+        multi_scene_image: pathlib.Path,
+    ) -> None:
+        # Arrange
+        _, optical_control_image_path = get_test_image(
+            ARGOLIGHT_OPTICAL_CONTROL_IMAGE_URL
+        )
+        align = Align(
+            optical_control_image_path,
+            Magnification.ONE_HUNDRED,
+            out_dir=auto_clean_tmp_dir / "serial",
+        )
+        expected_scenes = align.align_image(
+            multi_scene_image, channels_to_shift=[0, 2], scenes=[2, 0]
+        )
+        parallel_align = Align(
+            optical_control_image_path,
+            Magnification.ONE_HUNDRED,
+            out_dir=auto_clean_tmp_dir / "parallel",
+            alignment_transform=align.alignment_transform,
+        )
+
+        # Act
+        aligned_scenes = parallel_align.align_image(
+            multi_scene_image, channels_to_shift=[0, 2], scenes=[2, 0], max_workers=2
+        )
+
+        # Assert
+        assert [file.scene for file in aligned_scenes] == [2, 0]
+        for file, expected_file in zip(aligned_scenes, expected_scenes):
+            assert file.path.name == expected_file.path.name
+            numpy.testing.assert_array_equal(
+                AICSImage(file.path).get_image_data("TCZYX"),
+                AICSImage(expected_file.path).get_image_data("TCZYX"),
+            )
+
+    @pytest.mark.parametrize("max_workers", [1, 2])
+    def test_aligns_images_in_batch(
+        self,
+        max_workers: int,
+        auto_clean_tmp_dir: pathlib.Path,
+        multi_scene_image: pathlib.Path,
+        multi_timepoint_image: pathlib.Path,
+    ) -> None:
+        # Arrange
+        _, optical_control_image_path = get_test_image(
+            ARGOLIGHT_OPTICAL_CONTROL_IMAGE_URL
+        )
+        align = Align(
+            optical_control_image_path,
+            Magnification.ONE_HUNDRED,
+            out_dir=auto_clean_tmp_dir,
+        )
+        missing_image = auto_clean_tmp_dir / "missing.czi"
+
+        # Act
+        results = align.align_images(
+            [multi_scene_image, missing_image, multi_timepoint_image],
+            channels_to_shift=[0, 2],
+            max_workers=max_workers,
+        )
+
+        # Assert
+        assert [result.image for result in results] == [
+            multi_scene_image,
+            missing_image,
+            multi_timepoint_image,
+        ]
+        assert [scene.path.name for scene in results[0].aligned_scenes] == [
+            "multiscene_Scene-0_aligned.ome.tiff",
+            "multiscene_Scene-1_aligned.ome.tiff",
+            "multiscene_Scene-2_aligned.ome.tiff",
+        ]
+        assert results[0].error is None
+        assert results[1].aligned_scenes == []
+        assert results[1].error is not None
+        assert [scene.path.name for scene in results[2].aligned_scenes] == [
+            "multitimepoint_aligned.ome.tiff"
+        ]
+        assert results[2].error is None
+
+    def test_fails_only_image_on_image_error_but_raises_bugs(
+        self, tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        # Arrange
+        image_path = tmp_path / "image.ome.tiff"
+        OmeTiffWriter.save(
+            data=numpy.zeros((1, 2, 1, 64, 64), dtype=numpy.uint16),
+            uri=image_path,
+            dim_order="TCZYX",
+        )
+        missing_image = tmp_path / "missing.ome.tiff"
+        align = translation_align(tmp_path / "aligned")
+
+        def buggy_align_scene(*args, **kwargs):
+            raise TypeError("A bug, rather than a problem with the image")
+
+        # Act
+        results = align.align_images(
+            [missing_image, image_path], channels_to_shift=[1], crop_output=False
+        )
+        monkeypatch.setattr(
+            camera_alignment_core.align, "_align_scene", buggy_align_scene
+        )
+
+        # Assert
+        assert isinstance(results[0].error, OSError)
+        assert results[1].error is None
+        with pytest.raises(TypeError, match="A bug"):
+            align.align_images([image_path], channels_to_shift=[1], crop_output=False)
+
+    def test_aligns_with_alignment_transform_and_no_optical_control(
+        self, tmp_path: pathlib.Path
+    ) -> None:
+        # Arrange
+        alignment_transform = AlignmentTransform(
+            numpy.eye(3, dtype=numpy.float16),
+            AlignmentInfo(rotation=0, shift_x=0, shift_y=0, z_offset=0, scaling=1),
+        )
+
+        # Act
+        align = Align(
+            optical_control=None,
+            magnification=Magnification.ONE_HUNDRED,
+            out_dir=tmp_path,
+            alignment_transform=alignment_transform,
+        )
+
+        # Assert
+        assert align.alignment_transform == alignment_transform
+        with pytest.raises(ValueError, match="No optical control"):
+            align.align_optical_control(channels_to_shift=[1])
+        with pytest.raises(ValueError, match="optical_control"):
+            Align(
+                optical_control=None,
+                magnification=Magnification.ONE_HUNDRED,
+                out_dir=tmp_path,
+            )
+
+    def test_reuses_cached_alignment_transform(
+        self, auto_clean_tmp_dir: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        # Arrange
+        _, optical_control_image_path = get_test_image(
+            ARGOLIGHT_OPTICAL_CONTROL_IMAGE_URL
+        )
+        expected_transform = Align(
+            optical_control_image_path,
+            Magnification.ONE_HUNDRED,
+            out_dir=auto_clean_tmp_dir,
+            transform_cache_dir=auto_clean_tmp_dir / "transforms",
+        ).alignment_transform
+
+        def generate_alignment_matrix(*args, **kwargs):
+            raise AssertionError("Expected the cached alignment transform to be used")
+
+        monkeypatch.setattr(
+            camera_alignment_core.align,
+            "generate_alignment_matrix",
+            generate_alignment_matrix,
+        )
+
+        # Act
+        alignment_transform = Align(
+            optical_control_image_path,
+            Magnification.ONE_HUNDRED,
+            out_dir=auto_clean_tmp_dir,
+            transform_cache_dir=auto_clean_tmp_dir / "transforms",
+        ).alignment_transform
+
+        # Assert
+        numpy.testing.assert_array_equal(
+            alignment_transform.matrix, expected_transform.matrix
+        )
+        assert alignment_transform.info == expected_transform.info
+
+    def test_decodes_optical_control_once(
+        self, auto_clean_tmp_dir: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        # Arrange
+        optical_control_path = auto_clean_tmp_dir / "optical_control.ome.tiff"
+        OmeTiffWriter.save(
+            data=numpy.zeros((1, 3, 2, 620, 920), dtype=numpy.uint16),
+            uri=optical_control_path,
+            dim_order="TCZYX",
+            physical_pixel_sizes=PhysicalPixelSizes(0.29, 0.108, 0.108),
+        )
+        monkeypatch.setattr(
+            camera_alignment_core.align,
+            "generate_alignment_matrix",
+            lambda *args, **kwargs: (
+                numpy.eye(3),
+                AlignmentInfo(rotation=0, shift_x=0, shift_y=0, z_offset=0, scaling=1),
+            ),
+        )
+        decoded: typing.List[typing.Any] = []
+        get_image_data = AICSImage.get_image_data
+
+        def counting_get_image_data(self, *args, **kwargs):
+            decoded.append(args)
+            return get_image_data(self, *args, **kwargs)
+
+        monkeypatch.setattr(AICSImage, "get_image_data", counting_get_image_data)
+        align = Align(
+            optical_control_path,
+            Magnification.ONE_HUNDRED,
+            out_dir=auto_clean_tmp_dir,
+            reference_channel_index=1,
+            shift_channel_index=2,
+        )
+
+        # Act
+        align.alignment_transform
+        align.align_optical_control(channels_to_shift=[0, 2])
+        decoded_before_release = len(decoded)
+        align.release_optical_control()
+        align.align_optical_control(channels_to_shift=[0, 2])
+
+        # Assert
+        assert decoded_before_release == 1
+        assert len(decoded) == 2
+
+    def test_aligns_within_memory_budget(
+        self, auto_clean_tmp_dir: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        # Arrange
+        # OME-Zarr, so that single timepoints and channels can be read without loading the whole image
+        image_path = auto_clean_tmp_dir / "image.ome.zarr"
+        image_data = numpy.random.default_rng(0).integers(
+            0, 4000, size=(2, 2, 2, 620, 920), dtype=numpy.uint16
+        )
+        image_writer_factory(image_path, image_data.shape, image_data.dtype).write(
+            image_data
+        )
+        alignment_transform = AlignmentTransform(
+            numpy.array(
+                [
+                    [1.0013714116607422, -0.0052382809204566, 0.2719881272043381],
+                    [0.0052382809204566, 1.0013714116607422, -2.940886545198339],
+                    [0.0, 0.0, 1.0],
+                ]
+            ),
+            AlignmentInfo(rotation=0, shift_x=1, shift_y=-3, z_offset=0, scaling=1),
+        )
+        plans: typing.List[MemoryPlan] = []
+        plan_memory = camera_alignment_core.align.plan_memory
+
+        def recording_plan_memory(*args, **kwargs):
+            plans.append(plan_memory(*args, **kwargs))
+            return plans[-1]
+
+        monkeypatch.setattr(
+            camera_alignment_core.align, "plan_memory", recording_plan_memory
+        )
+
+        # Act
+        aligned = {}
+        for max_memory_bytes in (None, 10**9, 45 * 10**6, 12 * 10**6):
+            align = Align(
+                optical_control="unused",
+                magnification=Magnification.ONE_HUNDRED,
+                out_dir=auto_clean_tmp_dir / str(max_memory_bytes),
+                alignment_transform=alignment_transform,
+                max_memory_bytes=max_memory_bytes,
+            )
+            [aligned_scene] = align.align_image(
+                image_path, channels_to_shift=[1], workers=2
+            )
+            aligned[max_memory_bytes] = AICSImage(aligned_scene.path).get_image_data(
+                "TCZYX"
+            )
+
+        # Assert
+        pipelined, serial, tiled = plans
+        assert pipelined.pipelined and pipelined.workers == 2
+        assert not serial.pipelined and serial.tile_shape is None
+        assert tiled.tile_shape is not None
+        assert all(plan.estimated_bytes <= 12 * 10**6 for plan in plans[2:])
+        for max_memory_bytes in (10**9, 45 * 10**6, 12 * 10**6):
+            numpy.testing.assert_array_equal(aligned[max_memory_bytes], aligned[None])
+
+    def test_fails_before_reading_when_memory_budget_cannot_be_met(
+        self, auto_clean_tmp_dir: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        # Arrange
+        image_path = auto_clean_tmp_dir / "image.ome.tiff"
+        OmeTiffWriter.save(
+            data=numpy.zeros((1, 2, 2, 620, 920), dtype=numpy.uint16),
+            uri=image_path,
+            dim_order="TCZYX",
+        )
+
+        def failing_read(self, *args, **kwargs):
+            raise AssertionError("Read pixels despite the memory budget")
+
+        monkeypatch.setattr(AICSImage, "get_image_data", failing_read)
+        monkeypatch.setattr(AICSImage, "get_image_dask_data", failing_read)
+        align = Align(
+            optical_control="unused",
+            magnification=Magnification.ONE_HUNDRED,
+            out_dir=auto_clean_tmp_dir,
+            alignment_transform=AlignmentTransform(
+                numpy.eye(3, dtype=numpy.float16),
+                AlignmentInfo(rotation=0, shift_x=0, shift_y=0, z_offset=0, scaling=1),
+            ),
+            max_memory_bytes=10**6,
+        )
+
+        # Act / Assert
+        with pytest.raises(MemoryBudgetExceeded, match="needs an estimated"):
+            align.align_image(image_path, channels_to_shift=[1])
+
+    @pytest.mark.parametrize("verify_input", [False, True])
+    def test_resumes_interrupted_run(
+        self,
+        auto_clean_tmp_dir: pathlib.Path,
+        monkeypatch: pytest.MonkeyPatch,
+        verify_input: bool,
+    ) -> None:
+        # Arrange
+        image_path = auto_clean_tmp_dir / "image.ome.tiff"
+        OmeTiffWriter.save(
+            data=[
+                numpy.random.default_rng(scene).integers(
+                    0, 4000, size=(1, 2, 2, 620, 920), dtype=numpy.uint16
+                )
+                for scene in range(3)
+            ],
+            uri=image_path,
+            dim_order="TCZYX",
+        )
+        out_dir = auto_clean_tmp_dir / "aligned"
+        align = Align(
+            optical_control="unused",
+            magnification=Magnification.ONE_HUNDRED,
+            out_dir=out_dir,
+            alignment_transform=AlignmentTransform(
+                numpy.eye(3, dtype=numpy.float16),
+                AlignmentInfo(rotation=0, shift_x=0, shift_y=0, z_offset=0, scaling=1),
+            ),
+        )
+        align_scene = camera_alignment_core.align._align_scene
+        aligned_scenes: typing.List[int] = []
+        interrupt_at_scene = [1]
+
+        def recording_align_scene(aics_image, scene, *args, **kwargs):
+            if scene in interrupt_at_scene:
+                interrupt_at_scene.clear()
+                raise RuntimeError("Interrupted")
+            aligned_scenes.append(scene)
+            return align_scene(aics_image, scene, *args, **kwargs)
+
+        monkeypatch.setattr(
+            camera_alignment_core.align, "_align_scene", recording_align_scene
+        )
+
+        def run() -> typing.List[int]:
+            aligned_scenes.clear()
+            align.align_image(
+                image_path,
+                channels_to_shift=[1],
+                resume=True,
+                verify_input=verify_input,
+            )
+            return list(aligned_scenes)
+
+        # Act
+        with pytest.raises(RuntimeError, match="Interrupted"):
+            run()
+        resumed = run()
+        repeated = run()
+        with open(out_dir / "image_Scene-2_aligned.ome.tiff", "ab") as file:
+            file.write(b"\x00")
+        after_change = run()
+        results = list(
+            align.align_scenes(
+                [image_path],
+                channels_to_shift=[1],
+                resume=True,
+                verify_input=verify_input,
+            )
+        )
+        # Modified (as far as its modification time goes), but with the same content
+        stat = image_path.stat()
+        os.utime(image_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        after_touch = run()
+
+        # Assert
+        assert resumed == [1, 2]
+        assert repeated == []
+        assert after_change == [2]
+        assert [result.skipped for result in results] == [True, True, True]
+        assert after_touch == ([] if verify_input else [0, 1, 2])
+        assert not list(out_dir.glob(".partial-*"))
+
+    def test_realigns_non_local_image_on_resume(
+        self, tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        # Arrange
+        image_path = tmp_path / "image.ome.tiff"
+        OmeTiffWriter.save(
+            data=numpy.zeros((1, 2, 1, 64, 64), dtype=numpy.uint16),
+            uri=image_path,
+            dim_order="TCZYX",
+        )
+        aligned_scenes: typing.List[int] = []
+
+        def recording_align_scene(aics_image, scene, save_path, *args, **kwargs):
+            aligned_scenes.append(scene)
+            save_path.write_bytes(b"aligned")
+            return AlignedImage(scene, save_path)
+
+        monkeypatch.setattr(
+            camera_alignment_core.align, "_align_scene", recording_align_scene
+        )
+        align = translation_align(tmp_path / "aligned")
+
+        # Act
+        for _ in range(2):
+            align.align_image(image_path.as_uri(), channels_to_shift=[1], resume=True)
+
+        # Assert
+        assert aligned_scenes == [0, 0]
+        assert not (tmp_path / "aligned" / ResumeManifest.FILE_NAME).exists()
+
+    def test_failing_scene_cancels_scenes_not_yet_started(
+        self, tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        # Arrange
+        image_path = tmp_path / "image.ome.tiff"
+        OmeTiffWriter.save(
+            data=[numpy.zeros((1, 2, 1, 64, 64), dtype=numpy.uint16)] * 6,
+            uri=image_path,
+            dim_order="TCZYX",
+        )
+        started_scenes: typing.List[int] = []
+
+        def failing_align_scene(aics_image, scene, save_path, *args, **kwargs):
+            started_scenes.append(scene)
+            if scene == 0:
+                raise ValueError("Unreadable scene")
+            time.sleep(0.5)
+            return AlignedImage(scene, save_path)
+
+        monkeypatch.setattr(
+            camera_alignment_core.align, "_align_scene", failing_align_scene
+        )
+        # Threads stand in for worker processes, which would neither be patched nor share `started_scenes`
+        monkeypatch.setattr(
+            concurrent.futures,
+            "ProcessPoolExecutor",
+            concurrent.futures.ThreadPoolExecutor,
+        )
+        align = translation_align(tmp_path / "aligned")
+
+        # Act
+        with pytest.raises(ValueError, match="Unreadable scene"):
+            align.align_image(image_path, channels_to_shift=[1], max_workers=2)
+
+        # Assert
+        # Scenes 1 and 2 were running when scene 0 failed; the others never started
+        assert sorted(started_scenes) == [0, 1, 2]
+
+
+@pytest.fixture
+def small_multi_scene_image(tmp_path: pathlib.Path) -> pathlib.Path:
+    """Image of 3 scenes of 3 timepoints, just large enough to crop at 100X."""
+    path = tmp_path / "image.ome.tiff"
+    OmeTiffWriter.save(
+        data=[
+            numpy.random.default_rng(scene).integers(
+                0, 4000, size=(3, 2, 2, 620, 920), dtype=numpy.uint16
+            )
+            for scene in range(3)
+        ],
+        uri=path,
+        dim_order="TCZYX",
+    )
+    return path
+
+
+def translation_align(out_dir: pathlib.Path) -> Align:
+    return Align(
+        optical_control="unused",
+        magnification=Magnification.ONE_HUNDRED,
+        out_dir=out_dir,
+        alignment_transform=AlignmentTransform(
+            numpy.array([[1, 0, 3], [0, 1, -2], [0, 0, 1]], dtype=numpy.float16),
+            AlignmentInfo(rotation=0, shift_x=3, shift_y=-2, z_offset=0, scaling=1),
+        ),
+    )
+
+
+class ChunkRead(typing.NamedTuple):
+    timepoint: int
+    channel: int
+    start: float
+    end: float
+
+
+def chunk_recording_image(
+    data: numpy.typing.NDArray[numpy.uint16],
+    reads: typing.List[ChunkRead],
+    seconds_per_read: float = 0.0,
+) -> AICSImage:
+    """Single scene image of TCZYX `data`, read a ZYX chunk (of one timepoint and channel) at a time, as from
+    a file. Each chunk read is appended to `reads`; each takes at least `seconds_per_read`, as from a slow disk.
+    """
+
+    def read_chunk(block_info: typing.Dict[typing.Any, typing.Any]) -> numpy.ndarray:
+        timepoint, channel, *_ = block_info[None]["chunk-location"]
+        start = time.perf_counter()
+        time.sleep(seconds_per_read)
+        chunk = data[timepoint : timepoint + 1, channel : channel + 1].copy()
+        reads.append(ChunkRead(timepoint, channel, start, time.perf_counter()))
+        return chunk
+
+    T, C, *zyx = data.shape
+    return AICSImage(
+        dask.array.map_blocks(
+            read_chunk,
+            chunks=((1,) * T, (1,) * C, *((dim,) for dim in zyx)),
+            dtype=data.dtype,
+            meta=numpy.empty((0,) * data.ndim, dtype=data.dtype),
+        )
+    )
+
+
+def record_writes(
+    monkeypatch: pytest.MonkeyPatch, handed_to_writer: typing.List[float]
+) -> None:
+    """Record when each timepoint is handed to the writers of `camera_alignment_core.align`."""
+    make_writer = camera_alignment_core.align.image_writer_factory
+
+    def recording_writer_factory(*args, **kwargs):
+        writer = make_writer(*args, **kwargs)
+        write = writer.write
+
+        def recorded(timepoints):
+            for timepoint in timepoints:
+                handed_to_writer.append(time.perf_counter())
+                yield timepoint
+
+        monkeypatch.setattr(
+            writer, "write", lambda timepoints: write(recorded(timepoints))
+        )
+        return writer
+
+    monkeypatch.setattr(
+        camera_alignment_core.align, "image_writer_factory", recording_writer_factory
+    )
+
+
+class TestStreamedReads:
+    def test_reads_each_timepoint_only_as_needed(
+        self, tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        # Arrange
+        data = numpy.random.default_rng(0).integers(
+            0, 4000, size=(8, 2, 2, 64, 64), dtype=numpy.uint16
+        )
+        reads: typing.List[ChunkRead] = []
+        monkeypatch.setattr(
+            camera_alignment_core.align,
+            "_open_image",
+            lambda image: chunk_recording_image(data, reads),
+        )
+        handed_to_writer: typing.List[float] = []
+        record_writes(monkeypatch, handed_to_writer)
+
+        # Act
+        (aligned_scene,) = translation_align(tmp_path).align_image(
+            tmp_path / "image.ome.tiff", channels_to_shift=[1], crop_output=False
+        )
+
+        # Assert
+        # Every chunk is read once, and no timepoint is read until the writer is within a few timepoints of it
+        # (those being read, aligned and handed between them), however many timepoints the scene has
+        assert sorted((read.timepoint, read.channel) for read in reads) == [
+            (timepoint, channel) for timepoint in range(8) for channel in range(2)
+        ]
+        most_timepoints_ahead = 4
+        for read in reads:
+            written = sum(1 for handed in handed_to_writer if handed < read.start)
+            assert read.timepoint - written < most_timepoints_ahead
+        numpy.testing.assert_array_equal(
+            AICSImage(aligned_scene.path).get_image_data("TCZYX")[:, 0], data[:, 0]
+        )
+
+    def test_reads_only_output_channels(
+        self, tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        # Arrange
+        data = numpy.random.default_rng(0).integers(
+            0, 4000, size=(3, 6, 2, 64, 64), dtype=numpy.uint16
+        )
+        reads: typing.List[ChunkRead] = []
+        monkeypatch.setattr(
+            camera_alignment_core.align,
+            "_open_image",
+            lambda image: chunk_recording_image(data, reads),
+        )
+
+        # Act
+        (aligned_scene,) = translation_align(tmp_path).align_image(
+            tmp_path / "image.ome.tiff",
+            channels_to_shift=[0, 4],
+            crop_output=False,
+            output_channels=[2, 0],
+        )
+
+        # Assert
+        assert sorted((read.timepoint, read.channel) for read in reads) == [
+            (timepoint, channel) for timepoint in range(3) for channel in (0, 2)
+        ]
+        aligned = AICSImage(aligned_scene.path).get_image_data("TCZYX")
+        assert aligned.shape == (3, 2, 2, 64, 64)
+        numpy.testing.assert_array_equal(aligned[:, 0], data[:, 2])
+
+    def test_reads_next_timepoint_while_aligning(
+        self, tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        # Arrange
+        data = numpy.random.default_rng(0).integers(
+            0, 4000, size=(4, 2, 2, 64, 64), dtype=numpy.uint16
+        )
+        reads: typing.List[ChunkRead] = []
+        monkeypatch.setattr(
+            camera_alignment_core.align,
+            "_open_image",
+            lambda image: chunk_recording_image(data, reads, seconds_per_read=0.1),
+        )
+        align_timepoint = camera_alignment_core.align._align_timepoint
+        warps: typing.List[typing.Tuple[float, float]] = []
+
+        def slow_align_timepoint(*args, **kwargs):
+            start = time.perf_counter()
+            time.sleep(0.2)
+            aligned = align_timepoint(*args, **kwargs)
+            warps.append((start, time.perf_counter()))
+            return aligned
+
+        monkeypatch.setattr(
+            camera_alignment_core.align, "_align_timepoint", slow_align_timepoint
+        )
+
+        # Act
+        translation_align(tmp_path).align_image(
+            tmp_path / "image.ome.tiff", channels_to_shift=[1], crop_output=False
+        )
+
+        # Assert
+        # A timepoint is only aligned once read, so any read overlapping a warp is of a later timepoint
+        assert len(warps) == 4
+        assert any(
+            read.start < warp_end and warp_start < read.end
+            for read in reads
+            for warp_start, warp_end in warps
+        )
+
+
+class TestAlignAsync:
+    @pytest.mark.parametrize("max_concurrent_scenes", [1, 2])
+    def test_aligns_image_as_align_image_does(
+        self,
+        max_concurrent_scenes: int,
+        tmp_path: pathlib.Path,
+        small_multi_scene_image: pathlib.Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        # Arrange
+        expected_scenes = translation_align(tmp_path / "expected").align_image(
+            small_multi_scene_image, channels_to_shift=[1], scenes=[2, 0, 1]
+        )
+        align_scene_async = camera_alignment_core.align._align_scene_async
+        in_flight: typing.List[int] = []
+        most_in_flight = [0]
+
+        async def counting_align_scene_async(*args, **kwargs):
+            in_flight.append(1)
+            most_in_flight[0] = max(most_in_flight[0], len(in_flight))
+            try:
+                return await align_scene_async(*args, **kwargs)
+            finally:
+                in_flight.pop()
+
+        monkeypatch.setattr(
+            camera_alignment_core.align,
+            "_align_scene_async",
+            counting_align_scene_async,
+        )
+        align = translation_align(tmp_path / "aligned")
+
+        # Act
+        aligned_scenes = asyncio.run(
+            align.align_image_async(
+                small_multi_scene_image,
+                channels_to_shift=[1],
+                scenes=[2, 0, 1],
+                max_concurrent_scenes=max_concurrent_scenes,
+            )
+        )
+
+        # Assert
+        assert [file.scene for file in aligned_scenes] == [2, 0, 1]
+        assert most_in_flight[0] == max_concurrent_scenes
+        for file, expected_file in zip(aligned_scenes, expected_scenes):
+            assert file.path.name == expected_file.path.name
+            numpy.testing.assert_array_equal(
+                AICSImage(file.path).get_image_data("TCZYX"),
+                AICSImage(expected_file.path).get_image_data("TCZYX"),
+            )
+
+    def test_cancelling_discards_partial_output(
+        self,
+        tmp_path: pathlib.Path,
+        small_multi_scene_image: pathlib.Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        # Arrange
+        read_timepoint = camera_alignment_core.align._read_timepoint
+        second_timepoint_read = threading.Event()
+
+        def signalling_read_timepoint(aics_image, timepoint, *args, **kwargs):
+            if timepoint == 1:
+                second_timepoint_read.set()
+            return read_timepoint(aics_image, timepoint, *args, **kwargs)
+
+        monkeypatch.setattr(
+            camera_alignment_core.align, "_read_timepoint", signalling_read_timepoint
+        )
+        out_dir = tmp_path / "aligned"
+        align = translation_align(out_dir)
+
+        async def align_then_cancel() -> None:
+            task = asyncio.ensure_future(
+                align.align_image_async(
+                    small_multi_scene_image,
+                    channels_to_shift=[1],
+                    max_concurrent_scenes=3,
+                )
+            )
+            while not second_timepoint_read.is_set():
+                await asyncio.sleep(0.01)
+            task.cancel()
+            await task
+
+        # Act / Assert
+        with pytest.raises(asyncio.CancelledError):
+            asyncio.run(align_then_cancel())
+        assert not list(out_dir.iterdir())
+
+    def test_failing_scene_cancels_others(
+        self,
+        tmp_path: pathlib.Path,
+        small_multi_scene_image: pathlib.Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        # Arrange
+        read_timepoint = camera_alignment_core.align._read_timepoint
+        failed = threading.Event()
+
+        def failing_read_timepoint(aics_image, timepoint, *args, **kwargs):
+            if aics_image.current_scene_index == 1 and timepoint == 1:
+                failed.set()
+                raise ValueError("Unreadable timepoint")
+            if aics_image.current_scene_index == 2 and timepoint == 1:
+                # Scene 2 is still in flight when scene 1 fails, rather than (rarely) already aligned
+                failed.wait(timeout=10)
+            return read_timepoint(aics_image, timepoint, *args, **kwargs)
+
+        monkeypatch.setattr(
+            camera_alignment_core.align, "_read_timepoint", failing_read_timepoint
+        )
+        out_dir = tmp_path / "aligned"
+        align = translation_align(out_dir)
+
+        # Act / Assert
+        with pytest.raises(ValueError, match="Unreadable timepoint"):
+            asyncio.run(
+                align.align_image_async(
+                    small_multi_scene_image,
+                    channels_to_shift=[1],
+                    scenes=[1, 2],
+                    max_concurrent_scenes=2,
+                )
+            )
+        assert not list(out_dir.iterdir())
+
+    def test_alignment_transform_async_uses_cached_transform_once(
+        self, tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        # Arrange
+        optical_control = tmp_path / "argolight.ome.tiff"
+        OmeTiffWriter.save(
+            data=numpy.zeros((1, 3, 1, 64, 64), dtype=numpy.uint16),
+            uri=optical_control,
+            dim_order="TCZYX",
+            physical_pixel_sizes=PhysicalPixelSizes(1.0, 0.1, 0.1),
+        )
+        cache = TransformCache(tmp_path / "transforms")
+        alignment_matrix = numpy.array([[1, 0, 3], [0, 1, -2], [0, 0, 1]])
+        cache.put(
+            cache.key(optical_control, 1, 2, Magnification.ONE_HUNDRED),
+            alignment_matrix,
+            AlignmentInfo(rotation=0, shift_x=3, shift_y=-2, z_offset=0, scaling=1),
+        )
+        lookups: typing.List[int] = []
+        get = TransformCache.get
+
+        def counting_get(self, key):
+            lookups.append(1)
+            return get(self, key)
+
+        monkeypatch.setattr(TransformCache, "get", counting_get)
+        align = Align(
+            optical_control,
+            Magnification.ONE_HUNDRED,
+            out_dir=tmp_path / "aligned",
+            reference_channel_index=1,
+            shift_channel_index=2,
+            transform_cache_dir=tmp_path / "transforms",
+        )
+
+        async def concurrently() -> typing.List[AlignmentTransform]:
+            return list(
+                await asyncio.gather(
+                    align.alignment_transform_async(),
+                    align.alignment_transform_async(),
+                )
+            )
+
+        # Act
+        transforms = asyncio.run(concurrently())
+
+        # Assert
+        assert len(lookups) == 1
+        for transform in transforms:
+            numpy.testing.assert_array_equal(transform.matrix, alignment_matrix)
+            assert transform.info.shift_x == 3
+
+
+class TestPrefetch:
+    def test_yields_items_in_order(self) -> None:
+        # Act
+        result = list(_prefetch(range(100), max_items=3))
+
+        # Assert
+        assert result == list(range(100))
+
+    def test_reraises_exceptions_to_consumer(self) -> None:
+        # Arrange
+        def items() -> typing.Iterator[int]:
+            yield 0
+            raise ValueError("Unreadable timepoint")
+
+        prefetched = _prefetch(items())
+
+        # Act / Assert
+        assert next(prefetched) == 0
+        with pytest.raises(ValueError):
+            next(prefetched)
+
+    def test_stops_producing_when_consumer_stops(self) -> None:
+        # Arrange
+        produced: typing.List[int] = []
+        closed: typing.List[bool] = []
+
+        def items() -> typing.Iterator[int]:
+            try:
+                for item in range(100):
+                    produced.append(item)
+                    yield item
+            finally:
+                closed.append(True)
+
+        prefetched = _prefetch(items(), max_items=2)
+
+        # Act
+        assert next(prefetched) == 0
+        prefetched.close()
+
+        # Assert
+        # At most: the consumed item, `max_items` waiting in the queue, and one waiting to be queued
+        assert len(produced) <= 4
+        assert closed == [True]
@@ -1,13 +1,19 @@
 import logging
 import typing
 
+import dask.array
 import numpy
 import numpy.testing
 import numpy.typing
 import pytest
+import skimage.transform
 
 from camera_alignment_core.alignment_core import (
+    _align_block,
+    align_and_crop,
     align_image,
+    align_image_lazy,
+    align_image_tiled,
     crop,
     generate_alignment_matrix,
 )
@@ -22,6 +28,9 @@ from camera_alignment_core.constants import (
 from camera_alignment_core.exception import (
     IncompatibleImageException,
 )
+from camera_alignment_core.warp_map import (
+    PlaneWindow,
+)
 
 from . import (
     ALIGNED_20X_IMAGE_URL,
@@ -35,6 +44,35 @@ from . import (
 
 log = logging.getLogger(LOGGER_NAME)
 
+SYNTHETIC_ALIGNMENT_MATRIX = numpy.array(
+    [
+        [1.0013714116607422, -0.0052382809204566, 0.2719881272043381],
+        [0.0052382809204566, 1.0013714116607422, -2.940886545198339],
+        [0.0, 0.0, 1.0],
+    ]
+)
+
+
+def warp_each_slice(
+    image: numpy.typing.NDArray[numpy.uint16],
+    alignment_matrix: numpy.typing.NDArray[numpy.float16],
+    channels_to_shift: typing.List[int],
+    interpolation: int,
+) -> numpy.typing.NDArray[numpy.uint16]:
+    """Reference implementation of `align_image`: warp every z-slice of every shifted channel with skimage."""
+    expected = image.copy()
+    for channel_index in channels_to_shift:
+        for z_index in range(image.shape[1]):
+            warped = skimage.transform.warp(
+                image[channel_index, z_index],
+                inverse_map=alignment_matrix,
+                order=interpolation,
+                preserve_range=True,
+            )
+            # align_image rounds interpolated values to the nearest integer
+            expected[channel_index, z_index] = numpy.floor(warped + 0.5)
+    return expected
+
 
 class TestAlignmentCore:
     def test_generate_alignment_matrix(self):
@@ -205,6 +243,50 @@ class TestAlignmentCore:
         assert cropped_result.shape == expected_data.shape
         assert numpy.allclose(cropped_result, expected_data, atol=1e-14)
 
+    @pytest.mark.parametrize("interpolation", [0, 1, 3])
+    def test_align_image_matches_per_slice_warp(self, interpolation: int):
+        # Arrange
+        rng = numpy.random.default_rng(0)
+        image = rng.integers(100, 60000, size=(3, 4, 48, 64), dtype=numpy.uint16)
+        channels_to_shift = [0, 2]
+        expected = warp_each_slice(
+            image, SYNTHETIC_ALIGNMENT_MATRIX, channels_to_shift, interpolation
+        )
+
+        # Act
+        result = align_image(
+            image, SYNTHETIC_ALIGNMENT_MATRIX, channels_to_shift, interpolation
+        )
+
+        # Assert
+        assert result.dtype == numpy.uint16
+        numpy.testing.assert_array_equal(result, expected)
+
+    @pytest.mark.parametrize("interpolation", [0, 1, 3])
+    @pytest.mark.parametrize("workers", [2, 8])
+    def test_align_image_with_workers_matches_serial(
+        self, interpolation: int, workers: int
+    ):
+        # Arrange
+        rng = numpy.random.default_rng(0)
+        image = rng.integers(100, 60000, size=(4, 5, 48, 64), dtype=numpy.uint16)
+        channels_to_shift = [1, 3]
+        expected = align_image(
+            image, SYNTHETIC_ALIGNMENT_MATRIX, channels_to_shift, interpolation
+        )
+
+        # Act
+        result = align_image(
+            image,
+            SYNTHETIC_ALIGNMENT_MATRIX,
+            channels_to_shift,
+            interpolation,
+            workers=workers,
+        )
+
+        # Assert
+        numpy.testing.assert_array_equal(result, expected)
+
     @pytest.mark.parametrize(
         [
             "image",
@@ -238,6 +320,367 @@ class TestAlignmentCore:
         with pytest.raises(expected_exception):
             align_image(image, alignment_matrix, channels)
 
+    @pytest.mark.parametrize("interpolation", [0, 1])
+    def test_align_image_writes_into_out(self, interpolation: int):
+        # Arrange
+        rng = numpy.random.default_rng(0)
+        image = rng.integers(100, 60000, size=(3, 4, 48, 64), dtype=numpy.uint16)
+        expected = align_image(
+            image, SYNTHETIC_ALIGNMENT_MATRIX, [0, 2], interpolation
+        )
+        out = numpy.zeros_like(image)
+
+        # Act
+        result = align_image(
+            image, SYNTHETIC_ALIGNMENT_MATRIX, [0, 2], interpolation, out=out
+        )
+
+        # Assert
+        assert result is out
+        numpy.testing.assert_array_equal(result, expected)
+
+    @pytest.mark.parametrize("workers", [1, 4])
+    def test_align_image_in_place(self, workers: int):
+        # Arrange
+        rng = numpy.random.default_rng(0)
+        image = rng.integers(100, 60000, size=(3, 4, 48, 64), dtype=numpy.uint16)
+        expected = align_image(image, SYNTHETIC_ALIGNMENT_MATRIX, [0, 2])
+
+        # Act
+        result = align_image(
+            image,
+            SYNTHETIC_ALIGNMENT_MATRIX,
+            [0, 2],
+            workers=workers,
+            out=image,
+            copy_unshifted=False,
+        )
+
+        # Assert
+        assert result is image
+        numpy.testing.assert_array_equal(result, expected)
+
+    def test_align_image_leaves_unshifted_channels_of_out_untouched(self):
+        # Arrange
+        rng = numpy.random.default_rng(0)
+        image = rng.integers(100, 60000, size=(3, 4, 48, 64), dtype=numpy.uint16)
+        out = numpy.full_like(image, 7)
+
+        # Act
+        align_image(
+            image, SYNTHETIC_ALIGNMENT_MATRIX, [1], out=out, copy_unshifted=False
+        )
+
+        # Assert
+        assert numpy.all(out[0] == 7)
+        assert numpy.all(out[2] == 7)
+        numpy.testing.assert_array_equal(
+            out[1], align_image(image, SYNTHETIC_ALIGNMENT_MATRIX, [1])[1]
+        )
+
+    @pytest.mark.parametrize(
+        "out",
+        [
+            numpy.zeros((3, 4, 48, 63), dtype=numpy.uint16),  # Wrong shape
+            numpy.zeros((3, 4, 48, 64), dtype=numpy.float64),  # Wrong dtype
+        ],
+    )
+    def test_align_image_guards_against_incompatible_out(
+        self, out: numpy.typing.NDArray[numpy.uint16]
+    ):
+        # Arrange
+        image = numpy.zeros((3, 4, 48, 64), dtype=numpy.uint16)
+
+        # Act / Assert
+        with pytest.raises(ValueError):
+            align_image(image, SYNTHETIC_ALIGNMENT_MATRIX, [0], out=out)
+
+    def test_align_image_guards_against_invalid_workers(self):
+        # Arrange
+        image = numpy.zeros((2, 2, 8, 8), dtype=numpy.uint16)
+
+        # Act / Assert
+        with pytest.raises(ValueError):
+            align_image(image, numpy.eye(3, 3), [0], workers=0)
+
+    @pytest.mark.parametrize("interpolation", [0, 1, 3])
+    def test_align_and_crop_matches_align_image_then_crop(self, interpolation: int):
+        # Arrange
+        rng = numpy.random.default_rng(0)
+        image = rng.integers(100, 60000, size=(3, 2, 621, 931), dtype=numpy.uint16)
+        magnification = Magnification(100)
+        expected = crop(
+            align_image(image, SYNTHETIC_ALIGNMENT_MATRIX, [0, 2], interpolation),
+            magnification,
+        )
+
+        # Act
+        result = align_and_crop(
+            image, SYNTHETIC_ALIGNMENT_MATRIX, [0, 2], magnification, interpolation
+        )
+
+        # Assert
+        assert result.shape == (3, 2, 600, 900)
+        if interpolation == 0:
+            numpy.testing.assert_array_equal(result, expected)
+        else:
+            # The crop offset is folded into the transform, which may round differently by at most 1
+            numpy.testing.assert_allclose(result, expected, atol=1, rtol=0)
+        numpy.testing.assert_array_equal(result[1], expected[1])
+
+    @pytest.mark.parametrize("interpolation", [0, 1])
+    def test_align_image_restricted_to_output_window_and_z_range(
+        self, interpolation: int
+    ):
+        # Arrange
+        rng = numpy.random.default_rng(0)
+        image = rng.integers(100, 60000, size=(3, 5, 48, 64), dtype=numpy.uint16)
+        window = PlaneWindow(y=7, x=3, height=20, width=50)
+        expected = align_image(
+            image, SYNTHETIC_ALIGNMENT_MATRIX, [0, 2], interpolation
+        )[:, 1:4, 7:27, 3:53]
+
+        # Act
+        result = align_image(
+            image,
+            SYNTHETIC_ALIGNMENT_MATRIX,
+            [0, 2],
+            interpolation,
+            output_window=window,
+            z_range=(1, 4),
+        )
+
+        # Assert
+        assert result.shape == (3, 3, 20, 50)
+        numpy.testing.assert_allclose(result, expected, atol=interpolation, rtol=0)
+
+    @pytest.mark.parametrize(
+        ["output_window", "z_range"],
+        [
+            # Window larger than plane
+            (PlaneWindow(y=0, x=0, height=49, width=64), None),
+            # Window outside of plane
+            (PlaneWindow(y=-1, x=0, height=8, width=8), None),
+            # Empty z range
+            (None, (2, 2)),
+            # z range past the last z-slice
+            (None, (0, 5)),
+        ],
+    )
+    def test_align_image_guards_against_invalid_region(
+        self,
+        output_window: typing.Optional[PlaneWindow],
+        z_range: typing.Optional[typing.Tuple[int, int]],
+    ):
+        # Arrange
+        image = numpy.zeros((3, 4, 48, 64), dtype=numpy.uint16)
+
+        # Act / Assert
+        with pytest.raises(ValueError):
+            align_image(
+                image,
+                SYNTHETIC_ALIGNMENT_MATRIX,
+                [0],
+                output_window=output_window,
+                z_range=z_range,
+            )
+
+    @pytest.mark.parametrize("interpolation", [0, 1])
+    @pytest.mark.parametrize(
+        "output_window", [None, PlaneWindow(y=7, x=3, height=20, width=50)]
+    )
+    def test_align_image_lazy_matches_align_image(
+        self, interpolation: int, output_window: typing.Optional[PlaneWindow]
+    ):
+        # Arrange
+        rng = numpy.random.default_rng(0)
+        image = rng.integers(100, 60000, size=(2, 3, 4, 48, 64), dtype=numpy.uint16)
+        expected = numpy.stack(
+            [
+                align_image(
+                    timepoint,
+                    SYNTHETIC_ALIGNMENT_MATRIX,
+                    [0, 2],
+                    interpolation,
+                    output_window=output_window,
+                )
+                for timepoint in image
+            ]
+        )
+
+        # Act
+        # Chunks do not hold whole planes, and channels are split across chunks
+        result = align_image_lazy(
+            dask.array.from_array(image, chunks=(1, 2, 3, 16, 64)),
+            SYNTHETIC_ALIGNMENT_MATRIX,
+            [0, 2],
+            interpolation,
+            output_window=output_window,
+        )
+
+        # Assert
+        assert isinstance(result, dask.array.Array)
+        assert result.shape == expected.shape
+        assert result.dtype == numpy.uint16
+        numpy.testing.assert_array_equal(result[1, :, 2].compute(), expected[1, :, 2])
+        numpy.testing.assert_array_equal(result.compute(), expected)
+
+    def test_align_image_lazy_guards_against_unsupported_parameters(self):
+        # Arrange
+        image = dask.array.zeros((3, 4, 48, 64), dtype=numpy.uint16)
+
+        # Act / Assert
+        with pytest.raises(IncompatibleImageException):
+            align_image_lazy(image, SYNTHETIC_ALIGNMENT_MATRIX, [0])
+
+        with pytest.raises(ValueError):
+            align_image_lazy(image[numpy.newaxis], SYNTHETIC_ALIGNMENT_MATRIX, [])
+
+        # Only ever called by dask, with the location of its block
+        with pytest.raises(ValueError, match="block_info"):
+            _align_block(
+                numpy.zeros((1, 3, 4, 48, 64), dtype=numpy.uint16),
+                SYNTHETIC_ALIGNMENT_MATRIX,
+                [0],
+                interpolation=0,
+                output_window=None,
+                translation_tolerance=0.0,
+            )
+
+    @pytest.mark.parametrize("interpolation", [0, 1, 3])
+    @pytest.mark.parametrize(
+        "alignment_matrix",
+        [
+            SYNTHETIC_ALIGNMENT_MATRIX,
+            # Subpixel shift: the fill is blended into the edges but never used on its own
+            numpy.array([[1.0, 0.0, 0.5], [0.0, 1.0, -0.25], [0.0, 0.0, 1.0]]),
+            # Shift by more than a tile: some tiles sample entirely outside the plane
+            numpy.array([[1.0, 0.0, 40.0], [0.0, 1.0, -3.0], [0.0, 0.0, 1.0]]),
+        ],
+    )
+    def test_align_image_tiled_matches_align_image(
+        self,
+        alignment_matrix: numpy.typing.NDArray[numpy.float16],
+        interpolation: int,
+    ):
+        # Arrange
+        rng = numpy.random.default_rng(0)
+        image = rng.integers(100, 60000, size=(3, 2, 77, 91), dtype=numpy.uint16)
+        expected = align_image(image, alignment_matrix, [0, 2], interpolation)
+        sink = numpy.zeros_like(image)
+
+        # Act
+        result = align_image_tiled(
+            image,
+            sink,
+            alignment_matrix,
+            [0, 2],
+            interpolation,
+            tile_shape=(16, 24),
+        )
+
+        # Assert
+        assert result is sink
+        numpy.testing.assert_array_equal(sink, expected)
+
+    @pytest.mark.parametrize("interpolation", [0, 1, 3])
+    def test_align_image_tiled_computes_only_output_window(self, interpolation: int):
+        # Arrange
+        rng = numpy.random.default_rng(0)
+        image = rng.integers(100, 60000, size=(3, 2, 77, 91), dtype=numpy.uint16)
+        alignment_matrix = numpy.array(
+            [[1.0, 0.0, 3.0], [0.0, 1.0, -2.0], [0.0, 0.0, 1.0]]
+        )
+        window = PlaneWindow(y=30, x=40, height=20, width=25)
+        expected = align_image(
+            image, alignment_matrix, [0, 2], interpolation, output_window=window
+        )
+        read_rows: typing.List[typing.Tuple[int, int]] = []
+
+        class RecordingSource:
+            shape = image.shape
+
+            def __getitem__(self, key):
+                _, _, y_slice, _ = key
+                read_rows.append((y_slice.start, y_slice.stop))
+                return image[key]
+
+        sink = numpy.zeros((3, 2, *window.shape), dtype=numpy.uint16)
+
+        # Act
+        align_image_tiled(
+            RecordingSource(),
+            sink,
+            alignment_matrix,
+            [0, 2],
+            interpolation,
+            tile_shape=(8, 8),
+            output_window=window,
+        )
+
+        # Assert
+        numpy.testing.assert_array_equal(sink, expected)
+        if interpolation == 0:
+            # Nothing is read but what the window samples from, give or take the halo
+            assert all(
+                start >= 30 - 2 - 1 and stop <= 50 - 2 + 2 for start, stop in read_rows
+            )
+
+    def test_align_image_tiled_between_memory_maps(self, tmp_path):
+        # Arrange
+        rng = numpy.random.default_rng(0)
+        image = rng.integers(100, 60000, size=(2, 3, 64, 80), dtype=numpy.uint16)
+        source = numpy.lib.format.open_memmap(
+            tmp_path / "source.npy", mode="w+", dtype=numpy.uint16, shape=image.shape
+        )
+        source[:] = image
+        sink = numpy.lib.format.open_memmap(
+            tmp_path / "sink.npy", mode="w+", dtype=numpy.uint16, shape=image.shape
+        )
+
+        # Act
+        align_image_tiled(
+            source, sink, SYNTHETIC_ALIGNMENT_MATRIX, [1], tile_shape=(32, 32)
+        )
+        sink.flush()
+
+        # Assert
+        numpy.testing.assert_array_equal(
+            numpy.load(tmp_path / "sink.npy"),
+            align_image(image, SYNTHETIC_ALIGNMENT_MATRIX, [1]),
+        )
+
+    @pytest.mark.parametrize(
+        ["sink_shape", "channels_to_shift", "interpolation", "tile_shape"],
+        [
+            ((3, 4, 48, 63), [0], 0, (16, 16)),  # Wrong sink shape
+            ((3, 4, 48, 64), [], 0, (16, 16)),  # No channels to shift
+            ((3, 4, 48, 64), [0], 4, (16, 16)),  # Non-local interpolation kernel
+            ((3, 4, 48, 64), [0], 0, (0, 16)),  # Empty tiles
+        ],
+    )
+    def test_align_image_tiled_guards_against_unsupported_parameters(
+        self,
+        sink_shape: typing.Tuple[int, ...],
+        channels_to_shift: typing.List[int],
+        interpolation: int,
+        tile_shape: typing.Tuple[int, int],
+    ):
+        # Arrange
+        image = numpy.zeros((3, 4, 48, 64), dtype=numpy.uint16)
+        sink = numpy.zeros(sink_shape, dtype=numpy.uint16)
+
+        # Act / Assert
+        with pytest.raises(ValueError):
+            align_image_tiled(
+                image,
+                sink,
+                SYNTHETIC_ALIGNMENT_MATRIX,
+                channels_to_shift,
+                interpolation,
+                tile_shape=tile_shape,
+            )
+
     # TODO: Add 63x and 20x images to test
     @pytest.mark.parametrize(
         ["image_path", "magnification", "expected_shape"],
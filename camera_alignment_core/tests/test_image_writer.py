@@ -0,0 +1,228 @@
+import pathlib
+import typing
+
+from aicsimageio import AICSImage
+from aicsimageio.writers import OmeTiffWriter
+import numcodecs
+import numpy
+import pytest
+import zarr
+
+from camera_alignment_core.image_writer import (
+    OmeTiffImageWriter,
+    OmeZarrImageWriter,
+    image_writer_factory,
+)
+
+SHAPE = (3, 2, 4, 30, 40)  # TCZYX
+CHANNEL_NAMES = ["Bright_2", "EGFP"]
+
+
+def generate_image() -> numpy.typing.NDArray[numpy.uint16]:
+    rng = numpy.random.default_rng(0)
+    return rng.integers(0, 60000, size=SHAPE, dtype=numpy.uint16)
+
+
+class TestOmeTiffImageWriter:
+    def test_write_matches_ome_tiff_writer(self, tmp_path: pathlib.Path):
+        # Arrange
+        image = generate_image()
+        expected_path = tmp_path / "expected.ome.tiff"
+        OmeTiffWriter.save(
+            data=image,
+            uri=expected_path,
+            channel_names=CHANNEL_NAMES,
+            dim_order="TCZYX",
+        )
+        consumed: typing.List[int] = []
+
+        def timepoints() -> typing.Iterator[numpy.typing.NDArray[numpy.uint16]]:
+            for timepoint_index, timepoint in enumerate(image):
+                consumed.append(timepoint_index)
+                yield timepoint
+
+        # Act
+        writer = image_writer_factory(
+            tmp_path / "actual.ome.tiff",
+            shape=SHAPE,
+            dtype=numpy.uint16,
+            channel_names=CHANNEL_NAMES,
+        )
+        writer.write(timepoints())
+
+        # Assert
+        assert isinstance(writer, OmeTiffImageWriter)
+        assert consumed == [0, 1, 2]
+        actual = AICSImage(writer.uri)
+        expected = AICSImage(expected_path)
+        assert actual.dims.shape == expected.dims.shape == SHAPE
+        assert actual.channel_names == expected.channel_names
+        numpy.testing.assert_array_equal(actual.get_image_data("TCZYX"), image)
+        assert writer.uri.stat().st_size == expected_path.stat().st_size
+
+    @pytest.mark.parametrize(
+        "timepoints",
+        [
+            [numpy.zeros(SHAPE[1:], dtype=numpy.uint16)] * 2,  # Too few
+            [numpy.zeros(SHAPE[1:], dtype=numpy.uint16)] * 4,  # Too many
+            [numpy.zeros((2, 4, 30, 41), dtype=numpy.uint16)] * 3,  # Wrong shape
+            [numpy.zeros(SHAPE[1:], dtype=numpy.float32)] * 3,  # Wrong dtype
+        ],
+    )
+    def test_write_guards_against_incompatible_timepoints(
+        self,
+        tmp_path: pathlib.Path,
+        timepoints: typing.List[numpy.typing.NDArray],
+    ):
+        # Arrange
+        writer = image_writer_factory(
+            tmp_path / "image.ome.tiff", shape=SHAPE, dtype=numpy.uint16
+        )
+
+        # Act / Assert
+        with pytest.raises(ValueError):
+            writer.write(iter(timepoints))
+
+
+class TestOmeZarrImageWriter:
+    @pytest.mark.parametrize(
+        ["chunk_shape", "expected_chunks"],
+        [
+            # Default: one chunk per YX plane
+            (None, (1, 1, 1, 30, 40)),
+            # One chunk per timepoint
+            ((1, -1, -1, -1, -1), (1, 2, 4, 30, 40)),
+            # Chunks spanning several timepoints, which do not evenly divide the image
+            ((2, 1, 3, 16, -1), (2, 1, 3, 16, 40)),
+        ],
+    )
+    @pytest.mark.parametrize("workers", [1, 3])
+    def test_write(
+        self,
+        tmp_path: pathlib.Path,
+        chunk_shape: typing.Optional[typing.Tuple[int, int, int, int, int]],
+        expected_chunks: typing.Tuple[int, int, int, int, int],
+        workers: int,
+    ):
+        # Arrange
+        image = generate_image()
+        compressor = numcodecs.Blosc(cname="zstd", clevel=3)
+
+        # Act
+        writer = image_writer_factory(
+            tmp_path / "image.ome.zarr",
+            shape=SHAPE,
+            dtype=numpy.uint16,
+            channel_names=CHANNEL_NAMES,
+            chunk_shape=chunk_shape,
+            compressor=compressor,
+            workers=workers,
+        )
+        writer.write(iter(image))
+
+        # Assert
+        assert isinstance(writer, OmeZarrImageWriter)
+        array = zarr.open_group(str(writer.uri), mode="r")["0"]
+        assert array.chunks == expected_chunks
+        assert array.compressor == compressor
+        actual = AICSImage(writer.uri)
+        assert actual.dims.shape == SHAPE
+        assert actual.channel_names == CHANNEL_NAMES
+        numpy.testing.assert_array_equal(actual.get_image_data("TCZYX"), image)
+
+    def test_write_guards_against_incompatible_timepoints(self, tmp_path: pathlib.Path):
+        # Arrange
+        writer = image_writer_factory(
+            tmp_path / "image.ome.zarr", shape=SHAPE, dtype=numpy.uint16, workers=2
+        )
+
+        # Act / Assert
+        with pytest.raises(ValueError):
+            writer.write(iter(generate_image()[:2]))
+
+    @pytest.mark.parametrize(
+        "writer_options",
+        [
+            {"chunk_shape": (1, 1, 30, 40)},  # Not TCZYX
+            {"workers": 0},
+        ],
+    )
+    def test_guards_against_unsupported_parameters(
+        self, tmp_path: pathlib.Path, writer_options: typing.Dict[str, typing.Any]
+    ):
+        # Act / Assert
+        with pytest.raises(ValueError):
+            image_writer_factory(
+                tmp_path / "image.ome.zarr",
+                shape=SHAPE,
+                dtype=numpy.uint16,
+                **writer_options,
+            )
+
+
+@pytest.mark.parametrize("name", ["image.ome.tiff", "image.ome.zarr"])
+class TestAtomicWrite:
+    def test_replaces_existing_image_only_once_complete(
+        self, tmp_path: pathlib.Path, name: str
+    ):
+        # Arrange
+        image = generate_image()
+        writer = image_writer_factory(tmp_path / name, shape=SHAPE, dtype=numpy.uint16)
+        writer.write(iter(image))
+        partial_uris: typing.List[pathlib.Path] = []
+        existing_images: typing.List[numpy.typing.NDArray[numpy.uint16]] = []
+
+        def timepoints() -> typing.Iterator[numpy.typing.NDArray[numpy.uint16]]:
+            yield image[-1]
+            # Midway through writing: the new image is partial, and the existing one is still whole
+            partial_uris.extend(tmp_path.glob(".partial-*"))
+            existing_images.append(AICSImage(writer.uri).get_image_data("TCZYX"))
+            yield from image[-2::-1]
+
+        # Act
+        writer.write(timepoints())
+
+        # Assert
+        [partial_uri] = partial_uris
+        [existing_image] = existing_images
+        assert not partial_uri.exists()
+        numpy.testing.assert_array_equal(existing_image, image)
+        assert [path.name for path in tmp_path.iterdir()] == [name]
+        numpy.testing.assert_array_equal(
+            AICSImage(writer.uri).get_image_data("TCZYX"), image[::-1]
+        )
+
+    def test_leaves_no_partial_image_when_write_fails(
+        self, tmp_path: pathlib.Path, name: str
+    ):
+        # Arrange
+        writer = image_writer_factory(tmp_path / name, shape=SHAPE, dtype=numpy.uint16)
+
+        def failing_timepoints() -> typing.Iterator[numpy.typing.NDArray[numpy.uint16]]:
+            yield generate_image()[0]
+            raise RuntimeError("Failed to align")
+
+        # Act
+        with pytest.raises(RuntimeError):
+            writer.write(failing_timepoints())
+
+        # Assert
+        assert not list(tmp_path.iterdir())
+
+
+@pytest.mark.parametrize(
+    ["uri", "shape", "channel_names"],
+    [
+        ("image.czi", SHAPE, None),  # Unsupported file type
+        ("image.ome.tiff", SHAPE[1:], None),  # Not TCZYX
+        ("image.ome.tiff", SHAPE, ["Bright_2"]),  # Wrong number of channel names
+    ],
+)
+def test_image_writer_factory_guards_against_unsupported_parameters(
+    uri: str,
+    shape: typing.Tuple[int, ...],
+    channel_names: typing.Optional[typing.List[str]],
+):
+    # Act / Assert
+    with pytest.raises(ValueError):
+        image_writer_factory(uri, shape, numpy.uint16, channel_names)  # type: ignore
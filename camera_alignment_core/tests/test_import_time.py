@@ -0,0 +1,87 @@
+import json
+import subprocess
+import sys
+import typing
+
+import pytest
+
+# Most seconds importing the public API of the package may take in a fresh interpreter. Importing the dependencies
+# that are deferred to first use takes several seconds on its own, so exceeding this means one of them is imported
+# eagerly again.
+IMPORT_TIME_BUDGET_SECONDS = 1.0
+
+# Dependencies of the package that must not be imported until they are used
+DEFERRED_MODULES = (
+    "aicsimageio",
+    "dask",
+    "ome_zarr",
+    "pandas",
+    "scipy",
+    "skimage",
+    "sklearn",
+    "tifffile",
+    "zarr",
+)
+
+PUBLIC_API_IMPORTS = """
+from camera_alignment_core import Align, Magnification
+from camera_alignment_core.alignment_core import crop
+from camera_alignment_core.alignment_utils import AlignmentInfo
+from camera_alignment_core.channel_info import channel_info_factory
+from camera_alignment_core.image_writer import image_writer_factory
+from camera_alignment_core.memory_plan import plan_memory
+from camera_alignment_core.transform_cache import TransformCache
+"""
+
+
+def import_in_fresh_interpreter(statements: str) -> typing.Dict[str, typing.Any]:
+    """Run `statements` in a new interpreter, returning how long they took and which modules were imported."""
+    script = f"""
+import json
+import sys
+import time
+
+start = time.perf_counter()
+{statements}
+seconds = time.perf_counter() - start
+print(json.dumps({{"seconds": seconds, "modules": sorted(sys.modules)}}))
+"""
+    completed = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, check=True, text=True
+    )
+    return json.loads(completed.stdout)
+
+
+class TestImportTime:
+    @pytest.mark.parametrize(
+        "statements",
+        ["import camera_alignment_core", PUBLIC_API_IMPORTS],
+    )
+    def test_defers_heavy_dependencies(self, statements: str):
+        # Act
+        imported = import_in_fresh_interpreter(statements)
+
+        # Assert
+        top_level_modules = {module.split(".")[0] for module in imported["modules"]}
+        assert top_level_modules.isdisjoint(DEFERRED_MODULES)
+
+    def test_imports_within_budget(self):
+        # Act
+        # Best of a few runs, to discount a busy machine
+        seconds = min(
+            import_in_fresh_interpreter(PUBLIC_API_IMPORTS)["seconds"] for _ in range(3)
+        )
+
+        # Assert
+        assert seconds < IMPORT_TIME_BUDGET_SECONDS
+
+    def test_imports_deferred_dependencies_on_first_use(self):
+        # Act
+        imported = import_in_fresh_interpreter("""
+from camera_alignment_core.alignment_utils import SegmentRings
+from camera_alignment_core.image_writer import OmeTiffImageWriter
+""")
+
+        # Assert
+        top_level_modules = {module.split(".")[0] for module in imported["modules"]}
+        assert {"pandas", "skimage", "aicsimageio", "tifffile"} <= top_level_modules
@@ -0,0 +1,92 @@
+import pytest
+
+from camera_alignment_core.exception import (
+    MemoryBudgetExceeded,
+)
+from camera_alignment_core.memory_plan import (
+    MemoryPlan,
+    plan_memory,
+)
+
+# CZYX shapes of a timepoint of a 100X image, before and after cropping
+INPUT_SHAPE = (4, 75, 620, 920)
+OUTPUT_SHAPE = (4, 75, 600, 900)
+
+
+def plan(max_memory_bytes: int, **kwargs) -> MemoryPlan:
+    return plan_memory(max_memory_bytes, INPUT_SHAPE, OUTPUT_SHAPE, "uint16", **kwargs)
+
+
+class TestPlanMemory:
+    def test_overlaps_timepoints_when_memory_allows(self):
+        # Act
+        result = plan(16 * 1024**3, workers=4)
+
+        # Assert
+        assert result == MemoryPlan(
+            pipelined=True,
+            workers=4,
+            tile_shape=None,
+            estimated_bytes=result.estimated_bytes,
+        )
+
+    def test_gives_up_overlap_then_workers_before_tiling(self):
+        # Arrange
+        pipelined = plan(16 * 1024**3, workers=4)
+        serial = plan(pipelined.estimated_bytes - 1, workers=4)
+        fewer_workers = plan(serial.estimated_bytes - 1, workers=4)
+
+        # Assert
+        assert not serial.pipelined and serial.workers == 4
+        assert fewer_workers.workers == 3 and fewer_workers.tile_shape is None
+        assert (
+            pipelined.estimated_bytes
+            > serial.estimated_bytes
+            > fewer_workers.estimated_bytes
+        )
+
+    @pytest.mark.parametrize("interpolation", [0, 1, 3])
+    def test_tiles_when_a_timepoint_does_not_fit(self, interpolation: int):
+        # Arrange
+        pipelined = plan(16 * 1024**3, interpolation=interpolation)
+        serial = plan(pipelined.estimated_bytes - 1, interpolation=interpolation)
+        max_memory_bytes = serial.estimated_bytes - 1
+
+        # Act
+        result = plan(max_memory_bytes, interpolation=interpolation, workers=1)
+
+        # Assert
+        assert result.tile_shape is not None
+        assert result.estimated_bytes <= max_memory_bytes
+
+    def test_counts_writer_buffers(self):
+        # Arrange
+        without_writer = plan(16 * 1024**3)
+
+        # Act
+        result = plan(16 * 1024**3, writer_buffer_nbytes=1024**2)
+
+        # Assert
+        assert result.estimated_bytes == without_writer.estimated_bytes + 1024**2
+
+    def test_fails_with_estimate_when_nothing_fits(self):
+        # Act / Assert
+        with pytest.raises(MemoryBudgetExceeded, match=r"needs an estimated .* MiB"):
+            plan(1024**2)
+
+    def test_does_not_tile_unsupported_interpolation_orders(self):
+        # Arrange
+        pipelined = plan(16 * 1024**3, interpolation=2)
+        serial = plan(pipelined.estimated_bytes - 1, interpolation=2)
+
+        # Act / Assert
+        with pytest.raises(MemoryBudgetExceeded, match="out of core"):
+            plan(serial.estimated_bytes - 1, interpolation=2)
+
+    def test_only_cropping_needs_no_resampling_memory(self):
+        # Act
+        cropping = plan(16 * 1024**3, shift=False)
+        shifting = plan(16 * 1024**3, shift=True)
+
+        # Assert
+        assert cropping.estimated_bytes < shifting.estimated_bytes
@@ -0,0 +1,146 @@
+import os
+import pathlib
+
+import numpy
+import pytest
+
+import camera_alignment_core.resume_manifest
+from camera_alignment_core.resume_manifest import (
+    AlignmentUnit,
+    ResumeManifest,
+    input_checksum,
+    path_checksum,
+    transform_checksum,
+)
+
+
+@pytest.fixture
+def unit(tmp_path: pathlib.Path) -> AlignmentUnit:
+    """Unit whose output exists within tmp_path."""
+    (tmp_path / "image_Scene-1_aligned.ome.tiff").write_bytes(b"\x00\x01" * 1000)
+    return AlignmentUnit(
+        input_checksum="0" * 64,
+        scene=1,
+        timepoints=(0, 2),
+        transform_checksum=transform_checksum(numpy.eye(3)),
+        options_checksum="1" * 64,
+        output="image_Scene-1_aligned.ome.tiff",
+    )
+
+
+class TestResumeManifest:
+    def test_record_then_is_complete(self, tmp_path: pathlib.Path, unit: AlignmentUnit):
+        # Arrange
+        manifest = ResumeManifest(tmp_path)
+
+        # Act
+        before = manifest.is_complete(unit)
+        manifest.record(unit)
+        # A new instance, as in a later run
+        after = ResumeManifest(tmp_path)
+
+        # Assert
+        assert not before
+        assert manifest.is_complete(unit)
+        assert after.is_complete(unit)
+        assert not after.is_complete(unit._replace(scene=2))
+        assert not after.is_complete(unit._replace(timepoints=()))
+
+    @pytest.mark.parametrize("change", ["modify", "remove"])
+    def test_is_not_complete_when_output_changes(
+        self, tmp_path: pathlib.Path, unit: AlignmentUnit, change: str
+    ):
+        # Arrange
+        ResumeManifest(tmp_path).record(unit)
+        output = tmp_path / unit.output
+        if change == "modify":
+            output.write_bytes(b"\x00\x02" * 1000)
+        else:
+            output.unlink()
+
+        # Act
+        complete = ResumeManifest(tmp_path).is_complete(unit)
+
+        # Assert
+        assert not complete
+
+    def test_ignores_line_cut_short(self, tmp_path: pathlib.Path, unit: AlignmentUnit):
+        # Arrange
+        manifest = ResumeManifest(tmp_path)
+        manifest.record(unit)
+        # As if the process died partway through recording another unit
+        with open(manifest.path, "a") as file:
+            file.write('{"input_checksum": "2')
+        other_unit = unit._replace(scene=2)
+
+        # Act
+        resumed = ResumeManifest(tmp_path)
+        resumed.record(other_unit)
+
+        # Assert
+        after = ResumeManifest(tmp_path)
+        assert after.is_complete(unit)
+        assert after.is_complete(other_unit)
+
+
+def test_path_checksum_of_directory_covers_every_file(tmp_path: pathlib.Path):
+    # Arrange
+    image = tmp_path / "image.ome.zarr"
+    (image / "0").mkdir(parents=True)
+    (image / "0" / "0.0.0.0.0").write_bytes(b"\x00\x01")
+
+    # Act
+    before = path_checksum(image)
+    (image / "0" / "0.0.0.0.1").write_bytes(b"\x00\x01")
+    after = path_checksum(image)
+
+    # Assert
+    assert before != after
+
+
+def test_input_checksum_identifies_image_by_path_size_and_modification_time(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+):
+    # Arrange
+    image = tmp_path / "image.ome.tiff"
+    image.write_bytes(b"\x00\x01" * 1000)
+    before = input_checksum(image)
+    verified_before = input_checksum(image, verify_content=True)
+
+    def unread(*args, **kwargs):
+        raise AssertionError("The content of the image was read")
+
+    monkeypatch.setattr(camera_alignment_core.resume_manifest, "update_digest", unread)
+
+    # Act
+    again = input_checksum(image)
+    os.utime(image, ns=(image.stat().st_atime_ns, image.stat().st_mtime_ns + 10**9))
+    touched = input_checksum(image)
+    monkeypatch.undo()
+    verified_touched = input_checksum(image, verify_content=True)
+
+    # Assert
+    assert again == before
+    assert touched != before
+    assert verified_before == verified_touched == path_checksum(image)
+
+
+@pytest.mark.parametrize(
+    "image",
+    [
+        "https://example.org/image.czi",
+        "s3://bucket/image.ome.zarr",
+        "missing.czi",
+    ],
+)
+def test_input_checksum_of_non_local_image_is_none(image: str):
+    # Act / Assert
+    assert input_checksum(image) is None
+    assert input_checksum(image, verify_content=True) is None
+
+
+def test_transform_checksum_is_independent_of_dtype():
+    # Act / Assert
+    assert transform_checksum(numpy.eye(3, dtype=numpy.float16)) == transform_checksum(
+        numpy.eye(3)
+    )
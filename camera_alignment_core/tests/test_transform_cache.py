@@ -0,0 +1,88 @@
+import pathlib
+
+import numpy
+import pytest
+
+from camera_alignment_core.alignment_utils import (
+    AlignmentInfo,
+)
+from camera_alignment_core.constants import (
+    Magnification,
+)
+from camera_alignment_core.transform_cache import (
+    TransformCache,
+)
+
+ALIGNMENT_MATRIX = numpy.array(
+    [
+        [1.0013714116607422, -0.0052382809204566, 0.2719881272043381],
+        [0.0052382809204566, 1.0013714116607422, -2.940886545198339],
+        [0.0, 0.0, 1.0],
+    ]
+)
+ALIGNMENT_INFO = AlignmentInfo(
+    rotation=0,
+    shift_x=1,
+    shift_y=-3,
+    z_offset=0,
+    # As generated, values may be numpy scalars
+    scaling=numpy.float64(1.0013714116607422),
+)
+
+
+@pytest.fixture
+def optical_control(tmp_path: pathlib.Path) -> pathlib.Path:
+    path = tmp_path / "argolight.czi"
+    path.write_bytes(b"\x00\x01" * 1000)
+    return path
+
+
+class TestTransformCache:
+    def test_put_then_get(self, tmp_path: pathlib.Path, optical_control: pathlib.Path):
+        # Arrange
+        cache = TransformCache(tmp_path / "cache")
+        key = cache.key(optical_control, 1, 2, Magnification.ONE_HUNDRED)
+
+        # Act
+        before = cache.get(key)
+        cache.put(key, ALIGNMENT_MATRIX, ALIGNMENT_INFO)
+        # A new instance, as in another process
+        after = TransformCache(tmp_path / "cache").get(key)
+
+        # Assert
+        assert before is None
+        assert after is not None
+        alignment_matrix, alignment_info = after
+        numpy.testing.assert_array_equal(alignment_matrix, ALIGNMENT_MATRIX)
+        assert alignment_info == ALIGNMENT_INFO
+        # Only the entry itself is left behind
+        assert [path.name for path in cache.directory.iterdir()] == [f"{key}.json"]
+
+    def test_key_depends_on_content_and_parameters(
+        self, tmp_path: pathlib.Path, optical_control: pathlib.Path
+    ):
+        # Arrange
+        key = TransformCache.key(optical_control, 1, 2, Magnification.ONE_HUNDRED)
+        copy = tmp_path / "copy.czi"
+        copy.write_bytes(optical_control.read_bytes())
+        modified = tmp_path / "modified.czi"
+        modified.write_bytes(optical_control.read_bytes() + b"\x00")
+
+        # Act / Assert
+        assert TransformCache.key(copy, 1, 2, Magnification.ONE_HUNDRED) == key
+        assert TransformCache.key(modified, 1, 2, Magnification.ONE_HUNDRED) != key
+        assert (
+            TransformCache.key(optical_control, 2, 1, Magnification.ONE_HUNDRED) != key
+        )
+        assert TransformCache.key(optical_control, 1, 2, Magnification.TWENTY) != key
+
+    def test_ignores_unreadable_entries(
+        self, tmp_path: pathlib.Path, optical_control: pathlib.Path
+    ):
+        # Arrange
+        cache = TransformCache(tmp_path / "cache")
+        key = cache.key(optical_control, 1, 2, Magnification.ONE_HUNDRED)
+        (cache.directory / f"{key}.json").write_text('{"matrix": [[1.0, 0')
+
+        # Act / Assert
+        assert cache.get(key) is None
@@ -0,0 +1,565 @@
+import numpy
+import pytest
+import skimage.transform
+
+from camera_alignment_core.alignment_core import (
+    WARP_MAP_CACHE,
+    align_image,
+)
+from camera_alignment_core.warp_map import (
+    CoordinateWarpMap,
+    MatrixWarpMap,
+    NearestWarpMap,
+    PlaneWindow,
+    TranslationWarpMap,
+    WarpMapCache,
+    nearest_translation,
+    warp_map_factory,
+)
+
+# Alignment matrix generated from ZSD_100x_OPTICAL_CONTROL_IMAGE_URL (see test_alignment_core.py)
+ALIGNMENT_MATRIX = numpy.array(
+    [
+        [1.0013714116607422, -0.0052382809204566, 0.2719881272043381],
+        [0.0052382809204566, 1.0013714116607422, -2.940886545198339],
+        [0.0, 0.0, 1.0],
+    ]
+)
+
+
+def translation_matrix(y, x):
+    return numpy.array([[1.0, 0.0, x], [0.0, 1.0, y], [0.0, 0.0, 1.0]])
+
+
+def generate_image(shape, seed=0):
+    rng = numpy.random.default_rng(seed)
+    return rng.integers(100, 60000, size=shape, dtype=numpy.uint16)
+
+
+def skimage_warp(plane, alignment_matrix, order):
+    """skimage.transform.warp, rounded half up to uint16"""
+    warped = skimage.transform.warp(
+        plane, inverse_map=alignment_matrix, order=order, preserve_range=True
+    )
+    return numpy.clip(numpy.floor(warped + 0.5), 0, 65535).astype(numpy.uint16)
+
+
+class TestWarpMap:
+    @pytest.mark.parametrize(
+        ["order", "expected_type"],
+        [
+            (0, NearestWarpMap),
+            (1, MatrixWarpMap),
+            (3, MatrixWarpMap),
+            (4, CoordinateWarpMap),
+        ],
+    )
+    def test_warp_matches_skimage(self, order, expected_type):
+        # Arrange
+        plane = generate_image((61, 83))
+        expected = skimage_warp(plane, ALIGNMENT_MATRIX, order)
+
+        # Act
+        warp_map = warp_map_factory(ALIGNMENT_MATRIX, plane.shape, order)
+        actual = warp_map.warp(plane)
+
+        # Assert
+        assert isinstance(warp_map, expected_type)
+        assert actual.dtype == numpy.uint16
+        numpy.testing.assert_array_equal(actual, expected)
+
+    @pytest.mark.parametrize("order", [0, 1, 3, 4])
+    def test_warp_writes_into_out(self, order):
+        # Arrange
+        image = generate_image((2, 61, 83))
+        out = numpy.zeros(image.shape, dtype=numpy.uint16)
+        warp_map = warp_map_factory(ALIGNMENT_MATRIX, image.shape[-2:], order)
+
+        # Act
+        actual = warp_map.warp(image[1], out=out[1])
+
+        # Assert
+        assert numpy.shares_memory(actual, out)
+        numpy.testing.assert_array_equal(
+            out[1], skimage_warp(image[1], ALIGNMENT_MATRIX, order)
+        )
+        assert not out[0].any()
+
+    def test_warp_rounds_and_clips_to_uint16(self):
+        # Arrange
+        # Cubic interpolation over a sharp edge overshoots the input range
+        plane = numpy.zeros((20, 20), dtype=numpy.uint16)
+        plane[:, 10:] = numpy.iinfo(numpy.uint16).max
+        half_pixel_shift = numpy.array(
+            [[1.0, 0.0, 0.5], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]]
+        )
+
+        # Act
+        actual = warp_map_factory(half_pixel_shift, plane.shape, 3).warp(plane)
+
+        # Assert
+        numpy.testing.assert_array_equal(
+            actual, skimage_warp(plane, half_pixel_shift, 3)
+        )
+        # Halfway across the edge rounds up
+        assert actual[5, 9] == 32768
+
+    def test_warp_map_is_reusable_across_planes(self):
+        # Arrange
+        planes = generate_image((3, 40, 50))
+        warp_map = warp_map_factory(ALIGNMENT_MATRIX, planes.shape[-2:], 0)
+
+        # Act / Assert
+        for plane in planes:
+            numpy.testing.assert_array_equal(
+                warp_map.warp(plane), skimage_warp(plane, ALIGNMENT_MATRIX, 0)
+            )
+
+    @pytest.mark.parametrize(
+        "alignment_matrix",
+        [
+            # Sample exactly halfway between pixels, and exactly on the edges of the plane
+            numpy.array([[1.0, 0.0, 0.5], [0.0, 1.0, -0.5], [0.0, 0.0, 1.0]]),
+            numpy.array([[1.0, 0.0, -2.5], [0.0, 1.0, 3.5], [0.0, 0.0, 1.0]]),
+            numpy.array([[0.5, 0.0, 0.0], [0.0, 2.0, 0.0], [0.0, 0.0, 1.0]]),
+            ALIGNMENT_MATRIX,
+        ],
+    )
+    def test_nearest_warp_map_matches_skimage(self, alignment_matrix):
+        # Arrange
+        plane = generate_image((40, 50))
+        expected = skimage_warp(plane, alignment_matrix, 0)
+        out = numpy.empty_like(plane)
+
+        # Act
+        actual = NearestWarpMap(alignment_matrix, plane.shape).warp(plane, out=out)
+
+        # Assert
+        assert actual is out
+        assert actual.dtype == numpy.uint16
+        numpy.testing.assert_array_equal(actual, expected)
+
+    def test_nearest_warp_map_writes_into_non_contiguous_out(self):
+        # Arrange
+        plane = generate_image((40, 50))
+        out = numpy.zeros((40, 100), dtype=numpy.uint16)
+
+        # Act
+        NearestWarpMap(ALIGNMENT_MATRIX, plane.shape).warp(plane, out=out[:, ::2])
+
+        # Assert
+        numpy.testing.assert_array_equal(
+            out[:, ::2], skimage_warp(plane, ALIGNMENT_MATRIX, 0)
+        )
+        assert not out[:, 1::2].any()
+
+    def test_warp_rejects_plane_of_wrong_shape(self):
+        # Arrange
+        warp_map = warp_map_factory(ALIGNMENT_MATRIX, (40, 50), 0)
+
+        # Act / Assert
+        with pytest.raises(ValueError):
+            warp_map.warp(generate_image((40, 51)))
+
+    @pytest.mark.parametrize(
+        ["alignment_matrix", "order"],
+        [
+            (ALIGNMENT_MATRIX, -1),
+            (ALIGNMENT_MATRIX, 6),
+            (numpy.eye(2), 0),
+        ],
+    )
+    def test_factory_guards_against_unsupported_parameters(
+        self, alignment_matrix, order
+    ):
+        # Act / Assert
+        with pytest.raises(ValueError):
+            warp_map_factory(alignment_matrix, (10, 10), order)
+
+    def test_align_image_rejects_mismatched_warp_map(self):
+        # Arrange
+        image = generate_image((2, 3, 40, 50))
+        warp_map = warp_map_factory(ALIGNMENT_MATRIX, (40, 50), 1)
+
+        # Act / Assert
+        with pytest.raises(ValueError):
+            align_image(
+                image, ALIGNMENT_MATRIX, [0], interpolation=0, warp_map=warp_map
+            )
+
+    @pytest.mark.parametrize("order", [0, 1, 3, 4])
+    def test_windowed_warp_matches_cropped_full_warp(self, order):
+        # Arrange
+        plane = generate_image((61, 83))
+        window = PlaneWindow(y=5, x=11, height=40, width=60)
+        y_slice, x_slice = window.slices()
+        expected = skimage_warp(plane, ALIGNMENT_MATRIX, order)[y_slice, x_slice]
+
+        # Act
+        warp_map = warp_map_factory(
+            ALIGNMENT_MATRIX, plane.shape, order, output_window=window
+        )
+        actual = warp_map.warp(plane)
+
+        # Assert
+        assert warp_map.output_shape == window.shape
+        # Orders 1 and 3 fold the window offset into the matrix, which may round differently by at most 1
+        numpy.testing.assert_allclose(actual, expected, atol=1, rtol=0)
+        if order in (0, 4):
+            numpy.testing.assert_array_equal(actual, expected)
+
+    @pytest.mark.parametrize("order", [0, 1, 3])
+    @pytest.mark.parametrize(
+        "alignment_matrix",
+        [
+            translation_matrix(0.27, -2.94),
+            translation_matrix(-3.5, 1.25),
+            translation_matrix(2.0, 0.0),
+            translation_matrix(0.5, -0.5),
+        ],
+    )
+    def test_translation_warp_map_matches_skimage(self, alignment_matrix, order):
+        # Arrange
+        plane = generate_image((61, 83))
+        expected = skimage_warp(plane, alignment_matrix, order)
+
+        # Act
+        warp_map = warp_map_factory(alignment_matrix, plane.shape, order)
+        actual = warp_map.warp(plane)
+
+        # Assert
+        assert isinstance(warp_map, TranslationWarpMap)
+        assert warp_map.deviation == 0
+        if order == 0:
+            numpy.testing.assert_array_equal(actual, expected)
+        else:
+            # Subpixel fractions are computed once rather than per pixel, which may round differently by at most 1
+            numpy.testing.assert_allclose(actual, expected, atol=1, rtol=0)
+
+    @pytest.mark.parametrize("order", [0, 1, 3])
+    def test_windowed_translation_warp_map_matches_cropped_full_warp(self, order):
+        # Arrange
+        plane = generate_image((61, 83))
+        alignment_matrix = translation_matrix(-1.7, 3.2)
+        window = PlaneWindow(y=0, x=30, height=45, width=53)
+        y_slice, x_slice = window.slices()
+        expected = skimage_warp(plane, alignment_matrix, order)[y_slice, x_slice]
+
+        # Act
+        warp_map = warp_map_factory(
+            alignment_matrix, plane.shape, order, output_window=window
+        )
+        actual = warp_map.warp(plane)
+
+        # Assert
+        assert isinstance(warp_map, TranslationWarpMap)
+        numpy.testing.assert_allclose(actual, expected, atol=1, rtol=0)
+
+    def test_translation_beyond_plane_fills_with_zeros(self):
+        # Arrange
+        plane = generate_image((20, 30))
+
+        # Act
+        actual = warp_map_factory(translation_matrix(25.0, 0.0), plane.shape, 1).warp(
+            plane
+        )
+
+        # Assert
+        assert not actual.any()
+
+    def test_factory_uses_translation_within_tolerance(self):
+        # Arrange
+        plane_shape = (61, 83)
+        _, deviation = nearest_translation(
+            ALIGNMENT_MATRIX, PlaneWindow(0, 0, *plane_shape)
+        )
+
+        # Act
+        exact = warp_map_factory(ALIGNMENT_MATRIX, plane_shape, 1)
+        approximate = warp_map_factory(
+            ALIGNMENT_MATRIX, plane_shape, 1, translation_tolerance=deviation * 1.01
+        )
+
+        # Assert
+        assert 0 < deviation < 1
+        assert isinstance(exact, MatrixWarpMap)
+        assert isinstance(approximate, TranslationWarpMap)
+        assert approximate.deviation == deviation
+        assert approximate.tolerance == deviation * 1.01
+
+    def test_translation_warp_map_approximates_near_translation(self):
+        # Arrange
+        plane = numpy.tile(numpy.linspace(100, 60000, 83), (61, 1)).astype(numpy.uint16)
+        alignment_matrix = numpy.array(
+            [[1.0, -0.0005, 0.3], [0.0005, 1.0, -1.2], [0.0, 0.0, 1.0]]
+        )
+        expected = skimage_warp(plane, alignment_matrix, 1)
+
+        # Act
+        actual = warp_map_factory(
+            alignment_matrix, plane.shape, 1, translation_tolerance=0.05
+        ).warp(plane)
+
+        # Assert
+        # Samples move by at most 0.05 px along a gradient of ~730 per px
+        numpy.testing.assert_allclose(actual[2:-2, 2:-2], expected[2:-2, 2:-2], atol=40)
+
+    def test_nearest_translation(self):
+        # Arrange
+        window = PlaneWindow(0, 0, 100, 200)
+        projective = numpy.array([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [1e-4, 0.0, 1.0]])
+
+        # Act
+        translation, deviation = nearest_translation(
+            translation_matrix(1.5, -2.0), window
+        )
+        _, projective_deviation = nearest_translation(projective, window)
+
+        # Assert
+        assert translation == (1.5, -2.0)
+        assert deviation == 0
+        assert projective_deviation == float("inf")
+
+    @pytest.mark.parametrize(
+        ["alignment_matrix", "order", "tolerance"],
+        [
+            (ALIGNMENT_MATRIX, 1, 0.0),  # Not a translation
+            (translation_matrix(1.0, 1.0), 4, 0.0),  # Unsupported order
+        ],
+    )
+    def test_translation_warp_map_guards_against_unsupported_parameters(
+        self, alignment_matrix, order, tolerance
+    ):
+        # Act / Assert
+        with pytest.raises(ValueError):
+            TranslationWarpMap(alignment_matrix, (40, 50), order, tolerance=tolerance)
+
+    def test_factory_guards_against_negative_translation_tolerance(self):
+        # Act / Assert
+        with pytest.raises(ValueError):
+            warp_map_factory(ALIGNMENT_MATRIX, (40, 50), 1, translation_tolerance=-1)
+
+    @pytest.mark.parametrize("order", [0, 1, 3, 4])
+    @pytest.mark.parametrize(
+        "alignment_matrix", [ALIGNMENT_MATRIX, translation_matrix(0.27, -2.94)]
+    )
+    @pytest.mark.parametrize("output_window", [None, PlaneWindow(3, 5, 30, 40)])
+    def test_warp_volume_matches_warp(self, alignment_matrix, order, output_window):
+        # Arrange
+        volume = generate_image((2, 3, 41, 53))  # TZYX
+        warp_map = warp_map_factory(
+            alignment_matrix, volume.shape[-2:], order, output_window=output_window
+        )
+        expected = numpy.stack(
+            [[warp_map.warp(plane) for plane in planes] for planes in volume]
+        )
+
+        # Act
+        actual = warp_map.warp_volume(volume)
+
+        # Assert
+        assert actual.shape == volume.shape[:2] + warp_map.output_shape
+        numpy.testing.assert_array_equal(actual, expected)
+
+    @pytest.mark.parametrize("order", [0, 1, 3])
+    def test_warp_volume_writes_into_non_contiguous_out(self, order):
+        # Arrange
+        volume = generate_image((3, 41, 53))
+        warp_map = warp_map_factory(translation_matrix(1.5, -0.25), (41, 53), order)
+        out = numpy.zeros((3, 2, 41, 53), dtype=numpy.uint16)
+
+        # Act
+        actual = warp_map.warp_volume(volume, out=out[:, 1])
+
+        # Assert
+        assert numpy.shares_memory(actual, out)
+        for plane, out_plane in zip(volume, out[:, 1]):
+            numpy.testing.assert_array_equal(out_plane, warp_map.warp(plane))
+        assert not out[:, 0].any()
+
+    def test_translation_warp_volume_in_chunks(self, monkeypatch):
+        # Arrange
+        volume = generate_image((5, 41, 53))
+        warp_map = warp_map_factory(translation_matrix(0.4, 0.6), (41, 53), 3)
+        expected = warp_map.warp_volume(volume)
+
+        # Act
+        monkeypatch.setattr(TranslationWarpMap, "CHUNK_BYTES", 2 * 44 * 56 * 8)
+        actual = warp_map.warp_volume(volume)
+
+        # Assert
+        numpy.testing.assert_array_equal(actual, expected)
+
+    @pytest.mark.parametrize(
+        ["volume_shape", "out_shape"],
+        [
+            ((3, 40, 51), None),  # Wrong plane shape
+            ((40,), None),  # Not a stack of planes
+            ((3, 40, 50), (2, 40, 50)),  # Wrong out shape
+        ],
+    )
+    def test_warp_volume_guards_against_incompatible_shapes(
+        self, volume_shape, out_shape
+    ):
+        # Arrange
+        warp_map = warp_map_factory(ALIGNMENT_MATRIX, (40, 50), 0)
+        out = None if out_shape is None else numpy.empty(out_shape, numpy.uint16)
+
+        # Act / Assert
+        with pytest.raises(ValueError):
+            warp_map.warp_volume(generate_image(volume_shape), out=out)
+
+    @pytest.mark.parametrize("order", [0, 1, 3])
+    @pytest.mark.parametrize(
+        "alignment_matrix", [ALIGNMENT_MATRIX, translation_matrix(-1.7, 3.2)]
+    )
+    def test_warp_map_with_source_window_samples_like_whole_plane(
+        self, alignment_matrix, order
+    ):
+        # Arrange
+        plane = generate_image((61, 83))
+        output_window = PlaneWindow(y=20, x=30, height=20, width=25)
+        source_window = PlaneWindow(y=10, x=20, height=40, width=45)
+        y_slice, x_slice = source_window.slices()
+        expected = warp_map_factory(
+            alignment_matrix, plane.shape, order, output_window=output_window
+        ).sample(plane)
+
+        # Act
+        warp_map = warp_map_factory(
+            alignment_matrix,
+            plane.shape,
+            order,
+            output_window=output_window,
+            source_window=source_window,
+        )
+        actual = warp_map.sample(plane[y_slice, x_slice])
+
+        # Assert
+        assert warp_map.input_shape == source_window.shape
+        numpy.testing.assert_allclose(actual, expected, rtol=0, atol=1e-6)
+
+    @pytest.mark.parametrize("order", [0, 1, 3, 4])
+    def test_sample_is_warp_before_clipping_and_rounding(self, order):
+        # Arrange
+        plane = generate_image((61, 83))
+        warp_map = warp_map_factory(ALIGNMENT_MATRIX, plane.shape, order)
+
+        # Act
+        samples = warp_map.sample(plane)
+
+        # Assert
+        assert samples.dtype == numpy.double
+        numpy.testing.assert_array_equal(
+            numpy.floor(numpy.clip(samples, 0, plane.max()) + 0.5).astype(numpy.uint16),
+            warp_map.warp(plane),
+        )
+
+
+class TestWarpMapCache:
+    def test_get_reuses_warp_map(self):
+        # Arrange
+        cache = WarpMapCache(max_bytes=1024**3)
+
+        # Act
+        first = cache.get(ALIGNMENT_MATRIX, (40, 50), 0)
+        second = cache.get(ALIGNMENT_MATRIX.copy(), (40, 50), 0)
+
+        # Assert
+        assert first is second
+        info = cache.info()
+        assert (info.hits, info.misses, info.entries) == (1, 1, 1)
+        assert info.nbytes == first.nbytes > 0
+
+    @pytest.mark.parametrize(
+        "other_arguments",
+        [
+            (ALIGNMENT_MATRIX + 1e-9, (40, 50), 0, None),
+            (ALIGNMENT_MATRIX, (40, 51), 0, None),
+            (ALIGNMENT_MATRIX, (40, 50), 1, None),
+            (ALIGNMENT_MATRIX, (40, 50), 0, PlaneWindow(0, 0, 20, 20)),
+        ],
+    )
+    def test_get_distinguishes_sampling_maps(self, other_arguments):
+        # Arrange
+        cache = WarpMapCache(max_bytes=1024**3)
+        warp_map = cache.get(ALIGNMENT_MATRIX, (40, 50), 0)
+
+        # Act
+        other = cache.get(*other_arguments)
+
+        # Assert
+        assert other is not warp_map
+        assert other.matches(*other_arguments)
+        assert cache.info().misses == 2
+
+    def test_evicts_least_recently_used(self):
+        # Arrange
+        nbytes = warp_map_factory(ALIGNMENT_MATRIX, (40, 50), 0).nbytes
+        cache = WarpMapCache(max_bytes=2 * nbytes)
+        first = cache.get(ALIGNMENT_MATRIX, (40, 50), 0)
+        second = cache.get(ALIGNMENT_MATRIX + 1e-9, (40, 50), 0)
+
+        # Act
+        cache.get(ALIGNMENT_MATRIX, (40, 50), 0)  # Most recently used
+        cache.get(ALIGNMENT_MATRIX + 2e-9, (40, 50), 0)
+
+        # Assert
+        info = cache.info()
+        assert (info.entries, info.evictions) == (2, 1)
+        assert info.nbytes <= info.max_bytes
+        assert cache.get(ALIGNMENT_MATRIX, (40, 50), 0) is first
+        assert cache.get(ALIGNMENT_MATRIX + 1e-9, (40, 50), 0) is not second
+
+    def test_does_not_cache_warp_map_larger_than_budget(self):
+        # Arrange
+        cache = WarpMapCache(max_bytes=10)
+
+        # Act
+        warp_map = cache.get(ALIGNMENT_MATRIX, (40, 50), 0)
+
+        # Assert
+        assert isinstance(warp_map, NearestWarpMap)
+        assert cache.info().entries == 0
+
+    def test_shrinking_budget_evicts(self):
+        # Arrange
+        cache = WarpMapCache(max_bytes=1024**3)
+        cache.get(ALIGNMENT_MATRIX, (40, 50), 0)
+
+        # Act
+        cache.max_bytes = 0
+
+        # Assert
+        assert cache.info().entries == 0
+        assert cache.info().evictions == 1
+
+    def test_clear(self):
+        # Arrange
+        cache = WarpMapCache(max_bytes=1024**3)
+        cache.get(ALIGNMENT_MATRIX, (40, 50), 0)
+
+        # Act
+        cache.clear()
+
+        # Assert
+        assert cache.info() == (0, 0, 0, 0, 0, 1024**3)
+
+    def test_align_image_uses_process_wide_cache(self):
+        # Arrange
+        image = generate_image((2, 3, 40, 50))
+        WARP_MAP_CACHE.clear()
+
+        # Act
+        first = align_image(image, ALIGNMENT_MATRIX, [0])
+        second = align_image(image, ALIGNMENT_MATRIX, [0])
+
+        # Assert
+        numpy.testing.assert_array_equal(first, second)
+        info = WARP_MAP_CACHE.info()
+        assert (info.hits, info.misses) == (1, 1)
+
+    def test_guards_against_negative_budget(self):
+        # Act / Assert
+        with pytest.raises(ValueError):
+            WarpMapCache(max_bytes=-1)
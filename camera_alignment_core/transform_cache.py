@@ -0,0 +1,171 @@
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+import pathlib
+import tempfile
+import typing
+
+import numpy
+import numpy.typing
+
+from .alignment_utils import AlignmentInfo
+from .constants import LOGGER_NAME, Magnification
+
+log = logging.getLogger(LOGGER_NAME)
+
+# Size of the blocks in which files are read for hashing
+HASH_BLOCK_BYTES = 8 * 1024**2
+
+
+class TransformCache:
+    """Persistent cache of alignment transforms, kept as small JSON files within a directory.
+
+    Generating an alignment transform from an optical control is expensive, and the same optical control is
+    typically used to align many images, often from many separate processes. Each cached transform is keyed by
+    the content of the optical control, the channels and magnification it was generated with and the version of
+    this package, so a cache directory may be shared by any number of processes and optical controls.
+    Entries are written atomically: a process either finds a complete entry or none at all.
+
+    Example
+    -------
+    >>> cache = TransformCache("/some/shared/dir/transforms")
+    >>> key = cache.key("/some/path/to/an/argolight-field-of-rings.czi", 1, 2, Magnification(100))
+    >>> cached = cache.get(key)
+    >>> if cached is None:
+    >>>     cache.put(key, *generate_alignment_matrix(...))
+    """
+
+    def __init__(self, directory: typing.Union[str, pathlib.Path]) -> None:
+        """Constructor.
+
+        Parameters
+        ----------
+        directory : Union[str, Path]
+            Directory in which to keep cached transforms. Neither the directory nor its parents need to exist.
+        """
+        self._directory = pathlib.Path(directory)
+        self._directory.mkdir(exist_ok=True, parents=True)
+
+    @property
+    def directory(self) -> pathlib.Path:
+        return self._directory
+
+    @classmethod
+    def key(
+        cls,
+        optical_control: typing.Union[str, pathlib.Path],
+        reference_channel: int,
+        shift_channel: int,
+        magnification: Magnification,
+    ) -> str:
+        """Key of the transform generated from `optical_control` with the given parameters by this version of
+        the package. Reads the whole of `optical_control` (every file within it, if it is a directory).
+        """
+        # Imported here: the package's __init__ imports this module before defining __version__
+        from . import __version__
+
+        digest = hashlib.sha256()
+        update_digest(digest, optical_control)
+        digest.update(
+            json.dumps(
+                {
+                    "reference_channel": int(reference_channel),
+                    "shift_channel": int(shift_channel),
+                    "magnification": magnification.value,
+                    "version": __version__,
+                },
+                sort_keys=True,
+            ).encode()
+        )
+        return digest.hexdigest()
+
+    def get(
+        self, key: str
+    ) -> typing.Optional[
+        typing.Tuple[numpy.typing.NDArray[numpy.float16], AlignmentInfo]
+    ]:
+        """The alignment matrix and AlignmentInfo cached for `key`, or None if there are none."""
+        try:
+            return load_alignment_transform(self._path(key))
+        except FileNotFoundError:
+            return None
+        except (ValueError, KeyError, TypeError):
+            log.warning("Ignoring unreadable cached transform %s", self._path(key))
+            return None
+
+    def put(
+        self,
+        key: str,
+        alignment_matrix: numpy.typing.NDArray[numpy.float16],
+        alignment_info: AlignmentInfo,
+    ) -> None:
+        """Cache `alignment_matrix` and `alignment_info` for `key`, replacing any transform already cached for it."""
+        save_alignment_transform(self._path(key), alignment_matrix, alignment_info)
+
+    def _path(self, key: str) -> pathlib.Path:
+        return self._directory / f"{key}.json"
+
+
+def update_digest(
+    digest: "hashlib._Hash", path: typing.Union[str, pathlib.Path]
+) -> None:
+    """Feed the content of `path` into `digest`: the file, or every file within the directory
+    (along with its path relative to `path`), in a stable order.
+    """
+    root = pathlib.Path(path)
+    files = (
+        sorted(child for child in root.rglob("*") if child.is_file())
+        if root.is_dir()
+        else [root]
+    )
+    for file_path in files:
+        digest.update(str(file_path.relative_to(root)).encode())
+        with open(file_path, "rb") as file:
+            for block in iter(lambda: file.read(HASH_BLOCK_BYTES), b""):
+                digest.update(block)
+
+
+def load_alignment_transform(
+    path: typing.Union[str, pathlib.Path],
+) -> typing.Tuple[numpy.typing.NDArray[numpy.float16], AlignmentInfo]:
+    """Read an alignment matrix and AlignmentInfo from a JSON file written by `save_alignment_transform`.
+
+    Raises FileNotFoundError if there is no such file, and ValueError, KeyError or TypeError if it is not one.
+    """
+    with open(path) as file:
+        entry = json.load(file)
+    return numpy.array(entry["matrix"]), AlignmentInfo(**entry["info"])
+
+
+def save_alignment_transform(
+    path: typing.Union[str, pathlib.Path],
+    alignment_matrix: numpy.typing.NDArray[numpy.float16],
+    alignment_info: AlignmentInfo,
+) -> None:
+    """Write an alignment matrix and AlignmentInfo to a JSON file at `path`, replacing any file already there.
+
+    Example of the file's content:
+    {"matrix": [[1.001, -0.005, 0.272], [0.005, 1.001, -2.941], [0.0, 0.0, 1.0]],
+     "info": {"rotation": 0, "shift_x": 1, "shift_y": -3, "z_offset": 0, "scaling": 1.001}}
+    """
+    path = pathlib.Path(path)
+    entry = {
+        "matrix": numpy.asarray(alignment_matrix, dtype=numpy.float64).tolist(),
+        "info": dataclasses.asdict(alignment_info),
+    }
+
+    # Write to a temporary file within the same directory, then move it into place in a single step,
+    # so that concurrent readers never see a partially written file.
+    file_descriptor, temporary_path = tempfile.mkstemp(
+        dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(file_descriptor, "w") as file:
+            # Values may be numpy scalars, which json does not serialize natively
+            json.dump(entry, file, default=lambda value: value.item())
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.unlink(temporary_path)
+        raise
@@ -0,0 +1,987 @@
+import abc
+import collections
+import logging
+import threading
+import typing
+
+import numpy
+import numpy.typing
+
+from .constants import LOGGER_NAME
+
+# Deferred imports: scipy, scikit-image
+
+log = logging.getLogger(LOGGER_NAME)
+
+
+class PlaneWindow(typing.NamedTuple):
+    """Rectangular region of a YX plane: `height` x `width` pixels, with its top-left pixel at (`y`, `x`)."""
+
+    y: int
+    x: int
+    height: int
+    width: int
+
+    @property
+    def shape(self) -> typing.Tuple[int, int]:
+        return (self.height, self.width)
+
+    def slices(self) -> typing.Tuple[slice, slice]:
+        """(Y, X) slices selecting this window from a plane."""
+        return (
+            slice(self.y, self.y + self.height),
+            slice(self.x, self.x + self.width),
+        )
+
+
+class WarpMap(abc.ABC):
+    """Resampling engine for applying one alignment matrix to many YX planes of the same shape.
+
+    Anything about the transform that does not depend on pixel values (e.g., the inverse coordinate grid)
+    is computed once at construction and reused for every plane passed to `warp`.
+
+    A WarpMap may be restricted to an `output_window` of the plane, in which case only the output pixels inside
+    that window are computed. This is equivalent to warping the whole plane and then cropping it to the window.
+
+    Likewise, a WarpMap may be given a `source_window`, in which case the planes passed to `warp` are expected to be
+    only that region of the input plane (e.g. a tile read from disk). Samples are still computed in the coordinates
+    of the whole plane, but any that fall outside `source_window` are treated as outside the plane. The result
+    matches warping the whole plane as long as `source_window` covers every input pixel that the output window
+    depends on, except that `warp` clips to the range of the region rather than of the whole plane
+    (use `sample` to clip differently).
+
+    Create a WarpMap using the `warp_map_factory` factory function, which will provide
+    a concrete class appropriate for the requested interpolation order.
+    """
+
+    def __init__(
+        self,
+        alignment_matrix: numpy.typing.NDArray[numpy.float16],
+        plane_shape: typing.Tuple[int, int],
+        order: int,
+        output_window: typing.Optional[PlaneWindow] = None,
+        source_window: typing.Optional[PlaneWindow] = None,
+    ) -> None:
+        self._alignment_matrix = numpy.asarray(alignment_matrix)
+        self._plane_shape = (int(plane_shape[0]), int(plane_shape[1]))
+        self._order = order
+        self._output_window = self._plane_window(output_window, "output_window")
+        self._source_window = self._plane_window(source_window, "source_window")
+
+    def _plane_window(
+        self, window: typing.Optional[PlaneWindow], name: str
+    ) -> PlaneWindow:
+        """Validate that `window` fits within `plane_shape`, defaulting to the whole plane."""
+        if window is None:
+            return PlaneWindow(0, 0, *self._plane_shape)
+
+        if (
+            window.y < 0
+            or window.x < 0
+            or window.height < 1
+            or window.width < 1
+            or window.y + window.height > self._plane_shape[0]
+            or window.x + window.width > self._plane_shape[1]
+        ):
+            raise ValueError(
+                f"{name} {window} does not fit within planes of shape {self._plane_shape}"
+            )
+        return PlaneWindow(*(int(value) for value in window))
+
+    @property
+    def alignment_matrix(self) -> numpy.typing.NDArray[numpy.float16]:
+        return self._alignment_matrix
+
+    @property
+    def plane_shape(self) -> typing.Tuple[int, int]:
+        """(Y, X) shape of the whole planes being aligned."""
+        return self._plane_shape
+
+    @property
+    def order(self) -> int:
+        return self._order
+
+    @property
+    def output_window(self) -> PlaneWindow:
+        """Region of the aligned plane that `warp` produces."""
+        return self._output_window
+
+    @property
+    def output_shape(self) -> typing.Tuple[int, int]:
+        """(Y, X) shape of the planes produced by `warp`."""
+        return self._output_window.shape
+
+    @property
+    def source_window(self) -> PlaneWindow:
+        """Region of the input plane that is passed to `warp`."""
+        return self._source_window
+
+    @property
+    def input_shape(self) -> typing.Tuple[int, int]:
+        """(Y, X) shape of the planes passed to `warp`."""
+        return self._source_window.shape
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the precomputed sampling map, in bytes."""
+        return self._alignment_matrix.nbytes
+
+    def matches(
+        self,
+        alignment_matrix: numpy.typing.NDArray[numpy.float16],
+        plane_shape: typing.Tuple[int, int],
+        order: int,
+        output_window: typing.Optional[PlaneWindow] = None,
+        source_window: typing.Optional[PlaneWindow] = None,
+    ) -> bool:
+        """Whether this map was built for the given matrix, plane shape, interpolation order and windows."""
+        if output_window is None:
+            output_window = PlaneWindow(0, 0, *plane_shape)
+        if source_window is None:
+            source_window = PlaneWindow(0, 0, *plane_shape)
+
+        return (
+            self._order == order
+            and self._plane_shape == tuple(plane_shape)
+            and self._output_window == tuple(output_window)
+            and self._source_window == tuple(source_window)
+            and numpy.array_equal(self._alignment_matrix, alignment_matrix)
+        )
+
+    def _source_coordinates(self) -> numpy.typing.NDArray[numpy.double]:
+        """(2, Y, X) array of the (row, column) position within the input plane sampled by each output pixel.
+
+        These are the coordinates skimage.transform.warp builds internally when given a 3x3 matrix,
+        restricted to `output_window` and made relative to the top-left pixel of `source_window`.
+        """
+        import skimage.transform
+
+        transform = skimage.transform.ProjectiveTransform(matrix=self._alignment_matrix)
+        if self._output_window.y == 0 and self._output_window.x == 0:
+            coordinates = skimage.transform.warp_coords(transform, self.output_shape)
+        else:
+            offset = numpy.array([self._output_window.x, self._output_window.y])
+
+            def offset_transform(
+                xy: numpy.typing.NDArray[numpy.double],
+            ) -> numpy.typing.NDArray[numpy.double]:
+                return transform(xy + offset)
+
+            coordinates = skimage.transform.warp_coords(
+                offset_transform, self.output_shape
+            )
+
+        if self._source_window.y or self._source_window.x:
+            coordinates[0] -= self._source_window.y
+            coordinates[1] -= self._source_window.x
+        return coordinates
+
+    def _check_plane(self, plane: numpy.typing.NDArray[numpy.uint16]) -> None:
+        if plane.shape != self.input_shape:
+            raise ValueError(
+                f"WarpMap built for planes of shape {self.input_shape}, got plane of shape {plane.shape}"
+            )
+
+    def warp(
+        self,
+        plane: numpy.typing.NDArray[numpy.uint16],
+        out: typing.Optional[numpy.typing.NDArray[numpy.uint16]] = None,
+    ) -> numpy.typing.NDArray[numpy.uint16]:
+        """Apply the alignment matrix to a single YX `plane`.
+
+        Samples are computed as by
+        `skimage.transform.warp(plane, inverse_map=alignment_matrix, order=order, preserve_range=True)`,
+        then rounded half up and clipped to the range of the output dtype.
+
+        Parameters
+        ----------
+        plane : numpy.typing.NDArray[numpy.uint16]
+            YX plane of shape `input_shape`.
+        out : Optional[numpy.typing.NDArray[numpy.uint16]]
+            YX array of shape `output_shape` to write the result into, e.g. a plane of a larger CZYX output image.
+            If not provided, a new uint16 plane is allocated.
+
+        Returns
+        -------
+        numpy.typing.NDArray[numpy.uint16]
+            `out`, if provided.
+        """
+        self._check_plane(plane)
+        if out is None:
+            out = numpy.empty(self.output_shape, dtype=numpy.uint16)
+        elif out.shape != self.output_shape:
+            raise ValueError(
+                f"WarpMap produces planes of shape {self.output_shape}, got out of shape {out.shape}"
+            )
+
+        self._warp_into(plane, out)
+        return out
+
+    def warp_volume(
+        self,
+        volume: numpy.typing.NDArray[numpy.uint16],
+        out: typing.Optional[numpy.typing.NDArray[numpy.uint16]] = None,
+    ) -> numpy.typing.NDArray[numpy.uint16]:
+        """Apply the alignment matrix to every YX plane of `volume`, e.g. a ZYX channel or a TZYX block.
+
+        This is the alignment matrix lifted to an affine transform with identity on all leading axes:
+        the result is the same as calling `warp` on each plane, but engines that can resample many planes at once
+        (NearestWarpMap, TranslationWarpMap) do so in one vectorised call.
+
+        Parameters
+        ----------
+        volume : numpy.typing.NDArray[numpy.uint16]
+            Array of any number of dimensions whose last two are YX planes of shape `input_shape`.
+        out : Optional[numpy.typing.NDArray[numpy.uint16]]
+            Array of shape `volume.shape[:-2] + output_shape` to write the result into.
+            If not provided, a new uint16 array is allocated.
+
+        Returns
+        -------
+        numpy.typing.NDArray[numpy.uint16]
+            `out`, if provided.
+        """
+        if volume.ndim < 2:
+            raise ValueError(
+                f"Expected volume to have at least 2 dimensions. Got: {volume.shape}"
+            )
+        self._check_plane(volume[(0,) * (volume.ndim - 2)])
+
+        output_shape = volume.shape[:-2] + self.output_shape
+        if out is None:
+            out = numpy.empty(output_shape, dtype=numpy.uint16)
+        elif out.shape != output_shape:
+            raise ValueError(
+                f"WarpMap produces volumes of shape {output_shape}, got out of shape {out.shape}"
+            )
+
+        if volume.size == 0:
+            return out
+
+        planes = volume.reshape((-1,) + self.input_shape)
+        out_planes = out.reshape((-1,) + self.output_shape)
+        if numpy.shares_memory(out_planes, out):
+            self._warp_volume_into(planes, out_planes)
+        else:
+            # `out` cannot be viewed as a stack of planes without copying
+            self._warp_volume_into(planes, out_planes)
+            out[...] = out_planes.reshape(output_shape)
+
+        return out
+
+    def sample(
+        self, plane: numpy.typing.NDArray[numpy.uint16]
+    ) -> numpy.typing.NDArray[numpy.double]:
+        """Interpolated samples of `plane` for every pixel of the output window, before clipping and rounding.
+
+        `warp` is `sample` followed by clipping like skimage.transform.warp does (to the range of `plane`,
+        expanded to include 0 if the fill was used) and rounding into uint16. Callers that see only part of
+        a plane at a time (see `source_window`) can use `sample` to clip to the range of the whole plane instead.
+        """
+        self._check_plane(plane)
+        return self._sample(plane)
+
+    @abc.abstractmethod
+    def _sample(
+        self, plane: numpy.typing.NDArray[numpy.uint16]
+    ) -> numpy.typing.NDArray[numpy.double]:
+        pass
+
+    def _warp_into(
+        self,
+        plane: numpy.typing.NDArray[numpy.uint16],
+        out: numpy.typing.NDArray[numpy.uint16],
+    ) -> None:
+        samples = self._sample(plane)
+        self._clip_to_input_range(samples, plane)
+        self._store(samples, out)
+
+    def _warp_volume_into(
+        self,
+        planes: numpy.typing.NDArray[numpy.uint16],
+        out: numpy.typing.NDArray[numpy.uint16],
+    ) -> None:
+        """Warp a (N, Y, X) stack of planes into a (N, output Y, output X) stack.
+        Engines that can process many planes at once override this.
+        """
+        for plane, out_plane in zip(planes, out):
+            self._warp_into(plane, out_plane)
+
+    @staticmethod
+    def _clip_to_input_range(
+        samples: numpy.typing.NDArray[numpy.double],
+        plane: numpy.typing.NDArray[numpy.uint16],
+    ) -> None:
+        """Clip `samples` in place the way skimage.transform.warp clips its output:
+        to the range of the input, expanded to include the fill value (0) if it was used.
+
+        `plane` and `samples` may also be stacks of planes, in which case each plane is clipped to its own range.
+        """
+        plane_axes = (-2, -1)
+        min_val = plane.min(axis=plane_axes, keepdims=True).astype(numpy.double)
+        max_val = plane.max(axis=plane_axes, keepdims=True).astype(numpy.double)
+        fill_used = (samples.min(axis=plane_axes, keepdims=True) <= 0) & (
+            samples.max(axis=plane_axes, keepdims=True) >= 0
+        )
+        numpy.copyto(min_val, 0.0, where=fill_used & (min_val > 0))
+        numpy.clip(samples, min_val, max_val, out=samples)
+
+    @staticmethod
+    def _store(
+        samples: numpy.typing.NDArray[numpy.double],
+        out: numpy.typing.NDArray[numpy.uint16],
+    ) -> None:
+        """Write floating point `samples` into `out`, rounding half up and clipping if `out` is an integer array.
+
+        `samples` is used as scratch space.
+        """
+        if numpy.issubdtype(out.dtype, numpy.integer):
+            dtype_info = numpy.iinfo(out.dtype)
+            samples += 0.5
+            numpy.floor(samples, out=samples)
+            numpy.clip(samples, dtype_info.min, dtype_info.max, out=samples)
+        out[...] = samples
+
+
+class NearestWarpMap(WarpMap):
+    """WarpMap for nearest-neighbour interpolation (order 0) that works directly on the input dtype.
+
+    Nearest-neighbour sampling only ever copies input pixels, so the sampling map reduces to one flat source index
+    per output pixel plus the set of output pixels that fall outside the input and are filled with 0.
+    Applying it is then a single `numpy.take` with no floating point conversion.
+    """
+
+    def __init__(
+        self,
+        alignment_matrix: numpy.typing.NDArray[numpy.float16],
+        plane_shape: typing.Tuple[int, int],
+        order: int = 0,
+        output_window: typing.Optional[PlaneWindow] = None,
+        source_window: typing.Optional[PlaneWindow] = None,
+    ) -> None:
+        if order != 0:
+            raise ValueError(f"NearestWarpMap only supports order 0. Got: {order}")
+
+        super().__init__(
+            alignment_matrix, plane_shape, order, output_window, source_window
+        )
+
+        rows, columns = self.input_shape
+        coordinates = self._source_coordinates()
+
+        # Round half up to the nearest source pixel, as scipy.ndimage.map_coordinates does for order 0.
+        # With mode "grid-constant", only samples that round to a pixel inside the plane are kept.
+        source_rows = numpy.floor(coordinates[0] + 0.5).astype(numpy.intp)
+        source_columns = numpy.floor(coordinates[1] + 0.5).astype(numpy.intp)
+        in_bounds = (
+            (source_rows >= 0)
+            & (source_rows < rows)
+            & (source_columns >= 0)
+            & (source_columns < columns)
+        )
+
+        self._source_indices = numpy.where(
+            in_bounds, source_rows * columns + source_columns, 0
+        ).ravel()
+        self._fill_indices = numpy.flatnonzero(~in_bounds)
+
+    @property
+    def nbytes(self) -> int:
+        return super().nbytes + self._source_indices.nbytes + self._fill_indices.nbytes
+
+    def _sample(
+        self, plane: numpy.typing.NDArray[numpy.uint16]
+    ) -> numpy.typing.NDArray[numpy.double]:
+        samples = numpy.empty(self.output_shape, dtype=plane.dtype)
+        self._warp_into(plane, samples)
+        return samples.astype(numpy.double)
+
+    def _warp_into(
+        self,
+        plane: numpy.typing.NDArray[numpy.uint16],
+        out: numpy.typing.NDArray[numpy.uint16],
+    ) -> None:
+        self._warp_volume_into(plane[numpy.newaxis], out[numpy.newaxis])
+
+    def _warp_volume_into(
+        self,
+        planes: numpy.typing.NDArray[numpy.uint16],
+        out: numpy.typing.NDArray[numpy.uint16],
+    ) -> None:
+        number_of_planes = planes.shape[0]
+        if out.dtype == planes.dtype and out.flags.c_contiguous:
+            flat_out = out.reshape(number_of_planes, -1)
+        else:
+            flat_out = numpy.empty(
+                (number_of_planes, self._source_indices.size), dtype=planes.dtype
+            )
+
+        # Every source index is valid, so mode="clip" only serves to skip numpy's out-of-bounds buffering
+        numpy.take(
+            planes.reshape(number_of_planes, -1),
+            self._source_indices,
+            axis=1,
+            out=flat_out,
+            mode="clip",
+        )
+        flat_out[:, self._fill_indices] = 0
+
+        if not numpy.shares_memory(flat_out, out):
+            out[...] = flat_out.reshape(out.shape)
+
+
+class CoordinateWarpMap(WarpMap):
+    """WarpMap that precomputes the (Y, X) source coordinates of every output pixel.
+
+    This is the route skimage.transform.warp takes for interpolation orders without a Cython fast path,
+    except that skimage rebuilds the coordinate grid on every call.
+    """
+
+    def __init__(
+        self,
+        alignment_matrix: numpy.typing.NDArray[numpy.float16],
+        plane_shape: typing.Tuple[int, int],
+        order: int,
+        output_window: typing.Optional[PlaneWindow] = None,
+        source_window: typing.Optional[PlaneWindow] = None,
+    ) -> None:
+        super().__init__(
+            alignment_matrix, plane_shape, order, output_window, source_window
+        )
+        self._coordinates = self._source_coordinates()
+
+    @property
+    def nbytes(self) -> int:
+        return super().nbytes + self._coordinates.nbytes
+
+    def _sample(
+        self, plane: numpy.typing.NDArray[numpy.uint16]
+    ) -> numpy.typing.NDArray[numpy.double]:
+        import scipy.ndimage
+
+        return scipy.ndimage.map_coordinates(
+            plane,
+            self._coordinates,
+            output=numpy.double,
+            order=self._order,
+            mode="grid-constant",
+            cval=0.0,
+            prefilter=self._order > 1,
+        )
+
+
+class MatrixWarpMap(WarpMap):
+    """WarpMap for interpolation orders that skimage.transform.warp handles in compiled code (bilinear and bicubic).
+
+    skimage computes source coordinates on the fly for these orders, so there is no grid to precompute;
+    this class exists so that callers can treat every interpolation order the same way.
+
+    An `output_window` or `source_window` is folded into the matrix as a translation. Source coordinates are then
+    computed in a different order than for the whole plane, so results can differ from warp-then-crop by floating point
+    rounding error.
+    """
+
+    FAST_ORDERS = (1, 3)
+
+    def __init__(
+        self,
+        alignment_matrix: numpy.typing.NDArray[numpy.float16],
+        plane_shape: typing.Tuple[int, int],
+        order: int,
+        output_window: typing.Optional[PlaneWindow] = None,
+        source_window: typing.Optional[PlaneWindow] = None,
+    ) -> None:
+        super().__init__(
+            alignment_matrix, plane_shape, order, output_window, source_window
+        )
+
+        window_offset = numpy.array(
+            [
+                [1.0, 0.0, self._output_window.x],
+                [0.0, 1.0, self._output_window.y],
+                [0.0, 0.0, 1.0],
+            ]
+        )
+        self._window_matrix = self._alignment_matrix @ window_offset
+        if self._source_window.y or self._source_window.x:
+            source_offset = numpy.array(
+                [
+                    [1.0, 0.0, -self._source_window.x],
+                    [0.0, 1.0, -self._source_window.y],
+                    [0.0, 0.0, 1.0],
+                ]
+            )
+            self._window_matrix = source_offset @ self._window_matrix
+
+    def _sample(
+        self, plane: numpy.typing.NDArray[numpy.uint16]
+    ) -> numpy.typing.NDArray[numpy.double]:
+        import skimage.transform
+
+        return skimage.transform.warp(
+            plane,
+            inverse_map=self._window_matrix,
+            output_shape=self.output_shape,
+            order=self._order,
+            preserve_range=True,
+            clip=False,
+        )
+
+
+class TranslationWarpMap(WarpMap):
+    """WarpMap for alignment matrices that are (within `tolerance` pixels) a pure translation.
+
+    A translation moves every output pixel by the same subpixel offset, so interpolation is separable and its
+    weights are the same for every pixel: the plane is shifted by the integer part of the translation with
+    array slicing, then the fractional part is applied as a short 1D filter along X and then along Y.
+    The interpolation kernels are those of skimage.transform.warp, so for an exact translation results
+    only differ from the general engines by floating point rounding error. For order 0, this is a plain copy.
+
+    (A Fourier-domain shift was considered, but it treats the plane as periodic: content shifted out of one
+    edge would wrap around to the other instead of being filled with 0 as by every other engine.)
+
+    Attributes
+    ----------
+    translation : Tuple[float, float]
+        (Y, X) translation applied in place of `alignment_matrix`. Each output pixel samples the input plane
+        at its own position plus `translation`.
+    deviation : float
+        Largest distance, in pixels, between where `alignment_matrix` and `translation` sample any output pixel.
+    tolerance : float
+        Largest `deviation` that was accepted when building this map.
+    """
+
+    ORDERS = (0, 1, 3)
+
+    # Upper bound on the size of the floating point working arrays used by `warp_volume`
+    CHUNK_BYTES = 64 * 1024**2
+
+    def __init__(
+        self,
+        alignment_matrix: numpy.typing.NDArray[numpy.float16],
+        plane_shape: typing.Tuple[int, int],
+        order: int,
+        output_window: typing.Optional[PlaneWindow] = None,
+        source_window: typing.Optional[PlaneWindow] = None,
+        tolerance: float = 0.0,
+    ) -> None:
+        if order not in self.ORDERS:
+            raise ValueError(
+                f"TranslationWarpMap only supports orders {self.ORDERS}. Got: {order}"
+            )
+
+        super().__init__(
+            alignment_matrix, plane_shape, order, output_window, source_window
+        )
+
+        self.translation, self.deviation = nearest_translation(
+            self._alignment_matrix, self._output_window
+        )
+        self.tolerance = tolerance
+        if not self.deviation <= tolerance:
+            raise ValueError(
+                f"alignment_matrix deviates from a pure translation by up to {self.deviation:.4g} px "
+                f"over the output window, which exceeds the tolerance of {tolerance} px"
+            )
+
+        # Each output pixel o samples the input at o + translation. Split the translation into an integer offset
+        # and a fraction in [0, 1) that determines the weights of the `taps` input pixels around o + offset.
+        # Order 0 rounds half up to the nearest input pixel instead.
+        if order == 0:
+            self._taps = 1
+            offsets = [numpy.floor(shift + 0.5) for shift in self.translation]
+        else:
+            self._taps = order + 1
+            offsets = [numpy.floor(shift) for shift in self.translation]
+        self._weights = tuple(
+            self._kernel_weights(order, shift - offset)
+            for shift, offset in zip(self.translation, offsets)
+        )
+
+        # Top-left input pixel that contributes to the output window, relative to the source window
+        lead = (self._taps - 1) // 2
+        self._source_origin = (
+            self._output_window.y + int(offsets[0]) - lead - self._source_window.y,
+            self._output_window.x + int(offsets[1]) - lead - self._source_window.x,
+        )
+
+    @staticmethod
+    def _kernel_weights(order: int, fraction: float) -> typing.Tuple[float, ...]:
+        """Weights of the input pixels around a sample `fraction` of the way from one pixel to the next,
+        for the kernels skimage.transform.warp uses: linear for order 1 and Catmull-Rom cubic for order 3.
+        """
+        if order == 0:
+            return (1.0,)
+        if order == 1:
+            return (1 - fraction, fraction)
+
+        squared = fraction**2
+        cubed = fraction**3
+        return (
+            0.5 * (-fraction + 2 * squared - cubed),
+            1 + 0.5 * (-5 * squared + 3 * cubed),
+            0.5 * (fraction + 4 * squared - 3 * cubed),
+            0.5 * (-squared + cubed),
+        )
+
+    def _source_block(
+        self,
+        planes: numpy.typing.NDArray[numpy.uint16],
+        out: numpy.typing.NDArray[numpy.number],
+    ) -> None:
+        """Copy the input pixels that the output window depends on into `out`, filling those outside `planes` with 0.
+
+        `out` has the leading shape of `planes`, followed by `output_shape` plus `taps` - 1 along each axis.
+        """
+        out_slices: typing.List[typing.Any] = [Ellipsis]
+        plane_slices: typing.List[typing.Any] = [Ellipsis]
+        for origin, length, extent in zip(
+            self._source_origin, out.shape[-2:], self.input_shape
+        ):
+            start = max(origin, 0)
+            stop = min(origin + length, extent)
+            if start >= stop:
+                out[...] = 0
+                return
+            out_slices.append(slice(start - origin, stop - origin))
+            plane_slices.append(slice(start, stop))
+
+        valid = tuple(out_slices)
+        if valid[1:] != tuple(slice(0, length) for length in out.shape[-2:]):
+            out[...] = 0
+        out[valid] = planes[tuple(plane_slices)]
+
+    def _interpolate(
+        self,
+        samples: numpy.typing.NDArray[numpy.double],
+        weights: typing.Tuple[float, ...],
+        axis: int,
+    ) -> numpy.typing.NDArray[numpy.double]:
+        """Weighted sum of `taps` consecutive pixels along `axis` of `samples`,
+        dropping the `taps` - 1 trailing pixels.
+        """
+        length = samples.shape[axis] - self._taps + 1
+
+        def tap(index: int) -> numpy.typing.NDArray[numpy.double]:
+            taps_slice = [slice(None)] * samples.ndim
+            taps_slice[axis] = slice(index, index + length)
+            return samples[tuple(taps_slice)]
+
+        interpolated = numpy.multiply(tap(0), weights[0])
+        scratch = numpy.empty_like(interpolated)
+        for index in range(1, self._taps):
+            numpy.multiply(tap(index), weights[index], out=scratch)
+            interpolated += scratch
+        return interpolated
+
+    def _sample_volume(
+        self, planes: numpy.typing.NDArray[numpy.uint16]
+    ) -> numpy.typing.NDArray[numpy.double]:
+        """Interpolated samples of a (N, Y, X) stack of planes, before clipping and rounding."""
+        padding = self._taps - 1
+        block = numpy.empty(
+            (
+                planes.shape[0],
+                self.output_shape[0] + padding,
+                self.output_shape[1] + padding,
+            ),
+            dtype=numpy.double,
+        )
+        self._source_block(planes, block)
+        if self._order == 0:
+            return block
+
+        samples = self._interpolate(block, self._weights[1], axis=-1)
+        return self._interpolate(samples, self._weights[0], axis=-2)
+
+    def _sample(
+        self, plane: numpy.typing.NDArray[numpy.uint16]
+    ) -> numpy.typing.NDArray[numpy.double]:
+        return self._sample_volume(plane[numpy.newaxis])[0]
+
+    def _warp_into(
+        self,
+        plane: numpy.typing.NDArray[numpy.uint16],
+        out: numpy.typing.NDArray[numpy.uint16],
+    ) -> None:
+        self._warp_volume_into(plane[numpy.newaxis], out[numpy.newaxis])
+
+    def _warp_volume_into(
+        self,
+        planes: numpy.typing.NDArray[numpy.uint16],
+        out: numpy.typing.NDArray[numpy.uint16],
+    ) -> None:
+        if self._order == 0:
+            self._source_block(planes, out)
+            return
+
+        # Interpolate a bounded number of planes at a time to cap the size of the floating point intermediates
+        padding = self._taps - 1
+        block_size = (self.output_shape[0] + padding) * (self.output_shape[1] + padding)
+        planes_per_chunk = max(
+            1, self.CHUNK_BYTES // (numpy.dtype(numpy.double).itemsize * block_size)
+        )
+        for start in range(0, planes.shape[0], planes_per_chunk):
+            chunk = slice(start, start + planes_per_chunk)
+            samples = self._sample_volume(planes[chunk])
+            self._clip_to_input_range(samples, planes[chunk])
+            self._store(samples, out[chunk])
+
+
+def nearest_translation(
+    alignment_matrix: numpy.typing.NDArray[numpy.float16],
+    output_window: PlaneWindow,
+) -> typing.Tuple[typing.Tuple[float, float], float]:
+    """Find the pure translation that best approximates `alignment_matrix` over `output_window`.
+
+    Returns
+    -------
+    Tuple[Tuple[float, float], float]
+        The (Y, X) translation, which is exact at the center of `output_window`,
+        and the largest distance, in pixels, between where `alignment_matrix` and the translation sample
+        any output pixel in `output_window`. The distance is infinite for projective matrices.
+    """
+    matrix = numpy.asarray(alignment_matrix, dtype=numpy.double)
+    if not numpy.array_equal(matrix[2], [0.0, 0.0, 1.0]):
+        return (0.0, 0.0), float("inf")
+
+    # For an affine matrix, the deviation from a translation grows linearly away from the center of the window,
+    # so it is largest in one of the window's corners
+    linear_deviation = matrix[:2, :2] - numpy.eye(2)
+    center = numpy.array(
+        [
+            output_window.x + (output_window.width - 1) / 2,
+            output_window.y + (output_window.height - 1) / 2,
+        ]
+    )
+    translation_x, translation_y = linear_deviation @ center + matrix[:2, 2]
+    corner_offsets = numpy.array(
+        [
+            [dx * (output_window.width - 1) / 2, dy * (output_window.height - 1) / 2]
+            for dx in (-1, 1)
+            for dy in (-1, 1)
+        ]
+    )
+    deviation = numpy.linalg.norm(corner_offsets @ linear_deviation.T, axis=1).max()
+
+    return (float(translation_y), float(translation_x)), float(deviation)
+
+
+def warp_map_factory(
+    alignment_matrix: numpy.typing.NDArray[numpy.float16],
+    plane_shape: typing.Tuple[int, int],
+    order: int = 0,
+    output_window: typing.Optional[PlaneWindow] = None,
+    translation_tolerance: float = 0.0,
+    source_window: typing.Optional[PlaneWindow] = None,
+) -> WarpMap:
+    """Construct a concrete `WarpMap` for applying `alignment_matrix` to YX planes of shape `plane_shape`.
+    If `output_window` is given, the WarpMap only produces that region of each aligned plane.
+    If `source_window` is given, the WarpMap is applied to that region of each input plane (see `WarpMap`).
+
+    Current concrete `WarpMap` implementations:
+        1. TranslationWarpMap, for interpolation orders 0, 1 and 3 when `alignment_matrix` is within
+           `translation_tolerance` pixels of a pure translation over the output window (see `nearest_translation`).
+           With the default tolerance of 0, only exact translations qualify.
+        2. NearestWarpMap, for interpolation order 0.
+        3. MatrixWarpMap, for interpolation orders 1 and 3.
+        4. CoordinateWarpMap, for all other interpolation orders.
+
+    The engine chosen, and for TranslationWarpMap the deviation from the matrix and the tolerance, are logged.
+    """
+    if order < 0 or order > 5:
+        raise ValueError(
+            f"Interpolation order has to be in the range 0-5. Got: {order}"
+        )
+
+    if numpy.asarray(alignment_matrix).shape != (3, 3):
+        raise ValueError(
+            f"Expected alignment_matrix to be 3x3. Got: {numpy.asarray(alignment_matrix).shape}"
+        )
+
+    if translation_tolerance < 0:
+        raise ValueError(
+            f"translation_tolerance must be non-negative. Got: {translation_tolerance}"
+        )
+
+    window = (
+        output_window if output_window is not None else PlaneWindow(0, 0, *plane_shape)
+    )
+    warp_map: WarpMap
+    if (
+        order in TranslationWarpMap.ORDERS
+        and nearest_translation(alignment_matrix, window)[1] <= translation_tolerance
+    ):
+        warp_map = TranslationWarpMap(
+            alignment_matrix,
+            plane_shape,
+            order,
+            output_window,
+            source_window,
+            tolerance=translation_tolerance,
+        )
+        log.info(
+            "Applying alignment as a translation of %s (Y, X) px: "
+            "deviates from alignment matrix by up to %.4g px (tolerance %s px)",
+            warp_map.translation,
+            warp_map.deviation,
+            translation_tolerance,
+        )
+    elif order == 0:
+        warp_map = NearestWarpMap(
+            alignment_matrix, plane_shape, order, output_window, source_window
+        )
+    elif order in MatrixWarpMap.FAST_ORDERS:
+        warp_map = MatrixWarpMap(
+            alignment_matrix, plane_shape, order, output_window, source_window
+        )
+    else:
+        warp_map = CoordinateWarpMap(
+            alignment_matrix, plane_shape, order, output_window, source_window
+        )
+
+    log.debug(
+        "Built %s for planes of shape %s (order %s, output window %s)",
+        type(warp_map).__name__,
+        plane_shape,
+        order,
+        warp_map.output_window,
+    )
+    return warp_map
+
+
+class WarpMapCacheInfo(typing.NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    nbytes: int
+    max_bytes: int
+
+
+class WarpMapCache:
+    """Least-recently-used cache of WarpMaps, bounded by the total memory held by their sampling maps.
+
+    WarpMaps are keyed by everything that determines their sampling map: the bytes of the alignment matrix,
+    the plane shape, the interpolation order, the output window and the translation tolerance.
+    A WarpMap larger than `max_bytes` on its own is built and returned, but not cached.
+    Safe to share between threads.
+
+    Example
+    -------
+    >>> cache = WarpMapCache(max_bytes=512 * 1024**2)
+    >>> warp_map = cache.get(alignment_matrix, (624, 924), order=0)
+    >>> warp_map is cache.get(alignment_matrix, (624, 924), order=0)
+    True
+    >>> cache.info().hits, cache.info().misses
+    (1, 1)
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        if max_bytes < 0:
+            raise ValueError(f"max_bytes must be non-negative. Got: {max_bytes}")
+
+        self._max_bytes = max_bytes
+        self._entries: "collections.OrderedDict[typing.Hashable, WarpMap]" = (
+            collections.OrderedDict()
+        )
+        self._nbytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, max_bytes: int) -> None:
+        if max_bytes < 0:
+            raise ValueError(f"max_bytes must be non-negative. Got: {max_bytes}")
+
+        with self._lock:
+            self._max_bytes = max_bytes
+            self._evict()
+
+    def get(
+        self,
+        alignment_matrix: numpy.typing.NDArray[numpy.float16],
+        plane_shape: typing.Tuple[int, int],
+        order: int = 0,
+        output_window: typing.Optional[PlaneWindow] = None,
+        translation_tolerance: float = 0.0,
+    ) -> WarpMap:
+        """Get the WarpMap for these arguments, building it with `warp_map_factory` if it is not cached."""
+        matrix = numpy.ascontiguousarray(alignment_matrix)
+        plane_shape = (int(plane_shape[0]), int(plane_shape[1]))
+        window = (
+            PlaneWindow(*(int(value) for value in output_window))
+            if output_window is not None
+            else PlaneWindow(0, 0, *plane_shape)
+        )
+        key = (
+            matrix.dtype.str,
+            matrix.shape,
+            matrix.tobytes(),
+            plane_shape,
+            order,
+            window,
+            float(translation_tolerance),
+        )
+
+        with self._lock:
+            warp_map = self._entries.get(key)
+            if warp_map is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return warp_map
+            self._misses += 1
+
+        # Build outside of the lock so that lookups of other keys are not held up
+        warp_map = warp_map_factory(
+            matrix,
+            plane_shape,
+            order,
+            window,
+            translation_tolerance=translation_tolerance,
+        )
+
+        with self._lock:
+            if key in self._entries:
+                # Another thread built the same WarpMap in the meantime
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            if warp_map.nbytes <= self._max_bytes:
+                self._entries[key] = warp_map
+                self._nbytes += warp_map.nbytes
+                self._evict()
+
+        return warp_map
+
+    def info(self) -> WarpMapCacheInfo:
+        with self._lock:
+            return WarpMapCacheInfo(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                entries=len(self._entries),
+                nbytes=self._nbytes,
+                max_bytes=self._max_bytes,
+            )
+
+    def clear(self) -> None:
+        """Remove all cached WarpMaps and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+
+    def _evict(self) -> None:
+        """Drop least recently used WarpMaps until within `max_bytes`. Must be called with the lock held."""
+        while self._nbytes > self._max_bytes:
+            _, warp_map = self._entries.popitem(last=False)
+            self._nbytes -= warp_map.nbytes
+            self._evictions += 1
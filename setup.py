@@ -4,6 +4,7 @@ from setuptools import find_packages, setup
 requirements = [
     "aicsimageio ~= 4.13.0",
     "aicspylibczi ~= 3.2",
+    "dask[array]",
     "numpy",
     # v0.19.3 causes test failure for TestAlignmentCore::test_align_image
     "scikit-image ~= 0.21.0",
@@ -46,6 +47,12 @@ setup(
     author="AICS Software",
     author_email="!AICS_SW@alleninstitute.org",
     description="Core algorithms for aligning two-camera microscopy imagery",
+    entry_points={
+        "console_scripts": [
+            "camera-alignment=camera_alignment_core.bin.camera_alignment:main",
+            "camera-alignment-server=camera_alignment_core.bin.camera_alignment_server:main",
+        ],
+    },
     install_requires=requirements,
     extras_require=extra_requirements,
     license="Allen Institute Software License",